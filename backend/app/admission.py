@@ -0,0 +1,136 @@
+# backend/app/admission.py
+#
+# Control de admisión por grupo de rutas.
+#
+# Cada grupo caro (login/registro con su KDF, recomendaciones, búsqueda)
+# tiene un máximo de peticiones atendiéndose a la vez y una cola acotada
+# de espera. Lo que no cabe en la cola, o espera más que `timeout`, recibe
+# de inmediato un 503 con Retry-After en lugar de acumularse y frenar a las
+# rutas baratas (GET /books/{id}), que no pasan por aquí.
+#
+# Se usa como dependencia de la ruta:
+#
+#   @router.post("/login", dependencies=[Depends(auth_limiter.slot)])
+#
+# Cada grupo se configura con ADMISSION_<GRUPO>_CONCURRENCY, _QUEUE y
+# _TIMEOUT (segundos). Pensado para el event loop de un solo hilo: no usa
+# locks. La espera y los rechazos se publican en /metrics.
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Deque
+
+from fastapi import HTTPException
+
+from .hashing import HASH_WORKERS
+from .metrics import admission_active, admission_queued, admission_rejected, admission_wait
+
+ADMISSION_RETRY_AFTER = os.getenv("ADMISSION_RETRY_AFTER", "1")
+
+
+def _setting(group: str, name: str, default):
+    return type(default)(os.getenv(f"ADMISSION_{group.upper()}_{name}", str(default)))
+
+
+class AdmissionLimiter:
+    """
+    Semáforo con cola FIFO acotada y espera máxima.
+
+    Al liberar un lugar se le pasa directamente al primero de la cola, así
+    una petición nueva no se adelanta a las que ya esperaban.
+    """
+
+    def __init__(self, group: str, concurrency: int, queue_limit: int, timeout: float):
+        self.group = group
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self._wait = admission_wait.labels(group)
+        self._active = admission_active.labels(group)
+        self._queued = admission_queued.labels(group)
+
+    @classmethod
+    def from_env(cls, group: str, concurrency: int, queue_limit: int, timeout: float):
+        return cls(
+            group,
+            _setting(group, "CONCURRENCY", concurrency),
+            _setting(group, "QUEUE", queue_limit),
+            _setting(group, "TIMEOUT", timeout),
+        )
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _reject(self, reason: str, detail: str):
+        self.rejected += 1
+        admission_rejected.labels(self.group, reason).inc()
+        raise HTTPException(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": ADMISSION_RETRY_AFTER},
+        )
+
+    async def acquire(self):
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self._active.inc()
+            self.admitted += 1
+            self._wait.observe(0.0)
+            return
+
+        if len(self._waiters) >= self.queue_limit:
+            self._reject("queue_full", f"Too many concurrent {self.group} requests")
+
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._queued.inc()
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except BaseException as exc:
+            if future.done() and not future.cancelled():
+                # el lugar llegó justo cuando se dejó de esperar: se devuelve
+                self.release()
+            elif future in self._waiters:
+                # `release` pudo haberla sacado ya al buscar a quién pasarle el lugar
+                self._waiters.remove(future)
+                self._queued.dec()
+            if isinstance(exc, asyncio.TimeoutError):
+                self._reject("timeout", f"Timed out waiting for a {self.group} slot")
+            raise
+
+        self.admitted += 1
+        self._wait.observe(time.perf_counter() - start)
+
+    def release(self):
+        while self._waiters:
+            future = self._waiters.popleft()
+            self._queued.dec()
+            if not future.done():
+                # el lugar pasa al siguiente sin cambiar `active`
+                future.set_result(None)
+                return
+        self.active -= 1
+        self._active.dec()
+
+    async def slot(self):
+        """Dependencia de FastAPI que ocupa un lugar mientras dura la petición."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+# El KDF ya corre en HASH_WORKERS hilos: más concurrencia solo alarga la cola
+auth_limiter = AdmissionLimiter.from_env("auth", max(HASH_WORKERS, 1), 32, 2.0)
+# by-quiz puede recorrer buena parte del catálogo en el event loop
+recommend_limiter = AdmissionLimiter.from_env("recommend", 8, 16, 1.0)
+search_limiter = AdmissionLimiter.from_env("search", 16, 64, 1.0)
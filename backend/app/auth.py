@@ -1,13 +1,19 @@
 # backend/app/auth.py
 
+import os
+import time
+
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.hash import pbkdf2_sha256
 from jose import jwt, JWTError
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from .database import users_collection
 from .schemas import UserCreate, UserOut
+from .cache import TTLCache
+from .hashing import password_hasher
+from .admission import auth_limiter
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -16,6 +22,19 @@ ALGORITHM = "HS256"
 
 security = HTTPBearer()
 
+# Documentos de usuario por id, para no ir a Mongo en cada ruta autenticada.
+# Quien modifique un usuario debe llamar a invalidate_user().
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "30")),
+)
+
+# Payload ya verificado de cada token, hasta su `exp` (o el TTL si no tiene)
+token_cache = TTLCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", "300")),
+)
+
 
 def user_doc_to_out(doc):
     return UserOut(
@@ -25,12 +44,12 @@ def user_doc_to_out(doc):
     )
 
 
-@router.post("/register", response_model=UserOut)
+@router.post("/register", response_model=UserOut, dependencies=[Depends(auth_limiter.slot)])
 async def register(user: UserCreate):
     if await users_collection.find_one({"email": user.email}):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed = pbkdf2_sha256.hash(user.password)
+    hashed = await password_hasher.hash(user.password)
 
     new_user = {
         "username": user.username,
@@ -39,7 +58,11 @@ async def register(user: UserCreate):
         "quiz": None
     }
 
-    result = await users_collection.insert_one(new_user)
+    try:
+        result = await users_collection.insert_one(new_user)
+    except DuplicateKeyError:
+        # otro registro con el mismo email ganó la carrera (índice único)
+        raise HTTPException(status_code=400, detail="Email already registered")
     new_user["_id"] = result.inserted_id
 
     return user_doc_to_out(new_user)
@@ -47,11 +70,11 @@ async def register(user: UserCreate):
 
 from .schemas import LoginRequest
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(auth_limiter.slot)])
 async def login(data: LoginRequest):
     user = await users_collection.find_one({"email": data.email})
 
-    if not user or not pbkdf2_sha256.verify(data.password, user["password"]):
+    if not user or not await password_hasher.verify(data.password, user["password"]):
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
     token = jwt.encode(
@@ -71,17 +94,38 @@ async def login(data: LoginRequest):
 
 
 
+def invalidate_user(user_id):
+    user_cache.invalidate(str(user_id))
+
+
+def decode_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+        expires_at = None
+        if "exp" in payload:
+            # `exp` es hora UNIX; el cache usa time.monotonic()
+            expires_at = time.monotonic() + (payload["exp"] - time.time())
+        token_cache.set(token, payload, expires_at=expires_at)
+
+    return payload
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     try:
         token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         user_id = payload.get("user_id")
 
-        user = await users_collection.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await users_collection.find_one({"_id": ObjectId(user_id)})
+            if not user:
+                raise HTTPException(status_code=401, detail="User not found")
+            user_cache.set(user_id, user)
 
         return user
 
@@ -0,0 +1,164 @@
+# backend/app/book_index.py
+
+import asyncio
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from .database import books_collection
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class BookKeywordIndex:
+    """
+    Índice invertido (token -> libros) sobre las descripciones del catálogo.
+
+    Se usa para no traer todo `books_collection` en cada recomendación:
+    solo se puntúan los libros que comparten algún término con el quiz.
+    La puntuación final se sigue calculando con `in` sobre la descripción
+    en minúsculas, así que los resultados son los mismos que el escaneo
+    completo.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+        # book_id -> (orden de inserción, título, descripción en minúsculas)
+        self._docs: Dict[str, tuple] = {}
+        self._next_ord = 0
+        # cache de expansiones "fragmento -> tokens que lo contienen"
+        self._expansions: Dict[str, Set[str]] = {}
+        self._built = False
+        self._building = False
+        self._pending: List[dict] = []
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def title(self, book_id: str) -> Optional[str]:
+        doc = self._docs.get(book_id)
+        return doc[1] if doc is not None else None
+
+    # ======================
+    # CONSTRUCCIÓN
+    # ======================
+
+    async def build(self):
+        """Reconstruye el índice leyendo el catálogo completo una sola vez."""
+        async with self._lock:
+            self._building = True
+            try:
+                fresh = BookKeywordIndex()
+                cursor = books_collection.find({}, {"title": 1, "description": 1})
+                async for doc in cursor:
+                    fresh._add(doc)
+
+                self._postings = fresh._postings
+                self._docs = fresh._docs
+                self._next_ord = fresh._next_ord
+                self._expansions = {}
+
+                # libros insertados mientras se reconstruía
+                for doc in self._pending:
+                    self._add(doc)
+                self._pending = []
+                self._built = True
+            finally:
+                self._building = False
+
+    async def ensure_built(self):
+        if not self._built:
+            await self.build()
+
+    def add(self, doc: dict):
+        """Agrega (o reemplaza) un libro recién insertado."""
+        if self._building:
+            self._pending.append(doc)
+            return
+        self._add(doc)
+
+    def _add(self, doc: dict):
+        book_id = str(doc["_id"])
+        desc = (doc.get("description") or "").lower()
+
+        old = self._docs.get(book_id)
+        if old is not None:
+            for token in set(tokenize(old[2])):
+                self._postings.get(token, set()).discard(book_id)
+            order = old[0]
+        else:
+            order = self._next_ord
+            self._next_ord += 1
+
+        self._docs[book_id] = (order, doc.get("title", ""), desc)
+
+        for token in set(tokenize(desc)):
+            if token not in self._postings:
+                self._postings[token] = set()
+                self._expansions = {}
+            self._postings[token].add(book_id)
+
+    # ======================
+    # CONSULTA
+    # ======================
+
+    def _tokens_containing(self, fragment: str) -> Set[str]:
+        cached = self._expansions.get(fragment)
+        if cached is None:
+            cached = {t for t in self._postings if fragment in t}
+            self._expansions[fragment] = cached
+        return cached
+
+    def candidates(self, terms: Iterable[str]) -> Iterable[str]:
+        """
+        Libros cuya descripción podría contener alguno de los términos.
+
+        Un término que aparece como subcadena de la descripción tiene cada
+        uno de sus fragmentos alfanuméricos dentro de algún token, así que
+        basta con unir las listas de los tokens que contienen su fragmento
+        más largo.
+        """
+        found: Set[str] = set()
+        for term in terms:
+            pieces = tokenize(term)
+            if not pieces:
+                # "" o solo signos: no se puede acotar con el índice
+                return self._docs.keys()
+            piece = max(pieces, key=len)
+            for token in self._tokens_containing(piece):
+                found |= self._postings[token]
+        return found
+
+    def recommend(self, genre: str, keywords: List[str], limit: int = 10) -> List[dict]:
+        genre = genre.lower()
+        keywords = [k.lower() for k in keywords]
+
+        scored = []
+        for book_id in self.candidates([genre, *keywords]):
+            order, title, desc = self._docs[book_id]
+            score = 0
+
+            if genre in desc:
+                score += 3
+
+            for kw in keywords:
+                if kw in desc:
+                    score += 2
+
+            if score > 0:
+                scored.append((score, -order, book_id, title))
+
+        # mismo orden que sort estable por score descendente sobre el catálogo
+        top = heapq.nlargest(limit, scored, key=lambda x: (x[0], x[1]))
+        return [
+            {"book_id": book_id, "title": title, "score": score}
+            for score, _, book_id, title in top
+        ]
+
+
+book_index = BookKeywordIndex()
@@ -1,11 +1,19 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from bson import ObjectId
 
 from .database import books_collection, reviews_collection
-from .schemas import BookCreate, BookOut
-from .nlp.sentiment import analyze_sentiment
-from .nlp.keywords import extract_keywords
+from .schemas import BookCreate, BookOut, BookRecommendations, BookSearchResults
+from .book_index import book_index
+from .similar_books import similar_books_index
+from .search import book_search_index
+from .catalog_snapshot import catalog_snapshot
+from .pagination import (
+    NEXT_CURSOR_HEADER, check_limit, fetch_page, keyset_find, parse_fields,
+    projected, stream_json_array,
+)
+from .response_cache import cached_json, invalidate_catalog
+from .admission import search_limiter
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
@@ -26,26 +34,129 @@ def document_to_book_out(doc) -> BookOut:
     )
 
 
+def document_to_book_dict(doc) -> dict:
+    """Igual que document_to_book_out, sin pasar por Pydantic (rutas de listas)."""
+    return {
+        "title": doc.get("title", ""),
+        "author": doc.get("author"),
+        "description": doc.get("description"),
+        "id": str(doc["_id"]),
+    }
+
+
 @router.post("/", response_model=BookOut)
 async def create_book(book: BookCreate):
     new_book = book.dict()
     result = await books_collection.insert_one(new_book)
     new_book["_id"] = result.inserted_id
+    book_index.add(new_book)
+    similar_books_index.add(new_book)
+    book_search_index.add(new_book)
+    invalidate_catalog()
+    catalog_snapshot.request_refresh()
     return document_to_book_out(new_book)
 
 
+BOOK_FIELDS = ("title", "author", "description")
+
+
+def find_books(projection: Optional[dict], after: Optional[str], limit: Optional[int]):
+    """Libros ordenados por _id: de la foto mapeada si está al día, si no de Mongo."""
+    if catalog_snapshot.fresh:
+        return catalog_snapshot.find(projection, after, limit)
+    return keyset_find(books_collection, {}, projection, after, limit)
+
+
 @router.get("/", response_model=List[BookOut])
-async def list_books():
-    books = []
-    async for doc in books_collection.find({}):
-        books.append(document_to_book_out(doc))
-    return books
+async def list_books(
+    request: Request,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+):
+    """
+    Lista libros ordenados por _id.
+
+    - `limit` + `after`: paginación por _id; el cursor de la siguiente
+      página viene en el header X-Next-Cursor.
+    - `fields`: campos a traer de Mongo, p. ej. `fields=title,author`;
+      la respuesta solo trae esos campos y `id`.
+    - `stream=true`: el arreglo se escribe conforme llegan los documentos.
+
+    Las páginas se cachean ya serializadas y llevan ETag (ver response_cache).
+    """
+    check_limit(limit)
+    projection = parse_fields(fields, BOOK_FIELDS)
+    to_dict = projected(document_to_book_dict, projection)
+
+    if stream:
+        cursor = find_books(projection, after, limit)
+        return stream_json_array(cursor, to_dict)
+
+    async def build():
+        cursor = find_books(projection, after, limit)
+        books, next_cursor = await fetch_page(cursor, to_dict, limit)
+        return books, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+    key = ("books", limit, after, tuple(projection) if projection else None)
+    return await cached_json(request, key, build)
+
+
+# Profundidad máxima de paginación en la búsqueda (offset + limit)
+MAX_SEARCH_DEPTH = 10_000
+
+
+# Debe declararse antes de /{book_id} para que "search" no se tome como id
+@router.get(
+    "/search", response_model=BookSearchResults,
+    dependencies=[Depends(search_limiter.slot)],
+)
+async def search_books(q: str, limit: int = 20, offset: int = 0):
+    """
+    Búsqueda por título, autor y descripción, ordenada por BM25. No
+    distingue mayúsculas ni acentos. Se pagina con `limit` y `offset`.
+    """
+    check_limit(limit)
+    if offset < 0 or offset + limit > MAX_SEARCH_DEPTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"offset must be >= 0 and offset + limit <= {MAX_SEARCH_DEPTH}",
+        )
+
+    await book_search_index.ensure_built()
+    total, exact, results = book_search_index.search(q, limit=limit, offset=offset)
+    return BookSearchResults(query=q, total=total, total_exact=exact, results=results)
 
 
 @router.get("/{book_id}", response_model=BookOut)
-async def get_book(book_id: str):
+async def get_book(book_id: str, request: Request):
+    oid = object_id_or_404(book_id)
+
+    async def build():
+        # los libros no cambian: si está en la foto, aunque sea vieja, sirve
+        doc = catalog_snapshot.get(oid) or await books_collection.find_one({"_id": oid})
+        if not doc:
+            raise HTTPException(status_code=404, detail="Book not found")
+        return document_to_book_out(doc), {}
+
+    return await cached_json(request, ("book", book_id), build)
+
+
+@router.get("/{book_id}/recommendations", response_model=BookRecommendations)
+async def get_similar_books(book_id: str, limit: int = 10):
+    check_limit(limit)
     oid = object_id_or_404(book_id)
-    doc = await books_collection.find_one({"_id": oid})
-    if not doc:
-        raise HTTPException(status_code=404, detail="Book not found")
-    return document_to_book_out(doc)
+    await similar_books_index.ensure_built()
+
+    if book_id not in similar_books_index:
+        # Puede haberse insertado desde otro proceso después de construir el índice
+        doc = await books_collection.find_one({"_id": oid})
+        if not doc:
+            raise HTTPException(status_code=404, detail="Book not found")
+        similar_books_index.add(doc)
+
+    return BookRecommendations(
+        book_id=book_id,
+        recommendations=similar_books_index.similar(book_id, limit=limit),
+    )
@@ -0,0 +1,90 @@
+# backend/app/cache.py
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache en memoria del proceso con expiración (TTL) y desalojo LRU.
+
+    Pensado para el event loop de un solo hilo: no usa locks. Cada entrada
+    puede traer su propia expiración (p. ej. la del JWT) y nunca vive más
+    que `ttl` segundos. Lleva contadores de aciertos y fallos.
+
+    Con `max_bytes` también se limita el tamaño total: cada `set` indica
+    cuánto pesa su valor y se desalojan las entradas más viejas hasta caber.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value, size = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.bytes -= size
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None, size: int = 0):
+        """`expires_at` en segundos de time.monotonic(); se limita a ahora + ttl."""
+        if self.max_bytes is not None and size > self.max_bytes:
+            # no cabe, pero el valor anterior de `key` ya no es el vigente
+            self.invalidate(key)
+            return
+
+        limit = time.monotonic() + self.ttl
+        if expires_at is None or expires_at > limit:
+            expires_at = limit
+
+        self.invalidate(key)
+        self._data[key] = (expires_at, value, size)
+        self.bytes += size
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def clear(self):
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
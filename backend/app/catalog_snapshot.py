@@ -0,0 +1,342 @@
+# backend/app/catalog_snapshot.py
+#
+# Foto del catálogo en un archivo que todos los workers mapean en memoria
+# (solo lectura), para servir GET /books y GET /books/{id} sin ir a Mongo.
+#
+# Formato, con enteros en el orden de bytes de la máquina:
+#   encabezado  HEADER: magic, versión, hora en que empezó la lectura de
+#               Mongo, n y dónde empieza cada sección
+#   heap        UTF-8 de título, autor y descripción, uno tras otro
+#   ids         n × 12 bytes: los ObjectId en orden ascendente
+#   flags       n bytes: el bit k indica que el libro tiene el campo k
+#   offsets     3n + 1 enteros de 8 bytes; el campo k del libro i está en
+#               heap[offsets[3i + k]:offsets[3i + k + 1]]
+#
+# Las páginas del archivo viven en el page cache y se comparten entre
+# procesos: cada worker solo paga los strings de las respuestas que arma.
+#
+# Crear un libro pide regenerar la foto completa. Se hace bajo un lock de
+# archivo, se escribe a un temporal y se reemplaza con os.replace, y al
+# final se escribe el archivo de versión, que los demás workers revisan
+# cada CATALOG_SNAPSHOT_POLL segundos. Si al tomar el lock ya hay una foto
+# cuya lectura empezó después de la inserción (la hizo otro worker), se usa
+# esa. Mientras la foto de este proceso no incluya sus propias inserciones,
+# los listados van a Mongo; GET /books/{id} consulta Mongo si el libro no
+# está en la foto.
+
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Optional
+
+from bson import ObjectId
+
+from .database import DB_BACKEND, books_collection
+from .pagination import decode_cursor
+from .response_cache import invalidate_catalog
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - sin fcntl (Windows) no hay lock entre procesos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Vacío desactiva la foto. Con la base en memoria cada proceso tiene sus
+# propios datos, así que no hay nada que compartir.
+CATALOG_SNAPSHOT_PATH = os.getenv(
+    "CATALOG_SNAPSHOT_PATH", "" if DB_BACKEND == "memory" else "catalog.snapshot"
+)
+CATALOG_SNAPSHOT_POLL = float(os.getenv("CATALOG_SNAPSHOT_POLL", "1"))
+# Al arrancar se reutiliza una foto cuya lectura empezó hace menos de esto
+# (p. ej. la de otro worker que arrancó a la vez)
+CATALOG_SNAPSHOT_MAX_AGE = float(os.getenv("CATALOG_SNAPSHOT_MAX_AGE", "60"))
+
+MAGIC = b"BOOKCAT1"
+HEADER = struct.Struct("=8sQdQQQQQ")
+FIELDS = ("title", "author", "description")
+ALL_FIELDS = tuple(range(len(FIELDS)))
+ID_SIZE = 12
+# Filas entre cada cesión del event loop al recorrer listados largos
+YIELD_EVERY = 1000
+
+
+class _Writer:
+    """Escribe una foto a un temporal; `finish` la pone en su lugar."""
+
+    def __init__(self, path: str, version: int, started_at: float):
+        self.path = path
+        self.version = version
+        self.started_at = started_at
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self.tmp_path, "wb")
+        self._file.write(bytes(HEADER.size))
+        self._ids = bytearray()
+        self._flags = bytearray()
+        self._offsets = array("Q", [0])
+        self._heap_size = 0
+
+    def __len__(self):
+        return len(self._flags)
+
+    def add(self, doc: dict):
+        """Los libros deben llegar ordenados por _id."""
+        self._ids += doc["_id"].binary
+        flags = 0
+        for k, field in enumerate(FIELDS):
+            value = doc.get(field)
+            if isinstance(value, str):
+                data = value.encode("utf-8")
+                self._file.write(data)
+                self._heap_size += len(data)
+                flags |= 1 << k
+            self._offsets.append(self._heap_size)
+        self._flags.append(flags)
+
+    def finish(self):
+        f = self._file
+        n = len(self._flags)
+        ids_start = HEADER.size + self._heap_size
+        flags_start = ids_start + ID_SIZE * n
+        f.write(self._ids)
+        f.write(self._flags)
+        f.write(bytes(-f.tell() % 8))
+        offsets_start = f.tell()
+        f.write(self._offsets.tobytes())
+
+        f.seek(0)
+        f.write(HEADER.pack(
+            MAGIC, self.version, self.started_at, n,
+            HEADER.size, ids_start, flags_start, offsets_start,
+        ))
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.unlink(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class _Mapped:
+    """Una foto mapeada. Se descarta sola cuando nadie la referencia."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, self.version, self.started_at, self.n,
+         heap_start, self._ids_start, flags_start, offsets_start) = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+
+        view = memoryview(self._mm)
+        self._heap = view[heap_start:self._ids_start]
+        self._flags = view[flags_start:flags_start + self.n]
+        self._offsets = view[offsets_start:offsets_start + 8 * (3 * self.n + 1)].cast("Q")
+
+    def id_at(self, i: int) -> bytes:
+        start = self._ids_start + ID_SIZE * i
+        return self._mm[start:start + ID_SIZE]
+
+    def bisect(self, key: bytes) -> int:
+        """Posición del primer libro con _id mayor que `key`."""
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key < self.id_at(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def doc(self, i: int, fields=ALL_FIELDS) -> dict:
+        """Documento con la forma que devuelve Mongo (los campos ausentes no aparecen)."""
+        doc = {"_id": ObjectId(self.id_at(i))}
+        flags = self._flags[i]
+        offsets = self._offsets
+        for k in fields:
+            if flags >> k & 1:
+                start = offsets[3 * i + k]
+                doc[FIELDS[k]] = str(self._heap[start:offsets[3 * i + k + 1]], "utf-8")
+        return doc
+
+
+async def _rows(snapshot: _Mapped, start: int, stop: int, fields):
+    for i in range(start, stop):
+        yield snapshot.doc(i, fields)
+        if (i - start) % YIELD_EVERY == YIELD_EVERY - 1:
+            await asyncio.sleep(0)
+
+
+class CatalogSnapshot:
+    def __init__(self, path: str = CATALOG_SNAPSHOT_PATH, poll: float = CATALOG_SNAPSHOT_POLL):
+        self.path = path
+        self.poll = poll
+        self._current: Optional[_Mapped] = None
+        # hora (time.time) de la última inserción de este proceso
+        self._requested = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @property
+    def version(self) -> int:
+        return self._current.version if self._current is not None else 0
+
+    @property
+    def fresh(self) -> bool:
+        """Hay foto y ya incluye los libros que insertó este proceso."""
+        return self._current is not None and self._current.started_at >= self._requested
+
+    def __len__(self):
+        return self._current.n if self._current is not None else 0
+
+    # ======================
+    # LECTURA
+    # ======================
+
+    def get(self, oid: ObjectId) -> Optional[dict]:
+        current = self._current
+        if current is None:
+            return None
+        i = current.bisect(oid.binary) - 1
+        if i >= 0 and current.id_at(i) == oid.binary:
+            return current.doc(i)
+        return None
+
+    def find(self, projection: Optional[dict], after: Optional[str], limit: Optional[int]):
+        """
+        Igual que `keyset_find(books_collection, {}, ...)` pero leyendo la
+        foto: iterador asíncrono de documentos ordenados por _id.
+        """
+        current = self._current
+        fields = ALL_FIELDS
+        if projection is not None:
+            fields = tuple(k for k, field in enumerate(FIELDS) if field in projection)
+        start = current.bisect(decode_cursor(after).binary) if after else 0
+        stop = current.n if not limit else min(current.n, start + limit)
+        return _rows(current, start, stop, fields)
+
+    # ======================
+    # REGENERACIÓN
+    # ======================
+
+    def request_refresh(self, since: Optional[float] = None) -> Optional[asyncio.Task]:
+        """
+        Pide una foto cuya lectura empiece después de `since` (por defecto,
+        ahora: llamar después de insertar). Las peticiones se juntan.
+        """
+        if not self.enabled:
+            return None
+        self._requested = max(self._requested, time.time() if since is None else since)
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def start(self):
+        """Al arrancar: trae una foto reciente y empieza a vigilar la versión."""
+        task = self.request_refresh(time.time() - CATALOG_SNAPSHOT_MAX_AGE)
+        if task is None:
+            return
+        await task
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self.watch())
+
+    def stop(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.poll)
+            try:
+                if self._disk_version() != self.version:
+                    self._load()
+            except (OSError, ValueError):
+                logger.exception("Could not load catalog snapshot %s", self.path)
+
+    async def _refresh(self):
+        # las inserciones que lleguen mientras tanto piden otra vuelta
+        while not self.fresh:
+            try:
+                await self._regenerate(self._requested)
+            except Exception:
+                logger.exception("Could not regenerate catalog snapshot %s", self.path)
+                return
+
+    async def _regenerate(self, requested: float):
+        lock_fd = await asyncio.to_thread(self._lock)
+        try:
+            if self._disk_started_at() < requested:
+                await self._write()
+            self._load()
+        finally:
+            os.close(lock_fd)
+
+    async def _write(self):
+        writer = _Writer(self.path, self._disk_version() + 1, time.time())
+        try:
+            projection = {field: 1 for field in FIELDS}
+            async for doc in books_collection.find({}, projection).sort("_id", 1):
+                writer.add(doc)
+            await asyncio.to_thread(writer.finish)
+        except BaseException:
+            writer.abort()
+            raise
+
+        tmp_path = f"{self.path}.version.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(writer.version))
+        os.replace(tmp_path, self.path + ".version")
+        logger.info("Catalog snapshot v%d written: %d books", writer.version, len(writer))
+
+    def _load(self):
+        previous = self._current
+        current = _Mapped(self.path)
+        if previous is not None and current.version == previous.version:
+            return
+        self._current = current
+        # Otro worker pudo haber insertado libros: lo cacheado ya no sirve
+        if previous is not None:
+            invalidate_catalog()
+
+    def _lock(self) -> int:
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def _disk_version(self) -> int:
+        try:
+            with open(self.path + ".version") as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _disk_started_at(self) -> float:
+        try:
+            with open(self.path, "rb") as f:
+                magic, _, started_at, *_ = HEADER.unpack(f.read(HEADER.size))
+        except (FileNotFoundError, struct.error):
+            return 0.0
+        return started_at if magic == MAGIC else 0.0
+
+    def memory_bytes(self) -> int:
+        """Tamaño del archivo mapeado (compartido entre workers, no por proceso)."""
+        return len(self._current._mm) if self._current is not None else 0
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -0,0 +1,560 @@
+# backend/app/collaborative.py
+
+import asyncio
+import copy
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from .database import reviews_collection
+
+logger = logging.getLogger(__name__)
+
+# numpy y scipy se importan al construir o agregar la primera reseña (ver
+# load_numeric), no al cargar el módulo
+np = None
+sp = None
+
+TOP_K = 20
+# Filas de la matriz de similitud que se calculan a la vez al construir
+BUILD_CHUNK_ROWS = 256
+# Reseñas nuevas que se acumulan antes de unirlas a la matriz principal
+MERGE_EVERY = 4096
+MIN_REVIEW_WEIGHT = 0.1
+# Cambio relativo de la norma de un libro a partir del cual se actualiza su
+# similitud en todas las listas donde aparece (ver _update_lists)
+NORM_TOLERANCE = 0.01
+
+
+def load_numeric():
+    global np, sp
+    if np is None:
+        import numpy
+        import scipy.sparse
+        np, sp = numpy, scipy.sparse
+
+
+def review_weight(sentiment_score: float) -> float:
+    """
+    Peso de una reseña en la matriz: 1 + sentimiento (de 0.1 a 2). Reseñar
+    un libro ya indica interés; una reseña muy negativa casi no aporta,
+    pero la celda no puede quedar en cero: también marca qué libros ya
+    leyó el usuario.
+    """
+    return max(1.0 + float(sentiment_score), MIN_REVIEW_WEIGHT)
+
+
+class ItemSimilarityIndex:
+    """
+    Filtrado colaborativo ítem-ítem a partir de las reseñas.
+
+    Cada reseña es una celda de una matriz dispersa usuarios × libros con
+    su peso por sentimiento (si un usuario reseñó un libro varias veces
+    cuenta la última). Dos libros se parecen si los reseñaron los mismos
+    usuarios: coseno entre sus columnas. Como en similar_books, los `k`
+    vecinos de cada libro se precalculan en dos arreglos (n × k) y la
+    recomendación para un usuario suma los vecinos de los libros de su
+    historial, ponderados por su peso.
+
+    Las reseñas nuevas no copian la matriz: van a `_recent` y se unen cada
+    MERGE_EVERY. Al llegar, se recalcula la fila de similitud de cada libro
+    afectado (un producto disperso con los usuarios que lo reseñaron) y se
+    actualiza ese libro en las listas de sus vecinos. Hasta la siguiente
+    reconstrucción: los libros que salen del top-k de otro no se
+    reemplazan, y la similitud guardada con un libro cuya norma cambió
+    menos de NORM_TOLERANCE puede diferir en esa proporción.
+
+    Ese recálculo tarda decenas o cientos de ms por lote: no corre en el
+    event loop. `add_reviews` solo acumula las reseñas y una tarea las
+    aplica en un hilo sobre copias de las listas y normas; al terminar se
+    cambian todas juntas en el loop, así `recommend` nunca ve arreglos a
+    medio actualizar. Las reseñas aparecen en las recomendaciones unos
+    milisegundos después de llegar.
+    """
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self._users: Dict[str, int] = {}
+        self._books: Dict[str, int] = {}
+        self._book_ids: List[str] = []
+        # Se crean al construir (o al primer alta): ver load_numeric
+        self._matrix = None
+        self._matrix_csc = None
+        self._norms2 = None
+        # norma² de cada libro la última vez que se propagó a las listas
+        self._listed_norms2 = None
+        self._nbr_idx = None
+        self._nbr_sim = None
+        # usuario -> {libro: peso} de las celdas que cambiaron desde la
+        # última unión, y esos cambios como diferencias (fila, libro, delta)
+        # respecto de la matriz; scipy suma las repetidas al armarla
+        self._recent: Dict[int, Dict[int, float]] = {}
+        self._delta_rows: List[int] = []
+        self._delta_cols: List[int] = []
+        self._delta_vals: List[float] = []
+        self._built = False
+        self._pending: List[dict] = []
+        self._apply_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._book_ids)
+
+    # ======================
+    # CONSTRUCCIÓN
+    # ======================
+
+    async def build(self):
+        async with self._lock:
+            # Las pendientes de sentimiento las agrega review_pipeline
+            reviews = []
+            cursor = reviews_collection.find(
+                {"enrichment": {"$exists": False}},
+                {"username": 1, "book_id": 1, "sentiment_score": 1},
+            ).sort("_id", 1)
+            async for review in cursor:
+                reviews.append(review)
+
+            fresh = ItemSimilarityIndex(self.k)
+            await asyncio.to_thread(fresh._build_from, reviews)
+            self.__dict__.update(fresh._state())
+            self._built = True
+        # Las que llegaron mientras tanto quedaron en `_pending`; aplicar
+        # una que ya se leyó de la base no cambia nada (vale la última)
+        self._schedule_apply()
+
+    async def ensure_built(self):
+        if not self._built:
+            await self.build()
+
+    # Lo que se reemplaza al construir o al aplicar un lote
+    _STATE = (
+        "_users", "_books", "_book_ids", "_matrix", "_matrix_csc", "_norms2",
+        "_listed_norms2", "_nbr_idx", "_nbr_sim", "_recent",
+        "_delta_rows", "_delta_cols", "_delta_vals",
+    )
+
+    def _state(self) -> dict:
+        return {name: self.__dict__[name] for name in self._STATE}
+
+    def _build_from(self, reviews: List[dict]):
+        load_numeric()
+        rows, cols, weights = [], [], []
+        for review in reviews:
+            username = review.get("username")
+            if not username:
+                continue
+            rows.append(self._user_row(username))
+            cols.append(self._book_col(str(review["book_id"])))
+            weights.append(review_weight(review.get("sentiment_score", 0.0)))
+
+        n_users, n_books = len(self._users), len(self._book_ids)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float32)
+
+        # vienen en orden de _id: de las celdas repetidas vale la última
+        keys = (rows * n_books + cols)[::-1]
+        _, first = np.unique(keys, return_index=True)
+        keep = len(keys) - 1 - first
+        rows, cols, weights = rows[keep], cols[keep], weights[keep]
+
+        self._matrix = sp.csr_matrix(
+            (weights, (rows, cols)), shape=(n_users, n_books), dtype=np.float32
+        )
+        self._matrix_csc = self._matrix.tocsc()
+        self._norms2 = np.bincount(
+            cols, weights=weights.astype(np.float64) ** 2, minlength=n_books
+        )
+        self._listed_norms2 = self._norms2.copy()
+        self._nbr_idx = np.full((n_books, self.k), -1, dtype=np.int32)
+        self._nbr_sim = np.full((n_books, self.k), -np.inf, dtype=np.float32)
+
+        # columnas normalizadas: el producto punto es el coseno
+        inv_norm = np.zeros(n_books, dtype=np.float32)
+        nonzero = self._norms2 > 0
+        inv_norm[nonzero] = 1 / np.sqrt(self._norms2[nonzero])
+        normalized = self._matrix @ sp.diags(inv_norm)
+        normalized_t = normalized.T.tocsr()
+        for start in range(0, n_books, BUILD_CHUNK_ROWS):
+            block = (normalized_t[start:start + BUILD_CHUNK_ROWS] @ normalized).tocsr()
+            for offset in range(block.shape[0]):
+                lo, hi = block.indptr[offset], block.indptr[offset + 1]
+                self._set_neighbours(start + offset, block.indices[lo:hi], block.data[lo:hi])
+
+    # ======================
+    # ACTUALIZACIÓN INCREMENTAL
+    # ======================
+
+    def _user_row(self, username: str) -> int:
+        row = self._users.get(username)
+        if row is None:
+            row = self._users[username] = len(self._users)
+        return row
+
+    def _book_col(self, book_id: str) -> int:
+        col = self._books.get(book_id)
+        if col is None:
+            col = self._books[book_id] = len(self._book_ids)
+            self._book_ids.append(book_id)
+        return col
+
+    def _grow(self):
+        if self._matrix is None:
+            load_numeric()
+            self._matrix = sp.csr_matrix((0, 0), dtype=np.float32)
+            self._matrix_csc = self._matrix.tocsc()
+            self._norms2 = np.zeros(0)
+            self._listed_norms2 = np.zeros(0)
+            self._nbr_idx = np.full((0, self.k), -1, dtype=np.int32)
+            self._nbr_sim = np.full((0, self.k), -np.inf, dtype=np.float32)
+
+        n_users, n_books = len(self._users), len(self._book_ids)
+        if self._matrix.shape != (n_users, n_books):
+            # matrices nuevas que comparten data e indices con las actuales:
+            # las que está leyendo `recommend` no cambian
+            self._matrix = _resized(self._matrix, self._matrix.shape[0], n_users, (n_users, n_books))
+            self._matrix_csc = _resized(
+                self._matrix_csc, self._matrix_csc.shape[1], n_books, (n_users, n_books)
+            )
+        if n_books > len(self._nbr_idx):
+            capacity = max(n_books, 2 * len(self._nbr_idx), 16)
+            idx = np.full((capacity, self.k), -1, dtype=np.int32)
+            sim = np.full((capacity, self.k), -np.inf, dtype=np.float32)
+            norms2 = np.zeros(capacity)
+            listed = np.zeros(capacity)
+            idx[:len(self._nbr_idx)] = self._nbr_idx
+            sim[:len(self._nbr_sim)] = self._nbr_sim
+            norms2[:len(self._norms2)] = self._norms2
+            listed[:len(self._listed_norms2)] = self._listed_norms2
+            self._nbr_idx, self._nbr_sim = idx, sim
+            self._norms2, self._listed_norms2 = norms2, listed
+
+    def _row(self, row: int) -> Dict[int, float]:
+        """Libros de un usuario y su peso actual (matriz + recientes)."""
+        books = {}
+        if row < self._matrix.shape[0]:
+            lo, hi = self._matrix.indptr[row], self._matrix.indptr[row + 1]
+            books = dict(zip(self._matrix.indices[lo:hi].tolist(), self._matrix.data[lo:hi].tolist()))
+        books.update(self._recent.get(row, {}))
+        return books
+
+    def _weight(self, row: int, col: int) -> float:
+        recent = self._recent.get(row)
+        if recent is not None and col in recent:
+            return recent[col]
+        lo, hi = self._matrix.indptr[row], self._matrix.indptr[row + 1]
+        cols = self._matrix.indices[lo:hi]
+        at = np.searchsorted(cols, col)
+        return float(self._matrix.data[lo + at]) if at < len(cols) and cols[at] == col else 0.0
+
+    def add_reviews(self, reviews: Iterable[dict]):
+        """
+        Reseñas con sentimiento ya calculado; las que no tienen usuario se
+        ignoran. Dentro del event loop se aplican en segundo plano (ver
+        `flush`); sin loop (scripts, benchmarks) aquí mismo.
+        """
+        reviews = [r for r in reviews if r.get("username")]
+        if not reviews:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._add_reviews(reviews)
+            return
+        self._pending.extend(reviews)
+        if self._built:
+            self._schedule_apply()
+
+    def _schedule_apply(self):
+        if self._pending and (self._apply_task is None or self._apply_task.done()):
+            self._apply_task = asyncio.get_running_loop().create_task(self._apply_pending())
+
+    async def _apply_pending(self):
+        async with self._lock:
+            while self._pending:
+                reviews, self._pending = self._pending, []
+                try:
+                    state = await asyncio.to_thread(self._applied_state, reviews)
+                except Exception:
+                    # Quedan fuera hasta la próxima reconstrucción
+                    logger.exception("Failed to add %d reviews to the history index", len(reviews))
+                    continue
+                self.__dict__.update(state)
+
+    def _applied_state(self, reviews: List[dict]) -> dict:
+        """
+        Corre en un hilo: aplica `reviews` sobre una copia del estado y la
+        devuelve. Solo se copia lo que `_add_reviews` modifica en su lugar;
+        usuarios y libros solo crecen (un id nuevo aún no aparece en las
+        listas de vecinos ni en la matriz) y las matrices se reemplazan.
+        """
+        clone = copy.copy(self)
+        for name in ("_norms2", "_listed_norms2", "_nbr_idx", "_nbr_sim"):
+            value = getattr(self, name)
+            setattr(clone, name, None if value is None else value.copy())
+        clone._recent = {row: dict(books) for row, books in self._recent.items()}
+        clone._delta_rows = list(self._delta_rows)
+        clone._delta_cols = list(self._delta_cols)
+        clone._delta_vals = list(self._delta_vals)
+        clone._add_reviews(reviews)
+        return clone._state()
+
+    async def flush(self):
+        """Espera a que se apliquen las reseñas recibidas hasta ahora."""
+        while self._apply_task is not None and not self._apply_task.done():
+            await asyncio.shield(self._apply_task)
+
+    def _add_reviews(self, reviews: List[dict]):
+        if not reviews:
+            return
+        load_numeric()
+        changes = []
+        for review in reviews:
+            row = self._user_row(review["username"])
+            col = self._book_col(str(review["book_id"]))
+            changes.append((row, col, review_weight(review.get("sentiment_score", 0.0))))
+        self._grow()
+
+        touched, users = set(), set()
+        for row, col, weight in changes:
+            old = self._weight(row, col)
+            self._norms2[col] += weight * weight - old * old
+            self._recent.setdefault(row, {})[col] = weight
+            self._delta_rows.append(row)
+            self._delta_cols.append(col)
+            self._delta_vals.append(weight - old)
+            touched.add(col)
+            users.add(row)
+
+        self._refresh(sorted(touched), users)
+        if len(self._delta_vals) >= MERGE_EVERY:
+            self._merge_recent()
+
+    def _delta_matrix(self):
+        return sp.csr_matrix(
+            (np.asarray(self._delta_vals, dtype=np.float32), (self._delta_rows, self._delta_cols)),
+            shape=self._matrix.shape, dtype=np.float32,
+        )
+
+    def _refresh(self, cols: List[int], users: Iterable[int]):
+        """
+        Recalcula las similitudes de los libros reseñados (`cols`) por
+        `users`. El producto punto de un libro solo cambió con los libros
+        del historial de esos usuarios; si además su norma se movió más de
+        NORM_TOLERANCE (o es la primera vez), cambió su similitud con todos
+        y se recalcula su fila completa.
+        """
+        n_books = len(self._book_ids)
+        norms = np.sqrt(self._norms2[:n_books])
+        cols = np.asarray(cols)
+        listed = self._listed_norms2[cols]
+        drift = np.abs(self._norms2[cols] - listed) > 2 * NORM_TOLERANCE * listed
+        drifted, steady = cols[drift], cols[~drift]
+        self._listed_norms2[drifted] = self._norms2[drifted]
+
+        delta = self._delta_matrix()
+        delta_csc = delta.tocsc()
+
+        def columns(books):
+            # columnas actuales (matriz + recientes) como filas: libros × usuarios
+            return (self._matrix_csc[:, books] + delta_csc[:, books]).T.tocsr()
+
+        sources, others, dots = [], [], []
+        if len(drifted):
+            full = columns(drifted)
+            full = (full @ self._matrix + full @ delta).tocsr()
+            sources.append(_repeat(drifted, np.diff(full.indptr)))
+            others.append(full.indices)
+            dots.append(full.data)
+        if len(steady):
+            changed = _unique(np.fromiter(
+                (col for user in users for col in self._row(user)), dtype=np.int64
+            ))
+            part = (columns(steady) @ columns(changed).T).tocsr()
+            sources.append(_repeat(steady, np.diff(part.indptr)))
+            others.append(changed[part.indices])
+            dots.append(part.data)
+
+        sources, others = np.concatenate(sources), np.concatenate(others)
+        denom = norms[sources] * norms[others]
+        sims = np.divide(np.concatenate(dots), denom, out=np.zeros(len(denom)), where=denom > 0)
+        sims = sims.astype(np.float32)
+
+        if len(drifted):
+            # primeras filas: las de `drifted`, en orden
+            for i, col in enumerate(drifted):
+                lo, hi = full.indptr[i], full.indptr[i + 1]
+                self._set_neighbours(col, others[lo:hi], sims[lo:hi])
+        self._update_lists(drifted, steady, sources, others, sims)
+
+    def _set_neighbours(self, col: int, others, sims):
+        keep = (others != col) & (sims > 0)
+        others, sims = others[keep], sims[keep]
+        if len(sims) > self.k:
+            part = np.argpartition(-sims, self.k - 1)[:self.k]
+            others, sims = others[part], sims[part]
+        order = np.lexsort((others, -sims))
+        self._nbr_idx[col] = -1
+        self._nbr_sim[col] = -np.inf
+        self._nbr_idx[col, :len(order)] = others[order]
+        self._nbr_sim[col, :len(order)] = sims[order]
+
+    def _update_lists(self, drifted, steady, sources, others, sims):
+        """
+        Aplica las similitudes nuevas (`sources` × `others`) al resto de
+        las listas: donde el par ya estaba y donde ahora supera al último.
+        Los pares de `steady` también van en la lista del propio libro (la
+        de `drifted` ya se recalculó entera). Todas las filas a la vez: se
+        juntan sus entradas vigentes con las nuevas, se ordenan por fila y
+        similitud y se quedan las k primeras de cada una.
+        """
+        n_books = len(self._book_ids)
+        nbr_idx, nbr_sim = self._nbr_idx[:n_books], self._nbr_sim[:n_books]
+        # una posición extra para que el -1 de las listas incompletas caiga en False
+        is_drifted = np.zeros(n_books + 1, dtype=bool)
+        is_drifted[drifted] = True
+        is_steady = np.zeros(n_books + 1, dtype=bool)
+        is_steady[steady] = True
+
+        # entradas (fila, libro, similitud) en los dos sentidos
+        pair = sources != others
+        back = pair & is_steady[sources]
+        entry_row = np.concatenate([others[pair], sources[back]])
+        entry_idx = np.concatenate([sources[pair], others[back]])
+        entry_sim = np.concatenate([sims[pair], sims[back]])
+        keep = ~is_drifted[entry_row]
+        entry_row, entry_idx, entry_sim = entry_row[keep], entry_idx[keep], entry_sim[keep]
+
+        listed = (nbr_idx[entry_row] == entry_idx[:, None]).any(axis=1)
+        relevant = listed | ((entry_sim > 0) & (entry_sim > nbr_sim[entry_row, -1]))
+        rows = _unique(np.concatenate([
+            np.flatnonzero(is_drifted[nbr_idx.ravel()]) // self.k, entry_row[relevant]
+        ]))
+        rows = rows[~is_drifted[rows]]
+        if not len(rows):
+            return
+
+        is_row = np.zeros(n_books, dtype=bool)
+        is_row[rows] = True
+        new = is_row[entry_row] & (entry_sim > 0)
+        fresh_keys = entry_row[is_row[entry_row]] * n_books + entry_idx[is_row[entry_row]]
+
+        old_idx, old_sim = nbr_idx[rows], nbr_sim[rows]
+        old_row = np.broadcast_to(rows[:, None], old_idx.shape).copy()
+        # lo que tiene valor nuevo (o dejó de parecerse) se reemplaza
+        old_keep = (old_idx >= 0) & ~is_drifted[old_idx]
+        old_keep[old_keep] = ~_isin(old_row[old_keep] * n_books + old_idx[old_keep], fresh_keys)
+
+        entry_row = np.concatenate([old_row[old_keep], entry_row[new]])
+        entry_idx = np.concatenate([old_idx[old_keep], entry_idx[new]]).astype(np.int32)
+        entry_sim = np.concatenate([old_sim[old_keep], entry_sim[new]]).astype(np.float32)
+
+        # fila ascendente y, dentro de cada una, similitud descendente (una
+        # sola clave: lexsort con tres es varias veces más lento)
+        order = np.argsort(entry_row * 4.0 + (2.0 - entry_sim), kind="stable")
+        entry_row, entry_idx, entry_sim = entry_row[order], entry_idx[order], entry_sim[order]
+        rank = np.arange(len(entry_row)) - np.searchsorted(entry_row, entry_row)
+        top = rank < self.k
+
+        self._nbr_idx[rows] = -1
+        self._nbr_sim[rows] = -np.inf
+        self._nbr_idx[entry_row[top], rank[top]] = entry_idx[top]
+        self._nbr_sim[entry_row[top], rank[top]] = entry_sim[top]
+
+    def _merge_recent(self):
+        self._matrix = (self._matrix + self._delta_matrix()).tocsr()
+        self._matrix_csc = self._matrix.tocsc()
+        self._recent = {}
+        self._delta_rows, self._delta_cols, self._delta_vals = [], [], []
+
+    # ======================
+    # CONSULTA
+    # ======================
+
+    def recommend(self, username: str, limit: int = 10) -> List[dict]:
+        """
+        Libros que el usuario no reseñó, por la suma de su similitud con
+        los del historial ponderada por el peso de cada reseña.
+        """
+        row = self._users.get(username)
+        if row is None or self._matrix is None:
+            return []
+        books = self._row(row)
+        if not books:
+            return []
+
+        seen = np.fromiter(books, dtype=np.int32, count=len(books))
+        weights = np.fromiter(books.values(), dtype=np.float32, count=len(books))
+        nbrs = self._nbr_idx[seen]
+        valid = nbrs >= 0
+        contrib = np.where(valid, self._nbr_sim[seen], 0) * weights[:, None]
+        valid &= ~np.isin(nbrs, seen) & (contrib > 0)
+        if not valid.any():
+            return []
+
+        cand, inverse = np.unique(nbrs[valid], return_inverse=True)
+        scores = np.bincount(inverse, weights=contrib[valid])
+        if len(cand) > limit:
+            part = np.argpartition(-scores, limit - 1)[:limit]
+            cand, scores = cand[part], scores[part]
+        order = np.lexsort((cand, -scores))
+        return [
+            {"book_id": self._book_ids[cand[i]], "score": round(float(scores[i]), 4)}
+            for i in order
+        ]
+
+    def memory_bytes(self) -> int:
+        """Memoria aproximada de las matrices, normas y listas de vecinos."""
+        if self._matrix is None:
+            return 0
+        sparse = sum(
+            m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+            for m in (self._matrix, self._matrix_csc)
+        )
+        return sparse + self._norms2.nbytes + self._nbr_idx.nbytes + self._nbr_sim.nbytes
+
+
+# Las actualizaciones corren en un hilo, pero np.repeat y el np.unique por
+# tabla hash (que usan también np.isin y np.union1d) no sueltan el GIL: con
+# lotes grandes frenan al event loop igual. Estas versiones dan el mismo
+# resultado solo con operaciones que lo sueltan (sort, searchsorted, cumsum).
+
+def _unique(values):
+    """Como np.unique(values), ordenado."""
+    values = np.sort(values)
+    if not len(values):
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def _isin(values, test):
+    """Como np.isin(values, test)."""
+    test = _unique(test)
+    if not len(test):
+        return np.zeros(len(values), dtype=bool)
+    pos = np.minimum(np.searchsorted(test, values), len(test) - 1)
+    return test[pos] == values
+
+
+def _repeat(values, counts):
+    """Como np.repeat(values, counts)."""
+    ends = np.cumsum(counts)
+    total = int(ends[-1]) if len(ends) else 0
+    return values[np.cumsum(np.bincount(ends[:-1], minlength=total + 1)[:total])]
+
+
+def _resized(matrix, old_len: int, new_len: int, shape):
+    """
+    `matrix` (CSR o CSC) con `shape`, agregando filas (CSR) o columnas
+    (CSC) vacías: solo se alarga indptr, data e indices se comparten.
+    """
+    indptr = matrix.indptr
+    if new_len > old_len:
+        indptr = np.concatenate([indptr, np.full(new_len - old_len, indptr[-1], dtype=indptr.dtype)])
+    return type(matrix)((matrix.data, matrix.indices, indptr), shape=shape)
+
+
+item_similarity_index = ItemSimilarityIndex()
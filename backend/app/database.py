@@ -1,7 +1,18 @@
 # backend/app/database.py
 
-from motor.motor_asyncio import AsyncIOMotorClient
+import logging
 import os
+import time
+from typing import Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+
+from .metrics import MongoCommandMetrics
+
+logger = logging.getLogger(__name__)
 
 # URL de conexión a MongoDB (puedes usar variable de entorno si quieres)
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
@@ -9,10 +20,159 @@ MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
 # Nombre de la base de datos
 DB_NAME = os.getenv("MONGO_DB_NAME", "book_reviews_db")
 
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+# "mongo" (por defecto) o "memory": base en memoria del proceso, sin Mongo,
+# para pruebas y benchmarks (ver database_mock.py)
+DB_BACKEND = os.getenv("DB_BACKEND", "mongo").lower()
+
+# Si está activo, al arrancar se registran los planes de las consultas
+# frecuentes. Nada configura este logger (uvicorn solo configura los suyos),
+# así que en ese caso se le da nivel y, si hace falta, un handler propio.
+MONGO_DEBUG = os.getenv("MONGO_DEBUG", "").lower() in ("1", "true", "yes")
+if MONGO_DEBUG:
+    logger.setLevel(logging.DEBUG)
+    if not logger.hasHandlers():
+        logger.addHandler(logging.StreamHandler())
+
+
+def _int_env(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+# Pool de conexiones y tiempos de espera (los valores por defecto son los de pymongo)
+CLIENT_OPTIONS = {
+    "maxPoolSize": _int_env("MONGO_MAX_POOL_SIZE", 100),
+    "minPoolSize": _int_env("MONGO_MIN_POOL_SIZE", 0),
+    "maxIdleTimeMS": _int_env("MONGO_MAX_IDLE_TIME_MS", 0) or None,
+    "waitQueueTimeoutMS": _int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0) or None,
+    "connectTimeoutMS": _int_env("MONGO_CONNECT_TIMEOUT_MS", 20000),
+    "socketTimeoutMS": _int_env("MONGO_SOCKET_TIMEOUT_MS", 0) or None,
+    "serverSelectionTimeoutMS": _int_env("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000),
+    "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+    # Conteo y duración de comandos por colección para /metrics
+    "event_listeners": [MongoCommandMetrics()],
+}
+
+if DB_BACKEND == "memory":
+    from .database_mock import MemoryDatabase
+
+    client = None
+    db = MemoryDatabase(DB_NAME)
+else:
+    client = AsyncIOMotorClient(MONGO_URL, **CLIENT_OPTIONS)
+    db = client[DB_NAME]
 
 # Colecciones
 books_collection = db["books"]
 reviews_collection = db["reviews"]
 users_collection = db["users"]  # ⬅⬅ NECESARIO para auth / quiz
+summaries_collection = db["book_summaries"]  # resumen agregado por libro
+jobs_collection = db["jobs"]  # progreso de trabajos largos (p. ej. rescore)
+
+
+# ======================
+# LEASES
+# ======================
+
+async def acquire_lease(name: str, seconds: float) -> Optional[str]:
+    """
+    Toma el lease `name` en `jobs_collection` por `seconds` si está libre o
+    vencido; devuelve un token para liberarlo, o None si lo tiene otro
+    proceso. Sirve para que de varios workers de uvicorn solo uno haga una
+    tarea (recuperar reseñas pendientes, guardar el modelo de palabras).
+    """
+    token = str(ObjectId())
+    now = time.time()
+    try:
+        await jobs_collection.update_one(
+            {"_id": name, "lease_until": {"$lt": now}},
+            {"$set": {"owner": token, "lease_until": now + seconds}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Existe y está vigente
+        return None
+    return token
+
+
+async def release_lease(name: str, token: str):
+    await jobs_collection.update_one({"_id": name, "owner": token}, {"$set": {"lease_until": 0}})
+
+
+# ======================
+# ÍNDICES
+# ======================
+
+# Índices que necesitan las consultas frecuentes, por colección
+INDEXES = {
+    # list_reviews: find({"book_id": ...}).sort("_id")
+    reviews_collection: [
+        IndexModel([("book_id", ASCENDING), ("_id", ASCENDING)], name="book_id_1__id_1"),
+        # review_pipeline.recover: find({"enrichment": {"$in": [...]}}); el
+        # campo solo existe en las pendientes o en proceso, así que el índice
+        # disperso es chico
+        IndexModel([("enrichment", ASCENDING)], name="enrichment_1", sparse=True),
+    ],
+    # register / login: find_one({"email": ...})
+    users_collection: [
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+    ],
+}
+
+
+class IndexDriftError(RuntimeError):
+    pass
+
+
+def _index_options(info: dict) -> tuple:
+    """Opciones que cambian qué documentos entran al índice o cuánto viven."""
+    return (
+        bool(info.get("unique", False)),
+        bool(info.get("sparse", False)),
+        info.get("expireAfterSeconds"),
+        info.get("partialFilterExpression"),
+    )
+
+
+def _index_matches(existing: dict, model: IndexModel) -> bool:
+    spec = model.document
+    return (
+        list(existing["key"]) == list(spec["key"].items())
+        and _index_options(existing) == _index_options(spec)
+    )
+
+
+async def ensure_indexes():
+    """
+    Crea los índices declarados en INDEXES. Si ya existe uno con el mismo
+    nombre pero otra definición (campos u opciones) se lanza
+    IndexDriftError: preferimos no arrancar a correr sin el índice esperado.
+    """
+    for collection, models in INDEXES.items():
+        existing = await collection.index_information()
+
+        for model in models:
+            name = model.document["name"]
+            if name in existing and not _index_matches(existing[name], model):
+                raise IndexDriftError(
+                    f"Index {collection.name}.{name} differs from the declared one: "
+                    f"found {existing[name]}, expected {model.document}"
+                )
+
+        await collection.create_indexes(models)
+        logger.info("Indexes ready on %s: %s", collection.name,
+                    ", ".join(m.document["name"] for m in models))
+
+
+async def log_query_plans():
+    """
+    Registra (en modo debug) el plan ganador de las consultas frecuentes.
+    Con MONGO_DEBUG el logger de este módulo muestra DEBUG (ver arriba).
+    """
+    queries = {
+        "reviews by book_id": reviews_collection.find({"book_id": None}).sort("_id", ASCENDING),
+        "users by email": users_collection.find({"email": ""}).limit(1),
+    }
+    for label, cursor in queries.items():
+        plan = await cursor.explain()
+        winning = plan.get("queryPlanner", {}).get("winningPlan", {})
+        logger.debug("Query plan [%s]: %s", label, winning)
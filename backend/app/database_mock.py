@@ -1,40 +1,488 @@
-# Base de datos falsa para pruebas (NO usa Mongo real)
-
-class FakeCollection:
-    def __init__(self):
-        self.data = []
-    
-    async def insert_one(self, doc):
-        doc["_id"] = str(len(self.data) + 1)
-        self.data.append(doc)
-        return type("obj", (), {"inserted_id": doc["_id"]})
-
-    def find(self, query):
-        # Regresar elementos que coincidan con la llave
-        class Cursor:
-            def __init__(self, data):
-                self._data = data
-            
-            async def to_list(self, length=None):
-                return self._data
-            
-            async def __aiter__(self):
-                for item in self._data:
-                    yield item
-        
-        filtered = [
-            d for d in self.data
-            if all(d.get(k) == v for k, v in query.items())
-        ]
-        
-        return Cursor(filtered)
-
-    async def find_one(self, query):
-        for doc in self.data:
-            if all(doc.get(k) == v for k, v in query.items()):
-                return doc
+# Base de datos en memoria para pruebas y benchmarks (NO usa Mongo real)
+#
+# Implementa el subconjunto de la API de Motor que usan los routers y los
+# scripts de seed: find/find_one con proyección, sort, skip y limit, $or,
+# insert_one/insert_many, update_one, delete_many, bulk_write y los índices.
+# Se activa con DB_BACKEND=memory (ver database.py).
+
+import bisect
+import copy
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import InsertOne, ReplaceOne, UpdateOne, DeleteOne, DeleteMany, UpdateMany
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+_MISSING = object()
+
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+        self.acknowledged = True
+
+
+# ======================
+# CONSULTAS
+# ======================
+
+def _compare(value, op, arg) -> bool:
+    if op == "$eq":
+        return value == arg
+    if op == "$ne":
+        return value != arg
+    if op == "$in":
+        return value in arg
+    if op == "$nin":
+        return value not in arg
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+
+    if value is _MISSING or value is None:
+        return False
+    if op == "$gt":
+        return value > arg
+    if op == "$gte":
+        return value >= arg
+    if op == "$lt":
+        return value < arg
+    if op == "$lte":
+        return value <= arg
+    raise NotImplementedError(f"Operator {op} is not supported by the memory backend")
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    for field, cond in query.items():
+        if field == "$or":
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+            continue
+        value = doc.get(field, _MISSING)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            if not all(_compare(value, op, arg) for op, arg in cond.items()):
+                return False
+        elif value is _MISSING or value != cond:
+            return False
+    return True
+
+
+def _project(doc: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return copy.copy(doc)
+
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1):
+            out["_id"] = doc["_id"]
+        return out
+
+    exclude = {k for k, v in projection.items() if not v}
+    return {k: v for k, v in doc.items() if k not in exclude}
+
+
+def _sort_key(value):
+    # Mongo ordena None/faltante antes que cualquier valor
+    return (0, 0) if value is _MISSING or value is None else (1, value)
+
+
+class MemoryCursor:
+    """Cursor perezoso: sort/skip/limit se aplican al iterar, como en Motor."""
+
+    def __init__(self, collection: "MemoryCollection", query: dict, projection: Optional[dict]):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort: List[tuple] = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction: int = 1):
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def batch_size(self, n: int):
+        return self
+
+    def _iter_docs(self):
+        docs = self._collection._scan(self._query, self._sort)
+        if self._skip:
+            docs = (d for i, d in enumerate(docs) if i >= self._skip)
+        for count, doc in enumerate(docs):
+            if self._limit and count >= self._limit:
+                return
+            yield _project(doc, self._projection)
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self._iter_docs():
+                yield doc
+        return gen()
+
+    async def to_list(self, length: Optional[int] = None):
+        out = []
+        for doc in self._iter_docs():
+            out.append(doc)
+            if length and len(out) >= length:
+                break
+        return out
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self._collection._plan(self._query, self._sort)}}
+
+
+class MemoryCollection:
+    """
+    Colección en memoria con acceso O(1) por _id e índices hash.
+
+    Los documentos se guardan en un dict por _id y, aparte, una lista
+    ordenada de _id para recorrer en orden y paginar con {"_id": {"$gt": x}}
+    sin ordenar toda la colección. Cada índice declarado (create_index /
+    create_indexes) mantiene valor -> conjunto de _id sobre su primer campo;
+    las consultas de igualdad o $in sobre ese campo solo revisan esos docs.
+    """
+
+    def __init__(self, name: str = "collection"):
+        self.name = name
+        self._docs: Dict[Any, dict] = {}
+        self._sorted_ids: List[Any] = []
+        self._indexes: Dict[str, Dict[Any, set]] = {}
+        self._index_info: "OrderedDict[str, dict]" = OrderedDict(
+            [("_id_", {"key": [("_id", 1)], "v": 2})]
+        )
+        self._unique_fields = set()
+
+    # Compatibilidad con la versión anterior del mock
+    @property
+    def data(self) -> List[dict]:
+        return [self._docs[i] for i in self._sorted_ids]
+
+    # ---------- índices ----------
+
+    def create_index_on(self, field: str, unique: bool = False, name: Optional[str] = None):
+        name = name or f"{field}_1"
+        if field not in self._indexes:
+            index: Dict[Any, set] = {}
+            for doc_id, doc in self._docs.items():
+                index.setdefault(doc.get(field), set()).add(doc_id)
+            if unique and any(len(ids) > 1 for ids in index.values()):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+            self._indexes[field] = index
+        if unique:
+            self._unique_fields.add(field)
+        return name
+
+    async def create_index(self, keys, unique: bool = False, name: Optional[str] = None, **kwargs):
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        name = self.create_index_on(keys[0][0], unique=unique, name=name)
+        info = {"key": list(keys), "v": 2}
+        if unique:
+            info["unique"] = True
+        # Las demás opciones no cambian el mock, pero se reportan como Mongo
+        info.update((k, v) for k, v in kwargs.items()
+                    if k in ("sparse", "expireAfterSeconds", "partialFilterExpression"))
+        self._index_info[name] = info
+        return name
+
+    async def create_indexes(self, models):
+        names = []
+        for model in models:
+            spec = model.document
+            options = {k: v for k, v in spec.items() if k not in ("key", "name", "unique")}
+            names.append(await self.create_index(
+                list(spec["key"].items()), unique=spec.get("unique", False), name=spec["name"],
+                **options,
+            ))
+        return names
+
+    async def index_information(self):
+        return copy.deepcopy(dict(self._index_info))
+
+    def _index_add(self, doc: dict):
+        for field, index in self._indexes.items():
+            index.setdefault(doc.get(field), set()).add(doc["_id"])
+
+    def _index_remove(self, doc: dict):
+        for field, index in self._indexes.items():
+            ids = index.get(doc.get(field))
+            if ids is not None:
+                ids.discard(doc["_id"])
+                if not ids:
+                    del index[doc.get(field)]
+
+    def _check_unique(self, doc: dict, ignore_id=None):
+        if doc["_id"] in self._docs and doc["_id"] != ignore_id:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_")
+        for field in self._unique_fields:
+            others = self._indexes[field].get(doc.get(field), ())
+            if any(other != ignore_id for other in others):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {field}_1")
+
+    # ---------- planificación ----------
+
+    def _candidates(self, query: dict) -> Optional[Iterable]:
+        """_id candidatos usando _id o un índice; None = recorrer todo."""
+        cond = query.get("_id", _MISSING)
+        if cond is not _MISSING:
+            if not isinstance(cond, dict):
+                return [cond] if cond in self._docs else []
+            if "$in" in cond:
+                return [i for i in cond["$in"] if i in self._docs]
+
+        for field, index in self._indexes.items():
+            cond = query.get(field, _MISSING)
+            if cond is _MISSING:
+                continue
+            if not isinstance(cond, dict):
+                return index.get(cond, ())
+            if "$in" in cond:
+                found = set()
+                for value in cond["$in"]:
+                    found |= index.get(value, set())
+                return found
         return None
 
+    def _plan(self, query: dict, sort: List[tuple]) -> dict:
+        if "_id" in query and not isinstance(query["_id"], dict):
+            return {"stage": "IDHACK"}
+        for field in self._indexes:
+            if field in query:
+                return {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "keyPattern": {field: 1}}}
+        return {"stage": "COLLSCAN"}
+
+    def _ordered_ids(self, query: dict):
+        """Todos los _id en orden, empezando después de un $gt/$gte sobre _id."""
+        cond = query.get("_id")
+        start = 0
+        if isinstance(cond, dict):
+            if "$gt" in cond:
+                start = bisect.bisect_right(self._sorted_ids, cond["$gt"])
+            elif "$gte" in cond:
+                start = bisect.bisect_left(self._sorted_ids, cond["$gte"])
+        return (self._sorted_ids[i] for i in range(start, len(self._sorted_ids)))
+
+    def _scan(self, query: dict, sort: List[tuple]):
+        candidates = self._candidates(query)
+        by_id = not sort or (len(sort) == 1 and sort[0][0] == "_id")
+
+        if candidates is None:
+            ids = self._ordered_ids(query)
+            if by_id and sort and sort[0][1] < 0:
+                ids = reversed(list(ids))
+        else:
+            ids = sorted(candidates)
+            if by_id and sort and sort[0][1] < 0:
+                ids.reverse()
+
+        docs = (self._docs[i] for i in ids)
+        docs = (d for d in docs if _matches(d, query))
+
+        if not by_id:
+            docs = list(docs)
+            for field, direction in reversed(sort):
+                docs.sort(key=lambda d: _sort_key(d.get(field, _MISSING)), reverse=direction < 0)
+        return docs
+
+    # ---------- lectura ----------
+
+    def find(self, query: Optional[dict] = None, projection: Optional[dict] = None, **kwargs):
+        return MemoryCursor(self, query or {}, projection)
+
+    async def find_one(self, query: Optional[dict] = None, projection: Optional[dict] = None, **kwargs):
+        for doc in self._scan(query or {}, []):
+            return _project(doc, projection)
+        return None
+
+    async def count_documents(self, query: dict, **kwargs) -> int:
+        return sum(1 for _ in self._scan(query, []))
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        return len(self._docs)
+
+    # ---------- escritura ----------
+
+    def _insert(self, doc: dict):
+        if "_id" not in doc:
+            doc["_id"] = ObjectId()
+        self._check_unique(doc)
+
+        stored = copy.copy(doc)
+        self._docs[stored["_id"]] = stored
+        if not self._sorted_ids or self._sorted_ids[-1] < stored["_id"]:
+            self._sorted_ids.append(stored["_id"])
+        else:
+            bisect.insort(self._sorted_ids, stored["_id"])
+        self._index_add(stored)
+
+    def _remove(self, doc_id):
+        doc = self._docs.pop(doc_id)
+        self._index_remove(doc)
+        pos = bisect.bisect_left(self._sorted_ids, doc_id)
+        del self._sorted_ids[pos]
+
+    async def insert_one(self, doc: dict, **kwargs):
+        self._insert(doc)
+        return _Result(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: Iterable[dict], ordered: bool = True, **kwargs):
+        inserted, errors = [], []
+        for i, doc in enumerate(docs):
+            try:
+                self._insert(doc)
+                inserted.append(doc["_id"])
+            except DuplicateKeyError as exc:
+                errors.append({"index": i, "code": 11000, "errmsg": str(exc), "op": doc})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return _Result(inserted_ids=inserted)
+
+    def _apply_update(self, doc: dict, update: dict, inserting: bool):
+        new = copy.copy(doc)
+        for op, fields in update.items():
+            if op == "$set":
+                new.update(fields)
+            elif op == "$setOnInsert":
+                if inserting:
+                    new.update(fields)
+            elif op == "$inc":
+                for field, amount in fields.items():
+                    new[field] = new.get(field, 0) + amount
+            elif op == "$unset":
+                for field in fields:
+                    new.pop(field, None)
+            else:
+                raise NotImplementedError(f"Update operator {op} is not supported by the memory backend")
+        return new
+
+    def _upsert_doc(self, query: dict) -> dict:
+        return {k: v for k, v in query.items() if not isinstance(v, dict) and not k.startswith("$")}
+
+    def _update(self, query: dict, update: dict, upsert: bool, many: bool):
+        matched = modified = 0
+        targets = [d["_id"] for d in self._scan(query, [])]
+        if not many:
+            targets = targets[:1]
+
+        for doc_id in targets:
+            old = self._docs[doc_id]
+            new = self._apply_update(old, update, inserting=False)
+            matched += 1
+            if new != old:
+                self._check_unique(new, ignore_id=doc_id)
+                self._index_remove(old)
+                self._docs[doc_id] = new
+                self._index_add(new)
+                modified += 1
+
+        upserted_id = None
+        if not targets and upsert:
+            new = self._apply_update(self._upsert_doc(query), update, inserting=True)
+            self._insert(new)
+            upserted_id = new["_id"]
+
+        return _Result(matched_count=matched, modified_count=modified, upserted_id=upserted_id)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False, **kwargs):
+        return self._update(query, update, upsert, many=False)
+
+    async def update_many(self, query: dict, update: dict, upsert: bool = False, **kwargs):
+        return self._update(query, update, upsert, many=True)
+
+    def _replace(self, query: dict, replacement: dict, upsert: bool):
+        for doc in self._scan(query, []):
+            new = dict(replacement, _id=doc["_id"])
+            self._check_unique(new, ignore_id=doc["_id"])
+            self._index_remove(doc)
+            self._docs[doc["_id"]] = new
+            self._index_add(new)
+            return _Result(matched_count=1, modified_count=1, upserted_id=None)
+
+        if upsert:
+            new = dict(self._upsert_doc(query), **replacement)
+            self._insert(new)
+            return _Result(matched_count=0, modified_count=0, upserted_id=new["_id"])
+        return _Result(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def replace_one(self, query: dict, replacement: dict, upsert: bool = False, **kwargs):
+        return self._replace(query, replacement, upsert)
+
+    async def delete_many(self, query: dict, **kwargs):
+        targets = [d["_id"] for d in self._scan(query, [])]
+        for doc_id in targets:
+            self._remove(doc_id)
+        return _Result(deleted_count=len(targets))
+
+    async def delete_one(self, query: dict, **kwargs):
+        for doc in self._scan(query, []):
+            self._remove(doc["_id"])
+            return _Result(deleted_count=1)
+        return _Result(deleted_count=0)
+
+    async def bulk_write(self, requests: Iterable, ordered: bool = True, **kwargs):
+        counts = {"inserted_count": 0, "matched_count": 0, "modified_count": 0,
+                  "deleted_count": 0, "upserted_count": 0}
+        errors = []
+
+        for i, req in enumerate(requests):
+            try:
+                if isinstance(req, InsertOne):
+                    self._insert(req._doc)
+                    counts["inserted_count"] += 1
+                    continue
+                if isinstance(req, (UpdateOne, UpdateMany)):
+                    res = self._update(req._filter, req._doc, req._upsert, many=isinstance(req, UpdateMany))
+                elif isinstance(req, ReplaceOne):
+                    res = self._replace(req._filter, req._doc, req._upsert)
+                elif isinstance(req, (DeleteOne, DeleteMany)):
+                    targets = [d["_id"] for d in self._scan(req._filter, [])]
+                    if isinstance(req, DeleteOne):
+                        targets = targets[:1]
+                    for doc_id in targets:
+                        self._remove(doc_id)
+                    counts["deleted_count"] += len(targets)
+                    continue
+                else:
+                    raise NotImplementedError(f"{type(req).__name__} is not supported by the memory backend")
+            except DuplicateKeyError as exc:
+                errors.append({"index": i, "code": 11000, "errmsg": str(exc)})
+                if ordered:
+                    break
+                continue
+
+            counts["matched_count"] += res.matched_count
+            counts["modified_count"] += res.modified_count
+            counts["upserted_count"] += 1 if res.upserted_id is not None else 0
+
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, **counts})
+        return _Result(**counts)
+
+
+class MemoryDatabase:
+    def __init__(self, name: str = "memory"):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+
 
-books_collection_test = FakeCollection()
-reviews_collection_test = FakeCollection()
+books_collection_test = MemoryCollection("books")
+reviews_collection_test = MemoryCollection("reviews")
@@ -0,0 +1,68 @@
+# backend/app/hashing.py
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from fastapi import HTTPException
+from passlib.hash import pbkdf2_sha256
+
+# Hilos dedicados al KDF (0 = calcular en el event loop, como antes)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 2)))
+# Cuántos hashes pueden esperar turno además de los que están corriendo
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "64"))
+HASH_RETRY_AFTER = "1"
+
+
+class PasswordHasher:
+    """
+    Ejecuta pbkdf2_sha256 fuera del event loop.
+
+    El KDF tarda decenas de milisegundos de CPU; en un handler async
+    bloquearía todas las demás rutas. Aquí corre en un pool de hilos propio
+    (hashlib libera el GIL durante el cálculo) y, si ya hay demasiados
+    esperando, se rechaza de inmediato con 503 en lugar de encolar sin fin.
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, queue_limit: int = HASH_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash")
+            if workers > 0 else None
+        )
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def _run(self, fn: Callable, *args):
+        if self._executor is None:
+            return fn(*args)
+
+        if self.in_flight >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": HASH_RETRY_AFTER},
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pbkdf2_sha256.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(pbkdf2_sha256.verify, password, hashed)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
@@ -1,11 +1,38 @@
+import asyncio
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from .auth import router as auth_router
 from .quiz import router as quiz_router
 from .recommend_user import router as recommend_user_router
 from .books import router as books_router
 from .reviews import router as reviews_router
+from .reviews import batch_router as reviews_batch_router
+from .reviews import keep_keyword_model_current, restore_keyword_model, save_keyword_model
+from .summaries import router as summaries_router
+from .book_index import book_index
+from .similar_books import similar_books_index
+from .search import book_search_index
+from .collaborative import item_similarity_index
+from .catalog_snapshot import catalog_snapshot
+from .hashing import password_hasher
+from .nlp import warm_up as warm_up_nlp
+from .nlp.pool import nlp_pool
+from .review_pipeline import review_pipeline
+from .database import MONGO_DEBUG, ensure_indexes, log_query_plans
+from .auth import token_cache, user_cache
+from .response_cache import catalog_cache
+from .recommend_cache import stats as quiz_cache_stats
+from .metrics import CONTENT_TYPE, MetricsMiddleware, register_stats, render_metrics
+
+# Qué hacer con el NLP pesado (scikit-learn, índice de libros parecidos) al arrancar:
+# - "background": se importa y se construye en segundo plano (por defecto)
+# - "eager": antes de aceptar peticiones
+# - "lazy": nada; se carga con la primera petición que lo use
+NLP_WARMUP = os.getenv("NLP_WARMUP", "background")
 
 app = FastAPI(
     title="Book Review Recommender API",
@@ -20,11 +47,80 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Va al final para quedar por fuera y medir la petición completa
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(quiz_router)
 app.include_router(recommend_user_router)
 app.include_router(books_router)
 app.include_router(reviews_router)
+app.include_router(reviews_batch_router)
+app.include_router(summaries_router)
+
+
+@app.on_event("startup")
+async def build_indexes():
+    await ensure_indexes()
+    if MONGO_DEBUG:
+        await log_query_plans()
+
+    await book_index.build()
+    await restore_keyword_model()
+    app.state.keyword_model_catch_up = asyncio.create_task(keep_keyword_model_current())
+
+    # Igual que el de libros parecidos: GET /books/search y
+    # /recommend/by-history esperan si no terminaron
+    app.state.search_build = asyncio.create_task(book_search_index.build())
+    app.state.history_build = asyncio.create_task(item_similarity_index.build())
+    # Mientras no haya foto del catálogo, GET /books va a Mongo
+    app.state.catalog_snapshot = asyncio.create_task(catalog_snapshot.start())
+
+    review_pipeline.start()
+    app.state.review_recovery = asyncio.create_task(review_pipeline.recover())
+
+    if NLP_WARMUP == "eager":
+        await asyncio.to_thread(warm_up_nlp)
+        await nlp_pool.start()
+        await similar_books_index.build()
+    elif NLP_WARMUP == "background":
+        app.state.nlp_pool_start = asyncio.create_task(nlp_pool.start())
+        # Tarda en catálogos grandes: se construye en segundo plano y las
+        # consultas a /books/{id}/recommendations esperan a que termine
+        app.state.similar_books_build = asyncio.create_task(similar_books_index.build())
+
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    await review_pipeline.drain()
+    catalog_snapshot.stop()
+    app.state.keyword_model_catch_up.cancel()
+    await save_keyword_model()
+    password_hasher.shutdown()
+    nlp_pool.shutdown()
+
+
+register_stats("user_cache", "Authenticated user cache counters.", "stat", user_cache.stats)
+register_stats("token_cache", "Decoded JWT cache counters.", "stat", token_cache.stats)
+register_stats("catalog_cache", "Catalog response cache counters.", "stat", catalog_cache.stats)
+register_stats("quiz_cache", "Quiz recommendation cache counters.", "stat", quiz_cache_stats)
+register_stats(
+    "password_hashing", "Password hashing pool state.", "stat",
+    lambda: {"in_flight": password_hasher.in_flight, "rejected": password_hasher.rejected},
+)
+register_stats(
+    "catalog_snapshot", "Memory-mapped catalog snapshot state.", "stat",
+    lambda: {"version": catalog_snapshot.version, "books": len(catalog_snapshot),
+             "bytes": catalog_snapshot.memory_bytes(), "fresh": int(catalog_snapshot.fresh)},
+)
+register_stats("nlp_pool", "NLP process pool state.", "stat", nlp_pool.stats)
+register_stats("review_pipeline", "Review post-processing queue state.", "stat", review_pipeline.stats)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 
 @app.get("/")
 async def root():
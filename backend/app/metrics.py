@@ -0,0 +1,331 @@
+# backend/app/metrics.py
+#
+# Métricas en formato de texto de Prometheus, sin dependencias extra.
+#
+# - Latencia y peticiones en curso por plantilla de ruta (middleware ASGI).
+# - Conteo y duración de comandos de Mongo por colección (monitoring de pymongo).
+# - Duración de las funciones de NLP (decorador `timed`).
+# - Espera y rechazos del control de admisión por grupo de rutas.
+#
+# Nada en el camino caliente toma locks: cada hilo escribe en su propio
+# "shard" de contadores (los listeners de Motor corren en hilos del pool) y
+# /metrics suma los shards al momento de responder. Los buckets de los
+# histogramas se reservan al crear cada serie.
+
+import bisect
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from pymongo import monitoring
+
+# Buckets en segundos: de 0.5 ms a 10 s
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Series:
+    """Una serie (combinación de labels) con un arreglo de celdas por hilo."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+
+    def _shard(self) -> List[float]:
+        shard = getattr(self._local, "cells", None)
+        if shard is None:
+            shard = self._local.cells = [0.0] * self._size
+            self._shards.append(shard)  # list.append es atómico con el GIL
+        return shard
+
+    def totals(self) -> List[float]:
+        totals = [0.0] * self._size
+        for shard in list(self._shards):
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+        REGISTRY.append(self)
+
+    def _new_series(self) -> _Series:
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        series = self._series.get(values)
+        if series is None:
+            series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, series in sorted(self._series.items()):
+            lines.extend(self._render_series(values, series.totals()))
+        return lines
+
+    def _render_series(self, values, totals) -> List[str]:
+        labels = _format_labels(self.labelnames, values)
+        return [f"{self.name}{labels} {_format_value(totals[0])}"]
+
+
+class _CounterSeries(_Series):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0):
+        self._shard()[0] += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _CounterSeries()
+
+
+class _GaugeSeries(_CounterSeries):
+    def dec(self, amount: float = 1.0):
+        self._shard()[0] -= amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+
+class _HistogramSeries(_Series):
+    def __init__(self, buckets: Tuple[float, ...]):
+        # una celda por bucket, una para +Inf y otra para la suma
+        super().__init__(len(buckets) + 2)
+        self._buckets = buckets
+
+    def observe(self, value: float):
+        shard = self._shard()
+        shard[bisect.bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def _render_series(self, values, totals) -> List[str]:
+        lines = []
+        cumulative = 0.0
+        for bound, count in zip(self.buckets + (float("inf"),), totals[:-1]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = _format_labels(self.labelnames, values, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(totals[-1])}")
+        lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+# Funciones que devuelven líneas extra (p. ej. contadores de caches)
+COLLECTORS: List[Callable[[], List[str]]] = []
+
+
+def register_stats(name: str, documentation: str, labelname: str, source: Callable[[], dict]):
+    """Publica como gauge cada valor del dict que devuelve `source()` (p. ej. cache.stats())."""
+    def collect():
+        lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+        for key, value in source().items():
+            lines.append(f'{name}{{{labelname}="{_escape(key)}"}} {_format_value(value)}')
+        return lines
+    COLLECTORS.append(collect)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collector in COLLECTORS:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# ======================
+# HTTP
+# ======================
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route"),
+)
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled.", ("method",),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide cada petición HTTP con la plantilla de la
+    ruta (`/books/{book_id}`, no la URL con el id) para que la cardinalidad
+    de las series no crezca con los datos. El router deja la ruta que
+    atendió la petición en `scope["route"]`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        in_flight = http_requests_in_flight.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            http_request_duration.labels(method, route).observe(elapsed)
+            http_requests_total.labels(method, route, str(status[0])).inc()
+
+
+# ======================
+# MONGO
+# ======================
+
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command duration by collection.",
+    ("collection", "command"),
+)
+mongo_command_failures = Counter(
+    "mongo_command_failures_total", "Failed MongoDB commands by collection.",
+    ("collection", "command"),
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Listener de pymongo: cuenta y mide cada comando por colección."""
+
+    def __init__(self):
+        # (connection, request_id) -> (colección, comando)
+        self._pending: Dict[tuple, Tuple[str, str]] = {}
+
+    def started(self, event):
+        # getMore lleva el id del cursor en su clave; la colección va aparte
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        collection = event.command.get(key)
+        if not isinstance(collection, str):
+            collection = "<none>"
+        self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def _finish(self, event):
+        return self._pending.pop(
+            (event.connection_id, event.request_id), ("<unknown>", event.command_name)
+        )
+
+    def succeeded(self, event):
+        collection, command = self._finish(event)
+        mongo_command_duration.labels(collection, command).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection, command = self._finish(event)
+        mongo_command_duration.labels(collection, command).observe(event.duration_micros / 1e6)
+        mongo_command_failures.labels(collection, command).inc()
+
+
+# ======================
+# NLP
+# ======================
+
+nlp_duration = Histogram(
+    "nlp_call_duration_seconds", "Duration of NLP calls.", ("function",),
+)
+
+
+def timed(name: str):
+    """Decorador que registra la duración de la función en nlp_call_duration_seconds."""
+    def decorator(fn):
+        series = nlp_duration.labels(name)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# ======================
+# ADMISIÓN
+# ======================
+
+admission_wait = Histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a slot, by route group.",
+    ("group",),
+)
+admission_rejected = Counter(
+    "admission_rejected_total", "Requests shed by admission control, by route group and reason.",
+    ("group", "reason"),
+)
+admission_active = Gauge(
+    "admission_active", "Requests holding an admission slot, by route group.", ("group",),
+)
+admission_queued = Gauge(
+    "admission_queued", "Requests waiting for an admission slot, by route group.", ("group",),
+)
@@ -0,0 +1,10 @@
+def warm_up():
+    """
+    Carga por adelantado lo que el NLP importa de forma perezosa
+    (scikit-learn, numpy y scipy) para que la primera petición no lo pague.
+    """
+    from .keywords import load_tfidf_vectorizer
+    from ..similar_books import load_numeric
+
+    load_tfidf_vectorizer()
+    load_numeric()
@@ -1,7 +1,34 @@
-from typing import List
-from sklearn.feature_extraction.text import TfidfVectorizer
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+from collections import Counter
+from typing import Dict, List, Optional, Set
 
+from ..metrics import timed
 
+# Stopwords personalizadas (puedes agregar más si quieres)
+STOP_WORDS = frozenset([
+    "el", "la", "los", "las", "y", "de", "que", "en", "un", "una",
+    "es", "muy", "por", "para", "con", "lo", "como", "al", "se",
+    "del", "más", "menos", "su", "sus", "le", "les", "me", "mi",
+    "te", "tu", "yo", "nos", "pero", "si", "porque", "esta", "este"
+])
+
+
+def load_tfidf_vectorizer():
+    """
+    Importa TfidfVectorizer al primer uso: scikit-learn (con numpy y scipy)
+    tarda alrededor de un segundo en cargarse y ninguna ruta lo necesita
+    para arrancar.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer
+
+
+@timed("extract_keywords")
 def extract_keywords(texts: List[str], top_k: int = 5) -> List[str]:
     """
     Extrae las palabras clave más importantes usando TF-IDF.
@@ -16,18 +43,10 @@ def extract_keywords(texts: List[str], top_k: int = 5) -> List[str]:
     if not texts:
         return []
 
-    # Stopwords personalizadas (puedes agregar más si quieres)
-    stop_words = [
-        "el", "la", "los", "las", "y", "de", "que", "en", "un", "una",
-        "es", "muy", "por", "para", "con", "lo", "como", "al", "se",
-        "del", "más", "menos", "su", "sus", "le", "les", "me", "mi",
-        "te", "tu", "yo", "nos", "pero", "si", "porque", "esta", "este"
-    ]
-
     # Inicializamos TF-IDF
-    vectorizer = TfidfVectorizer(
+    vectorizer = load_tfidf_vectorizer()(
         max_features=1000,
-        stop_words=stop_words
+        stop_words=list(STOP_WORDS)
     )
 
     # Matriz TF-IDF
@@ -46,3 +65,141 @@ def extract_keywords(texts: List[str], top_k: int = 5) -> List[str]:
     top_terms = [feature_names[i] for i in sorted_idx[:top_k]]
 
     return top_terms
+
+
+# ======================
+# MODELO INCREMENTAL
+# ======================
+
+# Mismo patrón de tokens que TfidfVectorizer por defecto
+TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+MODEL_FORMAT_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+class KeywordModel:
+    """
+    Estadísticas TF-IDF acumuladas de todas las reseñas.
+
+    Guarda la frecuencia de documento global de cada término (en cuántas
+    reseñas aparece) y el conteo de términos por libro. Cada reseña nueva
+    solo suma contadores, y las palabras clave de un libro se calculan con
+    el IDF de todo el corpus sin volver a ajustar un vectorizador.
+
+    `last_review_id` marca hasta dónde se recorrió la base en orden de _id:
+    el modelo cuenta todas las reseñas hasta ahí. Las que el proceso cuenta
+    en vivo (`add_live_review`) no lo mueven, porque otros workers insertan
+    reseñas que este no ve; se recuerdan en `live_ids` para no contarlas dos
+    veces cuando el recorrido las alcance, y se olvidan (`trim_live_ids`)
+    cuando el recorrido ya pasó de ellas.
+    """
+
+    def __init__(self):
+        self.n_docs = 0
+        self.doc_freq: Counter = Counter()
+        self.book_terms: Dict[str, Counter] = {}
+        # _id de la última reseña recorrida, para ponerse al día al arrancar
+        self.last_review_id: Optional[str] = None
+        self.live_ids: Set[str] = set()
+
+    def _count(self, book_id: str, text: str):
+        terms = tokenize(text)
+
+        self.n_docs += 1
+        self.doc_freq.update(set(terms))
+        self.book_terms.setdefault(str(book_id), Counter()).update(terms)
+
+    def add_review(self, book_id: str, text: str, review_id: Optional[str] = None):
+        """Reseña leída de la base en orden de _id."""
+        if review_id is not None:
+            review_id = str(review_id)
+            self.last_review_id = review_id
+            if review_id in self.live_ids:
+                self.live_ids.discard(review_id)  # ya contada en vivo
+                return
+        self._count(book_id, text)
+
+    def add_live_review(self, book_id: str, text: str, review_id):
+        """Reseña recién insertada por este proceso."""
+        review_id = str(review_id)
+        if self.last_review_id is not None and review_id <= self.last_review_id:
+            return  # un recorrido concurrente ya la contó
+        self._count(book_id, text)
+        self.live_ids.add(review_id)
+
+    def trim_live_ids(self):
+        """Olvida las reseñas en vivo que quedan antes de `last_review_id`."""
+        if self.last_review_id is not None:
+            self.live_ids = {i for i in self.live_ids if i > self.last_review_id}
+
+    def idf(self, term: str) -> float:
+        # IDF suavizado, igual que TfidfVectorizer(smooth_idf=True)
+        return math.log((1 + self.n_docs) / (1 + self.doc_freq[term])) + 1
+
+    @timed("top_keywords")
+    def top_keywords(self, book_id: str, top_k: int = 5) -> List[str]:
+        counts = self.book_terms.get(str(book_id))
+        if not counts:
+            return []
+
+        scored = heapq.nlargest(
+            top_k,
+            counts.items(),
+            key=lambda item: item[1] * self.idf(item[0])
+        )
+        return [term for term, _ in scored]
+
+    # ======================
+    # PERSISTENCIA
+    # ======================
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MODEL_FORMAT_VERSION,
+            "n_docs": self.n_docs,
+            "doc_freq": dict(self.doc_freq),
+            "book_terms": {b: dict(c) for b, c in self.book_terms.items()},
+            "last_review_id": self.last_review_id,
+        }
+
+    def load_dict(self, data: dict):
+        """Reemplaza el estado; si `data` no es válido lanza ValueError y no cambia nada."""
+        if not isinstance(data, dict) or data.get("version") != MODEL_FORMAT_VERSION:
+            version = data.get("version") if isinstance(data, dict) else None
+            raise ValueError(f"Unsupported keyword model version: {version}")
+        try:
+            n_docs = int(data["n_docs"])
+            doc_freq = Counter(data["doc_freq"])
+            book_terms = {b: Counter(c) for b, c in data["book_terms"].items()}
+        except (KeyError, TypeError, AttributeError) as exc:
+            raise ValueError(f"Malformed keyword model: {exc!r}") from exc
+
+        self.n_docs = n_docs
+        self.doc_freq = doc_freq
+        self.book_terms = book_terms
+        self.last_review_id = data.get("last_review_id")
+        self.live_ids = set()
+
+    def save(self, path: str):
+        """Escribe el modelo en JSON de forma atómica (archivo temporal + rename)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, path: str):
+        """Reemplaza el estado actual con el modelo guardado en `path`."""
+        with open(path, encoding="utf-8") as f:
+            self.load_dict(json.load(f))
+
+
+keyword_model = KeywordModel()
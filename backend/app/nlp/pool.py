@@ -0,0 +1,346 @@
+# backend/app/nlp/pool.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from .keywords import extract_keywords
+from .sentiment import analyze_sentiment_batch
+
+logger = logging.getLogger(__name__)
+
+# Procesos para el NLP (0 = calcular en el event loop, como antes)
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Peticiones que llegan dentro de esta ventana viajan juntas al pool
+NLP_BATCH_WINDOW_MS = float(os.getenv("NLP_BATCH_WINDOW_MS", "2"))
+# Textos por viaje al pool; un lote lleno se envía sin esperar la ventana
+NLP_BATCH_MAX = int(os.getenv("NLP_BATCH_MAX", "2000"))
+# Por debajo de esto (caracteres y textos en total) es más barato calcular
+# aquí mismo que serializar la petición hacia otro proceso
+NLP_INLINE_MAX_CHARS = int(os.getenv("NLP_INLINE_MAX_CHARS", "2000"))
+NLP_INLINE_MAX_TEXTS = int(os.getenv("NLP_INLINE_MAX_TEXTS", "16"))
+NLP_TIMEOUT = float(os.getenv("NLP_TIMEOUT", "10"))
+# Textos que pueden estar esperando o en proceso antes de responder 503
+NLP_QUEUE_LIMIT = int(os.getenv("NLP_QUEUE_LIMIT", "100000"))
+NLP_RETRY_AFTER = "1"
+# Espera antes de recrear el pool si murió un proceso (OOM, segfault); se
+# duplica con cada caída seguida hasta NLP_RESTART_BACKOFF_MAX
+NLP_RESTART_BACKOFF = float(os.getenv("NLP_RESTART_BACKOFF", "0.5"))
+NLP_RESTART_BACKOFF_MAX = float(os.getenv("NLP_RESTART_BACKOFF_MAX", "30"))
+
+
+def _warm_worker():
+    # Cada proceso hijo arma el léxico compilado una sola vez al arrancar
+    analyze_sentiment_batch(["bueno malo"])
+
+
+def _ping():
+    return os.getpid()
+
+
+def _analyze_batch(texts: List[str]) -> List[Tuple[str, float]]:
+    return analyze_sentiment_batch(texts)
+
+
+def _extract_keywords(texts: List[str], top_k: int) -> List[str]:
+    return extract_keywords(texts, top_k)
+
+
+class NLPPool:
+    """
+    Pool de procesos para el NLP: análisis de sentimiento y extracción de
+    palabras clave (TF-IDF).
+
+    El análisis es CPU puro: dentro de un handler async bloquea el event
+    loop y con él todas las demás peticiones del worker. Aquí se ejecuta en
+    procesos hijos (el GIL no deja que unos hilos sirvan) que calientan el
+    analizador al iniciar.
+
+    Las peticiones concurrentes se juntan: lo que llega dentro de
+    `batch_window_ms` (o hasta `batch_max` textos) viaja en un solo envío al
+    pool y luego el resultado se reparte. Cada espera tiene `timeout`
+    (504) y si quien pidió se cancela (p. ej. el cliente se desconectó) sus
+    textos se descartan si el lote aún no salió. Con demasiados textos
+    pendientes se responde 503 en lugar de encolar sin fin. Las palabras
+    clave no se juntan (TF-IDF se ajusta a cada grupo de textos): cada
+    llamada es un envío.
+
+    Si muere un proceso hijo el executor queda roto para siempre: se
+    descarta y se crea otro al siguiente envío, esperando `restart_backoff`
+    (que crece con cada caída seguida). Solo falla (503) el lote que estaba
+    en proceso; lo que llega mientras tanto espera al pool nuevo.
+    """
+
+    def __init__(
+        self,
+        workers: int = NLP_WORKERS,
+        batch_window_ms: float = NLP_BATCH_WINDOW_MS,
+        batch_max: int = NLP_BATCH_MAX,
+        inline_max_chars: int = NLP_INLINE_MAX_CHARS,
+        inline_max_texts: int = NLP_INLINE_MAX_TEXTS,
+        timeout: float = NLP_TIMEOUT,
+        queue_limit: int = NLP_QUEUE_LIMIT,
+        restart_backoff: float = NLP_RESTART_BACKOFF,
+    ):
+        self.workers = workers
+        self.batch_window = batch_window_ms / 1000
+        self.batch_max = batch_max
+        self.inline_max_chars = inline_max_chars
+        self.inline_max_texts = inline_max_texts
+        self.timeout = timeout
+        self.queue_limit = queue_limit
+        self.restart_backoff = restart_backoff
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # tras una caída no se crea otro executor antes de `_restart_at`
+        self._restart_delay = 0.0
+        self._restart_at = 0.0
+        # (textos, future) esperando el siguiente envío
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_texts = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.in_flight = 0
+        self.batches = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    # ======================
+    # PROCESOS
+    # ======================
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn": el padre ya tiene hilos (Motor, hashing) y hacer fork
+            # con hilos vivos puede dejar locks tomados en el hijo
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """Descarta un executor roto y fija cuándo se puede crear el siguiente."""
+        if self._executor is not executor:
+            return  # otro lote ya lo reemplazó
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self.restarts += 1
+        self._restart_delay = min(
+            max(2 * self._restart_delay, self.restart_backoff), NLP_RESTART_BACKOFF_MAX
+        )
+        self._restart_at = asyncio.get_running_loop().time() + self._restart_delay
+        logger.error("NLP worker process died; restarting the pool in %.1f s", self._restart_delay)
+
+    async def start(self):
+        """Levanta y calienta todos los procesos (hook opcional de arranque)."""
+        if self.workers <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, _ping) for _ in range(self.workers)
+        ])
+
+    def shutdown(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        self._pending_texts = 0
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ======================
+    # LOTES
+    # ======================
+
+    def _schedule_flush(self, delay: float):
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(delay, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        loop = asyncio.get_running_loop()
+        wait = self._restart_at - loop.time()
+        if self._executor is None and wait > 0:
+            # el pool se cayó hace poco: lo pendiente espera al nuevo
+            self._schedule_flush(wait)
+            return
+
+        pending, self._pending = self._pending, []
+        self._pending_texts = 0
+
+        # quienes ya se cancelaron no viajan
+        pending = [(texts, fut) for texts, fut in pending if not fut.done()]
+        if not pending:
+            return
+
+        batch = [text for texts, _ in pending for text in texts]
+        self.batches += 1
+        executor = self._get_executor()
+        try:
+            job = loop.run_in_executor(executor, _analyze_batch, batch)
+        except BrokenProcessPool:
+            # un proceso murió sin lote en curso: este aún no salió, se
+            # reintenta con el pool nuevo
+            self._discard_executor(executor)
+            self._pending = pending + self._pending
+            self._pending_texts += len(batch)
+            self._schedule_flush(self._restart_at - loop.time())
+            return
+        except RuntimeError as exc:  # pool cerrado
+            for _, fut in pending:
+                fut.set_exception(exc)
+            return
+
+        def deliver(done: asyncio.Future):
+            if done.cancelled():
+                for _, fut in pending:
+                    fut.cancel()
+                return
+            exc = done.exception()
+            if isinstance(exc, BrokenProcessPool):
+                self._discard_executor(executor)
+            elif exc is None:
+                self._restart_delay = 0.0
+            results = None if exc else done.result()
+            offset = 0
+            for texts, fut in pending:
+                part = None if exc else results[offset:offset + len(texts)]
+                offset += len(texts)
+                if fut.done():
+                    continue
+                if exc:
+                    fut.set_exception(exc)
+                else:
+                    fut.set_result(part)
+
+        job.add_done_callback(deliver)
+
+    def _submit(self, texts: List[str]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_texts += len(texts)
+
+        if self._pending_texts >= self.batch_max:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush()
+        else:
+            self._schedule_flush(self.batch_window)
+        return future
+
+    # ======================
+    # API
+    # ======================
+
+    def _inline(self, texts: List[str]) -> bool:
+        """Si conviene calcular en el event loop: pocos textos y cortos en total."""
+        return self.workers <= 0 or (
+            len(texts) <= self.inline_max_texts
+            and sum(len(t) for t in texts) <= self.inline_max_chars
+        )
+
+    def _check_capacity(self, n_texts: int):
+        if self.in_flight + n_texts > self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many pending NLP tasks",
+                headers={"Retry-After": NLP_RETRY_AFTER},
+            )
+
+    async def analyze(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Sentimiento de cada texto; mismo resultado que analyze_sentiment_batch."""
+        texts = list(texts)
+        if not texts:
+            return []
+        if self._inline(texts):
+            return analyze_sentiment_batch(texts)
+
+        self._check_capacity(len(texts))
+        self.in_flight += len(texts)
+        future = self._submit(texts)
+        try:
+            # wait_for cancela el future al vencer: si el lote no salió, se descarta
+            return await self._wait(future)
+        finally:
+            self.in_flight -= len(texts)
+
+    async def extract_keywords(self, texts: List[str], top_k: int = 5) -> List[str]:
+        """Mismo resultado que nlp.keywords.extract_keywords, en un proceso hijo."""
+        texts = list(texts)
+        if not texts:
+            return []
+        if self.workers <= 0:
+            return extract_keywords(texts, top_k)
+
+        self._check_capacity(len(texts))
+        self.in_flight += len(texts)
+        try:
+            loop = asyncio.get_running_loop()
+            while True:
+                wait = self._restart_at - loop.time()
+                if self._executor is None and wait > 0:
+                    await asyncio.sleep(wait)  # el pool se cayó hace poco
+                executor = self._get_executor()
+                try:
+                    job = loop.run_in_executor(executor, _extract_keywords, texts, top_k)
+                    break
+                except BrokenProcessPool:
+                    # murió un proceso sin trabajo en curso: se reintenta
+                    self._discard_executor(executor)
+
+            def check_pool(done: asyncio.Future):
+                if done.cancelled():
+                    return
+                exc = done.exception()
+                if isinstance(exc, BrokenProcessPool):
+                    self._discard_executor(executor)
+                elif exc is None:
+                    self._restart_delay = 0.0
+
+            job.add_done_callback(check_pool)
+            return await self._wait(job)
+        finally:
+            self.in_flight -= len(texts)
+
+    async def _wait(self, future: asyncio.Future):
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(status_code=504, detail="NLP task timed out")
+        except BrokenProcessPool:
+            raise HTTPException(
+                status_code=503,
+                detail="NLP worker crashed",
+                headers={"Retry-After": NLP_RETRY_AFTER},
+            )
+
+    async def analyze_one(self, text: str) -> Tuple[str, float]:
+        return (await self.analyze([text]))[0]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "batches": self.batches,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+
+nlp_pool = NLPPool()
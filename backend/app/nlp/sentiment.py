@@ -1,4 +1,11 @@
-from typing import Tuple
+import hashlib
+import json
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from unidecode import unidecode
+
+from ..metrics import timed
 
 POSITIVE_WORDS = {
     "bueno", "buenísimo", "genial", "excelente", "maravilloso",
@@ -11,26 +18,98 @@ NEGATIVE_WORDS = {
     "tedioso", "feo", "decepcionante", "confuso", "oscuro"
 }
 
+WORD_RE = re.compile(r"[a-z0-9]+")
 
-def analyze_sentiment(text: str) -> Tuple[str, float]:
-    text_lower = text.lower()
+# Límite del memo de tokens (el texto de los usuarios es arbitrario)
+MAX_TOKEN_CACHE = 200_000
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin acentos: 'Increíble' -> 'increible'."""
+    return unidecode(text).lower()
+
+
+class SentimentAnalyzer:
+    """
+    Analizador de sentimiento por léxico, compilado una sola vez.
+
+    El léxico se guarda normalizado (sin acentos) en una tabla hash y cada
+    texto se recorre una sola vez separándolo en tokens, así que el costo ya
+    no crece con el tamaño del léxico y "malo" no coincide dentro de "malon".
+
+    Como el vocabulario real es pequeño, cada token crudo ("Increíble,")
+    se normaliza una sola vez y se memoriza qué palabras del léxico contiene.
+
+    `version` es un hash del léxico normalizado: cambia sola cuando se
+    editan las listas de palabras y se guarda en cada reseña calificada.
+    """
+
+    def __init__(self, positive: Iterable[str], negative: Iterable[str]):
+        self.lexicon: Dict[str, int] = {fold(w): 1 for w in positive}
+        self.lexicon.update({fold(w): -1 for w in negative})
+        self._token_hits: Dict[str, Tuple[str, ...]] = {}
+        data = json.dumps(sorted(self.lexicon.items()), separators=(",", ":"))
+        self.version = hashlib.blake2b(data.encode(), digest_size=6).hexdigest()
 
-    pos_count = sum(word in text_lower for word in POSITIVE_WORDS)
-    neg_count = sum(word in text_lower for word in NEGATIVE_WORDS)
+    def _hits_for(self, token: str) -> Tuple[str, ...]:
+        hits = tuple(w for w in WORD_RE.findall(fold(token)) if w in self.lexicon)
+        if len(self._token_hits) >= MAX_TOKEN_CACHE:
+            self._token_hits.clear()
+        self._token_hits[token] = hits
+        return hits
 
-    score = pos_count - neg_count
+    def analyze(self, text: str) -> Tuple[str, float]:
+        get_hits = self._token_hits.get
+        found = None
 
-    if score > 0:
-        label = "positive"
-    elif score < 0:
-        label = "negative"
-    else:
-        label = "neutral"
+        for token in text.lower().split():
+            hits = get_hits(token)
+            if hits is None:
+                hits = self._hits_for(token)
+            if hits:
+                if found is None:
+                    found = set()
+                found.update(hits)
+
+        # Cada palabra del léxico cuenta una sola vez, como antes
+        if found:
+            pos_count = sum(1 for w in found if self.lexicon[w] > 0)
+            neg_count = len(found) - pos_count
+        else:
+            pos_count = neg_count = 0
+
+        score = pos_count - neg_count
+
+        if score > 0:
+            label = "positive"
+        elif score < 0:
+            label = "negative"
+        else:
+            label = "neutral"
+
+        total_hits = pos_count + neg_count
+        if total_hits > 0:
+            norm_score = score / total_hits
+        else:
+            norm_score = 0.0
+
+        return label, float(norm_score)
+
+    def analyze_batch(self, texts: Iterable[str]) -> List[Tuple[str, float]]:
+        analyze = self.analyze
+        return [analyze(text) for text in texts]
+
+
+_analyzer = SentimentAnalyzer(POSITIVE_WORDS, NEGATIVE_WORDS)
+LEXICON_VERSION = _analyzer.version
+
+
+@timed("analyze_sentiment")
+def analyze_sentiment(text: str) -> Tuple[str, float]:
+    return _analyzer.analyze(text)
 
-    total_hits = pos_count + neg_count
-    if total_hits > 0:
-        norm_score = score / total_hits
-    else:
-        norm_score = 0.0
 
-    return label, float(norm_score)
+@timed("analyze_sentiment_batch")
+def analyze_sentiment_batch(texts: Iterable[str]) -> List[Tuple[str, float]]:
+    """Analiza muchas reseñas en una sola llamada (mismo resultado que una por una)."""
+    return _analyzer.analyze_batch(texts)
@@ -0,0 +1,139 @@
+# backend/app/pagination.py
+
+import base64
+import binascii
+import json
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _json_default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_json(content) -> bytes:
+    """
+    JSON compacto en bytes, con orjson si está instalado.
+
+    Las rutas de listas pasan dicts simples (ya proyectados desde Mongo),
+    sin crear un modelo de Pydantic por documento ni volver a validarlo
+    con `response_model`; los modelos sueltos también se aceptan.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default)
+    return json.dumps(
+        content, default=_json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def json_response(content, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(dump_json(content), media_type="application/json", headers=headers)
+
+
+def encode_cursor(last_id: ObjectId) -> str:
+    """Cursor opaco para el cliente: los 12 bytes del último _id en base64url."""
+    return base64.urlsafe_b64encode(last_id.binary).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return ObjectId(raw)
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Dict[str, int]]:
+    """`fields=title,author` -> proyección de Mongo (None = todos los campos)."""
+    if not fields:
+        return None
+
+    allowed = set(allowed)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    return {f: 1 for f in requested}
+
+
+def projected(to_dict: Callable, projection: Optional[Dict[str, int]]) -> Callable:
+    """
+    `to_dict` que deja solo `id` y los campos de `projection`: un campo que
+    no se pidió no aparece, en lugar de salir con un valor por defecto que
+    el cliente no podría distinguir de uno real.
+    """
+    if not projection:
+        return to_dict
+    keep = set(projection) | {"id"}
+    return lambda doc: {k: v for k, v in to_dict(doc).items() if k in keep}
+
+
+def check_limit(limit: Optional[int]):
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+
+def keyset_find(collection, query: dict, projection: Optional[dict],
+                after: Optional[str], limit: Optional[int]):
+    """
+    Cursor de Motor ordenado por _id que empieza después de `after`.
+
+    Paginar por _id (en lugar de skip) mantiene cada página en O(limit)
+    usando el índice de _id, sin importar qué tan lejos esté la página.
+    """
+    query = dict(query)
+    if after:
+        query["_id"] = {"$gt": decode_cursor(after)}
+
+    cursor = collection.find(query, projection).sort("_id", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+
+async def fetch_page(cursor, to_out: Callable, limit: Optional[int]) -> Tuple[list, Optional[str]]:
+    """Lee una página y devuelve (items, cursor de la siguiente página)."""
+    items = []
+    last_id = None
+    async for doc in cursor:
+        items.append(to_out(doc))
+        last_id = doc["_id"]
+
+    next_cursor = None
+    if limit and len(items) == limit:
+        next_cursor = encode_cursor(last_id)
+    return items, next_cursor
+
+
+def stream_json_array(cursor, to_dict: Callable) -> StreamingResponse:
+    """
+    Escribe un arreglo JSON elemento por elemento conforme el cursor de
+    Motor entrega documentos, así la memoria no depende del tamaño total.
+    """
+    async def body():
+        yield b"["
+        first = True
+        async for doc in cursor:
+            chunk = dump_json(to_dict(doc))
+            yield chunk if first else b"," + chunk
+            first = False
+        yield b"]"
+
+    return StreamingResponse(body(), media_type="application/json")
@@ -1,7 +1,7 @@
 # backend/app/quiz.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from .auth import get_current_user
+from .auth import get_current_user, invalidate_user
 from .database import users_collection
 from .schemas import QuizAnswers, QuizOut
 
@@ -19,6 +19,9 @@ async def save_quiz(
         {"_id": user["_id"]},
         {"$set": {"quiz": quiz_dict}}
     )
+    # El cache de /recommend/by-quiz va por huella del quiz, no por usuario:
+    # con el documento nuevo el usuario ya pide la huella nueva
+    invalidate_user(user["_id"])
 
     return QuizOut(
         user_id=str(user["_id"]),
@@ -0,0 +1,87 @@
+# backend/app/recommend_cache.py
+#
+# Cache de GET /recommend/by-quiz.
+#
+# El ranking solo depende del quiz y del catálogo, y muchos usuarios
+# responden lo mismo, así que la llave no es el usuario sino la huella del
+# quiz normalizado junto con la versión del catálogo (crear un libro la
+# incrementa y las entradas viejas dejan de usarse hasta que el LRU las
+# desaloja). Cambiar el quiz no borra nada: el usuario simplemente pasa a
+# pedir otra huella. Se guarda el JSON ya serializado.
+#
+# Si llegan varias peticiones con la misma llave antes de que esté lista,
+# solo la primera calcula el ranking y las demás esperan su resultado.
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Awaitable, Callable, Dict, Hashable, List
+
+from . import response_cache
+from .cache import TTLCache
+from .pagination import dump_json
+
+QUIZ_CACHE_ENTRIES = int(os.getenv("QUIZ_CACHE_ENTRIES", "20000"))
+QUIZ_CACHE_BYTES = int(os.getenv("QUIZ_CACHE_BYTES", str(16 * 1024 * 1024)))
+# Otros procesos pueden insertar libros sin incrementar nuestra versión
+QUIZ_CACHE_TTL = float(os.getenv("QUIZ_CACHE_TTL", "300"))
+
+quiz_cache = TTLCache(
+    maxsize=QUIZ_CACHE_ENTRIES,
+    ttl=QUIZ_CACHE_TTL,
+    max_bytes=QUIZ_CACHE_BYTES,
+)
+_in_flight: Dict[Hashable, "asyncio.Task[bytes]"] = {}
+
+
+def quiz_fingerprint(genre: str, keywords: List[str]) -> str:
+    """
+    Huella de las respuestas que afectan al ranking.
+
+    El puntaje es una suma sobre las palabras clave, así que su orden no
+    importa (las repetidas sí: cuentan dos veces). `action_level` no
+    interviene en el ranking y queda fuera para no partir el cache.
+    """
+    normalized = [genre.lower(), sorted(k.lower() for k in keywords)]
+    data = json.dumps(normalized, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+async def _fill(key, compute: Callable[[], Awaitable[list]]) -> bytes:
+    version = key[0]
+    body = dump_json(await compute())
+    # si el catálogo cambió mientras calculábamos, no se guarda
+    if version == response_cache.catalog_version:
+        quiz_cache.set(key, body, size=len(body))
+    return body
+
+
+async def cached_recommendations(
+    genre: str,
+    keywords: List[str],
+    compute: Callable[[], Awaitable[list]],
+) -> bytes:
+    """
+    Cuerpo JSON de las recomendaciones para este quiz.
+
+    `compute` es una corrutina que devuelve el ranking; corre una sola vez
+    por llave aunque haya peticiones concurrentes, y si lanza una excepción
+    todas la reciben y no se cachea nada.
+    """
+    key = (response_cache.catalog_version, quiz_fingerprint(genre, keywords))
+    body = quiz_cache.get(key)
+    if body is not None:
+        return body
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fill(key, compute))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # si cancelan a quien lo pidió primero, los demás siguen esperando
+    return await asyncio.shield(task)
+
+
+def stats() -> dict:
+    return {**quiz_cache.stats(), "in_flight": len(_in_flight)}
@@ -1,41 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from .admission import recommend_limiter
 from .auth import get_current_user
-from .database import books_collection
-from .schemas import RecommendationOut
+from .book_index import book_index
+from .collaborative import item_similarity_index
+from .pagination import check_limit
+from .recommend_cache import cached_recommendations
+from .schemas import RecommendationOut, SimilarBookOut
 
 router = APIRouter(prefix="/recommend", tags=["Recommendations"])
 
 
-@router.get("/by-quiz", response_model=list[RecommendationOut])
+@router.get(
+    "/by-quiz", response_model=list[RecommendationOut],
+    dependencies=[Depends(recommend_limiter.slot)],
+)
 async def recommend_by_quiz(user=Depends(get_current_user)):
     quiz = user.get("quiz")
     if not quiz:
         raise HTTPException(status_code=400, detail="User has no quiz results")
 
     genre_pref = quiz["favorite_genre"].lower()
-    action_level = quiz["action_level"]
     keywords = [k.lower() for k in quiz["keywords"]]
 
-    books = await books_collection.find({}).to_list(None)
-    recommendations = []
-
-    for book in books:
-        score = 0
-        desc = (book.get("description") or "").lower()
-
-        if genre_pref in desc:
-            score += 3
-
-        for kw in keywords:
-            if kw in desc:
-                score += 2
-
-        if score > 0:
-            recommendations.append({
-                "book_id": str(book["_id"]),
-                "title": book["title"],
-                "score": score
-            })
-
-    recommendations.sort(key=lambda x: x["score"], reverse=True)
-    return recommendations[:10]
+    async def compute():
+        # Solo se revisan los libros que comparten algún término con el quiz
+        await book_index.ensure_built()
+        return book_index.recommend(genre_pref, keywords, limit=10)
+
+    # Compartido entre todos los usuarios con las mismas respuestas
+    body = await cached_recommendations(genre_pref, keywords, compute)
+    return Response(body, media_type="application/json")
+
+
+@router.get(
+    "/by-history", response_model=list[SimilarBookOut],
+    dependencies=[Depends(recommend_limiter.slot)],
+)
+async def recommend_by_history(limit: int = 10, user=Depends(get_current_user)):
+    """
+    Libros parecidos (según quién más los reseñó) a los que el usuario ya
+    reseñó, pesando cada uno por el sentimiento de su reseña. Vacío si
+    todavía no reseñó ninguno.
+    """
+    check_limit(limit)
+    await item_similarity_index.ensure_built()
+    return [
+        {**rec, "title": book_index.title(rec["book_id"]) or ""}
+        for rec in item_similarity_index.recommend(user["username"], limit=limit)
+    ]
@@ -0,0 +1,124 @@
+# backend/app/rescore.py
+#
+# Vuelve a calificar el sentimiento de las reseñas guardadas cuando cambia
+# el léxico (POSITIVE_WORDS / NEGATIVE_WORDS).
+#
+# Recorre `reviews_collection` en orden de _id con un cursor por lotes,
+# califica cada lote y reescribe con `bulk_write` solo las reseñas cuyo
+# resultado cambió. Todas quedan marcadas con `sentiment_version` (la
+# versión del léxico que las calificó): a las que quedan igual solo se les
+# pone la marca, con un único UpdateMany por lote.
+#
+# Después de cada lote se guarda en `jobs_collection` el último _id
+# procesado: si el proceso se cae, la siguiente corrida con la misma
+# versión del léxico sigue desde ahí; con otra versión empieza de cero.
+# El ritmo se limita a `ops_per_sec` reseñas leídas por segundo para no
+# competir con el tráfico normal.
+#
+# Los resúmenes por libro y el índice de /recommend/by-history dependen del
+# sentimiento: hay que reconstruirlos después (ver rescore_reviews.py).
+
+import asyncio
+import logging
+import os
+from typing import Callable, Iterable, List, Tuple
+
+from pymongo import UpdateMany, UpdateOne
+
+from .database import jobs_collection, reviews_collection
+from .nlp.sentiment import LEXICON_VERSION, analyze_sentiment_batch
+
+logger = logging.getLogger(__name__)
+
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "1000"))
+# Reseñas leídas por segundo como máximo (0 = sin límite)
+RESCORE_OPS_PER_SEC = float(os.getenv("RESCORE_OPS_PER_SEC", "5000"))
+RESCORE_JOB_ID = "rescore_sentiment"
+
+Analyzer = Callable[[Iterable[str]], List[Tuple[str, float]]]
+
+
+async def rescore_reviews(
+    batch_size: int = RESCORE_BATCH_SIZE,
+    ops_per_sec: float = RESCORE_OPS_PER_SEC,
+    version: str = LEXICON_VERSION,
+    analyze: Analyzer = analyze_sentiment_batch,
+) -> dict:
+    """
+    Corre (o retoma) el re-scoring para `version`. Devuelve el estado del
+    trabajo: último _id, reseñas leídas y cambiadas, y si terminó.
+    """
+    state = await jobs_collection.find_one({"_id": RESCORE_JOB_ID})
+    if state is None or state.get("version") != version:
+        state = {
+            "_id": RESCORE_JOB_ID, "version": version, "last_id": None,
+            "scanned": 0, "changed": 0, "done": False,
+        }
+    if state["done"]:
+        return state
+    if state["last_id"] is not None:
+        logger.info("Resuming rescore %s after %s", version, state["last_id"])
+
+    # Las pendientes las califica review_pipeline con el léxico actual
+    query = {"enrichment": {"$exists": False}, "sentiment_version": {"$ne": version}}
+    if state["last_id"] is not None:
+        query["_id"] = {"$gt": state["last_id"]}
+    cursor = reviews_collection.find(
+        query, {"text": 1, "sentiment_label": 1, "sentiment_score": 1}
+    ).sort("_id", 1).batch_size(batch_size)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    read = 0
+    batch = []
+    async for review in cursor:
+        batch.append(review)
+        if len(batch) < batch_size:
+            continue
+
+        await _rescore_batch(batch, state, analyze)
+        read += len(batch)
+        batch = []
+        if ops_per_sec > 0:
+            ahead = started + read / ops_per_sec - loop.time()
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+    if batch:
+        await _rescore_batch(batch, state, analyze)
+
+    state["done"] = True
+    await jobs_collection.replace_one({"_id": RESCORE_JOB_ID}, state, upsert=True)
+    logger.info("Rescore %s done: %d reviews read, %d changed",
+                version, state["scanned"], state["changed"])
+    return state
+
+
+async def _rescore_batch(batch: List[dict], state: dict, analyze: Analyzer):
+    sentiments = analyze([review.get("text", "") for review in batch])
+
+    ops, unchanged = [], []
+    for review, (label, score) in zip(batch, sentiments):
+        if review.get("sentiment_label") == label and review.get("sentiment_score") == score:
+            unchanged.append(review["_id"])
+            continue
+        ops.append(UpdateOne(
+            {"_id": review["_id"], "enrichment": {"$exists": False}},
+            {"$set": {"sentiment_label": label, "sentiment_score": score,
+                      "sentiment_version": state["version"]}},
+        ))
+    changed = len(ops)
+    if unchanged:
+        ops.append(UpdateMany(
+            {"_id": {"$in": unchanged}, "enrichment": {"$exists": False}},
+            {"$set": {"sentiment_version": state["version"]}},
+        ))
+    if ops:
+        await reviews_collection.bulk_write(ops, ordered=False)
+
+    # Si el proceso muere antes de esto, el lote se repite: ya no hay nada
+    # que cambiar en las que se escribieron
+    state["last_id"] = batch[-1]["_id"]
+    state["scanned"] += len(batch)
+    state["changed"] += changed
+    await jobs_collection.replace_one({"_id": RESCORE_JOB_ID}, state, upsert=True)
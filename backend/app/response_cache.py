@@ -0,0 +1,86 @@
+# backend/app/response_cache.py
+#
+# Cache de respuestas del catálogo (GET /books y GET /books/{id}).
+#
+# Se guarda el cuerpo JSON ya serializado junto con su ETag, así que un
+# acierto no toca Mongo ni Pydantic. Las llaves llevan la versión del
+# catálogo: crear un libro la incrementa y vacía el cache. El ETag es un
+# hash del cuerpo, igual en todos los procesos que sirvan el mismo
+# contenido, de modo que `If-None-Match` funciona detrás del balanceador.
+
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from .cache import TTLCache
+from .pagination import dump_json
+
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "50000"))
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+# Otros procesos pueden insertar libros sin avisarnos: ninguna entrada vive
+# más que esto
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+# max-age para navegadores y CDN
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "60"))
+
+CACHE_CONTROL = f"public, max-age={CATALOG_MAX_AGE}"
+
+catalog_cache = TTLCache(
+    maxsize=RESPONSE_CACHE_ENTRIES,
+    ttl=RESPONSE_CACHE_TTL,
+    max_bytes=RESPONSE_CACHE_BYTES,
+)
+catalog_version = 0
+
+
+def invalidate_catalog():
+    """Llamar cada vez que cambia el catálogo de libros."""
+    global catalog_version
+    catalog_version += 1
+    catalog_cache.clear()
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    tags = (t.strip() for t in if_none_match.split(","))
+    return etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+async def cached_json(
+    request: Request,
+    key: Hashable,
+    build: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]],
+) -> Response:
+    """
+    Respuesta JSON cacheada para `key`.
+
+    `build` es una corrutina que devuelve (contenido para `dump_json`,
+    headers propios de la respuesta, p. ej. el cursor de la siguiente
+    página). Si lanza HTTPException no se cachea nada.
+    """
+    key = (catalog_version, key)
+    entry = catalog_cache.get(key)
+    if entry is None:
+        version = catalog_version
+        content, extra = await build()
+        body = dump_json(content)
+        entry = (body, make_etag(body), extra)
+        # si el catálogo cambió mientras consultábamos, no se guarda
+        if version == catalog_version:
+            catalog_cache.set(key, entry, size=len(body))
+
+    body, etag, extra = entry
+    response_headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, **extra}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=response_headers)
+    return Response(body, media_type="application/json", headers=response_headers)
@@ -0,0 +1,310 @@
+# backend/app/review_pipeline.py
+
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+from .collaborative import item_similarity_index
+from .database import acquire_lease, release_lease, reviews_collection
+from .nlp.pool import nlp_pool
+from .nlp.sentiment import LEXICON_VERSION
+from .summaries import record_reviews_bulk
+
+logger = logging.getLogger(__name__)
+
+# Estado de una reseña guardada que aún no pasa por el NLP. El campo
+# `enrichment` solo existe mientras está pendiente (índice disperso).
+PENDING = "pending"
+# Reclamada por un worker (`claimed_by`) hasta `claim_expires`
+PROCESSING = "processing"
+
+# Tareas que procesan la cola (0 = procesar dentro de la petición, como antes)
+REVIEW_PIPELINE_WORKERS = int(os.getenv("REVIEW_PIPELINE_WORKERS", "2"))
+REVIEW_QUEUE_SIZE = int(os.getenv("REVIEW_QUEUE_SIZE", "10000"))
+REVIEW_BATCH_SIZE = int(os.getenv("REVIEW_BATCH_SIZE", "500"))
+REVIEW_DRAIN_TIMEOUT = float(os.getenv("REVIEW_DRAIN_TIMEOUT", "10"))
+REVIEW_RETRY_AFTER = "1"
+# Segundos que un worker es dueño de las reseñas que reclamó; pasado ese
+# tiempo (p. ej. porque el proceso murió) otro puede volver a tomarlas
+REVIEW_CLAIM_LEASE = float(os.getenv("REVIEW_CLAIM_LEASE", "300"))
+# Margen antes del vencimiento a partir del cual ya no se confía en el reclamo
+REVIEW_CLAIM_MARGIN = 5.0
+RECOVERY_JOB_ID = "review_recovery"
+
+
+class ReviewPipeline:
+    """
+    Post-proceso de reseñas fuera del camino de escritura.
+
+    `create_review` guarda la reseña con `enrichment: "pending"` y la deja
+    en una cola de asyncio. Cada worker toma lo que haya en la cola (hasta
+    `batch_size`), calcula el sentimiento de todo el lote en una llamada al
+    pool de NLP, lo aplica con un solo `bulk_write` y actualiza los
+    resúmenes. Los lotes se forman solos: lo que llega mientras se procesa
+    uno viaja en el siguiente.
+
+    Varios procesos (workers de uvicorn) pueden ver la misma reseña: la que
+    encoló `submit` y la que encuentra `recover`. Antes del NLP cada lote se
+    reclama con un `update_many` condicionado a `enrichment: "pending"`, que
+    es atómico por documento, así que cada reseña la procesa un solo dueño y
+    solo ese actualiza resúmenes e índice de /recommend/by-history.
+
+    - Contrapresión: con la cola llena se responde 503 antes de escribir.
+    - Al apagar se espera a vaciar la cola (`drain`) hasta un límite.
+    - Al arrancar `recover` vuelve a encolar las que quedaron pendientes;
+      solo lo hace el proceso que obtiene el lease en `jobs_collection`.
+    """
+
+    def __init__(
+        self,
+        workers: int = REVIEW_PIPELINE_WORKERS,
+        queue_size: int = REVIEW_QUEUE_SIZE,
+        batch_size: int = REVIEW_BATCH_SIZE,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+        self.batches = 0
+        self.rejected = 0
+
+    # ======================
+    # ESCRITURA
+    # ======================
+
+    def check_capacity(self):
+        """Llamar antes de insertar: 503 si la cola ya no tiene lugar."""
+        if self.workers > 0 and self.queue.full():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many reviews waiting to be processed",
+                headers={"Retry-After": REVIEW_RETRY_AFTER},
+            )
+
+    async def submit(self, review: dict):
+        """
+        Encola una reseña ya insertada. Sin workers se procesa aquí mismo y
+        `review` sale con su sentimiento calculado.
+        """
+        if self.workers <= 0:
+            await self._process([review])
+            return
+        try:
+            self.queue.put_nowait(review)
+        except asyncio.QueueFull:
+            # Otra petición ocupó el lugar mientras insertábamos; queda
+            # pendiente en la base y `recover` la toma al reiniciar
+            logger.warning("Review queue full; review %s left pending", review["_id"])
+
+    # ======================
+    # PROCESO
+    # ======================
+
+    async def _claim(self, reviews: List[dict]):
+        """
+        Marca como propias las reseñas aún pendientes (o cuyo reclamo
+        venció) y devuelve el token del reclamo, su vencimiento y las
+        reseñas obtenidas. Las que ya tomó otro proceso quedan fuera.
+        """
+        token = str(ObjectId())
+        now = time.time()
+        expires = now + REVIEW_CLAIM_LEASE
+        ids = [r["_id"] for r in reviews]
+        await reviews_collection.update_many(
+            {"_id": {"$in": ids},
+             "$or": [{"enrichment": PENDING},
+                     {"enrichment": PROCESSING, "claim_expires": {"$lt": now}}]},
+            {"$set": {"enrichment": PROCESSING, "claimed_by": token, "claim_expires": expires}},
+        )
+        mine = {
+            doc["_id"] async for doc in
+            reviews_collection.find({"_id": {"$in": ids}, "claimed_by": token}, {"_id": 1})
+        }
+        return token, expires, [r for r in reviews if r["_id"] in mine]
+
+    async def _release_claim(self, token: str):
+        """Devuelve a pendiente lo reclamado con `token` (el lote falló)."""
+        await reviews_collection.update_many(
+            {"claimed_by": token},
+            {"$set": {"enrichment": PENDING}, "$unset": {"claimed_by": "", "claim_expires": ""}},
+        )
+
+    async def _process(self, reviews: List[dict]):
+        token, expires, reviews = await self._claim(reviews)
+        if not reviews:
+            return
+
+        # Si algo falla antes de terminar, lo que sigue siendo nuestro
+        # vuelve a pendiente en lugar de esperar a que venza el reclamo
+        try:
+            sentiments = await nlp_pool.analyze([r["text"] for r in reviews])
+            finished = await self._write(token, expires, reviews, sentiments)
+            await record_reviews_bulk(finished)
+            item_similarity_index.add_reviews(finished)
+        except BaseException:
+            await asyncio.shield(self._release_claim(token))
+            raise
+
+        self.processed += len(finished)
+        self.batches += 1
+
+    async def _write(self, token: str, expires: float, reviews: List[dict],
+                     sentiments: List[tuple]) -> List[dict]:
+        """
+        Guarda el sentimiento de las reseñas que siguen reclamadas con
+        `token` y devuelve esas reseñas ya actualizadas.
+        """
+        updates = [
+            ({"_id": review["_id"], "claimed_by": token},
+             {"$set": {"sentiment_label": label, "sentiment_score": score,
+                       "sentiment_version": LEXICON_VERSION},
+              "$unset": {"enrichment": "", "claimed_by": "", "claim_expires": ""}})
+            for review, (label, score) in zip(reviews, sentiments)
+        ]
+
+        done = None
+        if time.time() < expires - REVIEW_CLAIM_MARGIN:
+            # Nadie toma un reclamo vigente: todas las escrituras aplican
+            result = await reviews_collection.bulk_write(
+                [UpdateOne(query, update) for query, update in updates], ordered=False
+            )
+            if result.matched_count == len(updates):
+                done = [True] * len(updates)
+        if done is None:
+            # El reclamo venció (o no cuadra la cuenta): una por una, para
+            # saber cuáles siguen siendo nuestras
+            results = await asyncio.gather(*(
+                reviews_collection.update_one(query, update) for query, update in updates
+            ))
+            done = [r.matched_count == 1 for r in results]
+
+        finished = []
+        for review, (label, score), ok in zip(reviews, sentiments, done):
+            if not ok:
+                continue
+            review["sentiment_label"] = label
+            review["sentiment_score"] = score
+            review.pop("enrichment", None)
+            finished.append(review)
+        if len(finished) < len(reviews):
+            logger.warning("Lost the claim on %d reviews; another worker processed them",
+                           len(reviews) - len(finished))
+        return finished
+
+    async def _worker(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            try:
+                await self._process(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # `_process` ya las devolvió a pendientes en la base: se
+                # reintentan con `recover`
+                self.failed += len(batch)
+                logger.exception("Failed to process %d reviews", len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    # ======================
+    # CICLO DE VIDA
+    # ======================
+
+    def start(self):
+        for _ in range(self.workers - len(self._tasks)):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def recover(self) -> int:
+        """
+        Vuelve a encolar las reseñas que quedaron pendientes (tras un
+        reinicio) y las reclamadas por un proceso que murió. Las que tienen
+        un reclamo aún vigente se vuelven a revisar cuando vence.
+        """
+        if self.workers <= 0:
+            return 0
+        # Solo un proceso recupera a la vez
+        token = await acquire_lease(RECOVERY_JOB_ID, REVIEW_CLAIM_LEASE)
+        if token is None:
+            return 0
+
+        try:
+            count = 0
+            now = time.time()
+            retry_at, held = None, []
+            cursor = reviews_collection.find(
+                {"enrichment": {"$in": [PENDING, PROCESSING]}},
+                {"book_id": 1, "username": 1, "text": 1, "enrichment": 1, "claim_expires": 1},
+            ).sort("_id", 1)
+            async for review in cursor:
+                expires = review.get("claim_expires", 0)
+                if review["enrichment"] == PROCESSING and expires >= now:
+                    retry_at = max(retry_at or expires, expires)
+                    held.append(review["_id"])
+                    continue
+                await self.queue.put(review)  # espera si la cola está llena
+                count += 1
+        finally:
+            await release_lease(RECOVERY_JOB_ID, token)
+
+        if held:
+            # Si su dueño sigue vivo ya las habrá terminado; si no, el
+            # reclamo venció y `_claim` las vuelve a tomar. La espera puede
+            # durar tanto como el lease, así que se suelta y se vuelve a
+            # tomar después; si lo tiene otro proceso, él las encuentra.
+            await asyncio.sleep(retry_at - time.time() + 0.01)
+            token = await acquire_lease(RECOVERY_JOB_ID, REVIEW_CLAIM_LEASE)
+            if token is not None:
+                try:
+                    cursor = reviews_collection.find(
+                        {"_id": {"$in": held}, "enrichment": PROCESSING},
+                        {"book_id": 1, "username": 1, "text": 1, "enrichment": 1},
+                    )
+                    async for review in cursor:
+                        await self.queue.put(review)
+                        count += 1
+                finally:
+                    await release_lease(RECOVERY_JOB_ID, token)
+
+        if count:
+            logger.info("Re-enqueued %d pending reviews", count)
+        return count
+
+    async def drain(self, timeout: Optional[float] = REVIEW_DRAIN_TIMEOUT):
+        """Espera a que se vacíe la cola (hasta `timeout`) y detiene los workers."""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Review queue not drained; %d reviews left pending",
+                           self.queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "processed": self.processed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "rejected": self.rejected,
+        }
+
+
+review_pipeline = ReviewPipeline()
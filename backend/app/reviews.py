@@ -1,13 +1,48 @@
-from typing import List
+import asyncio
+import logging
+import os
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 
-from .database import books_collection, reviews_collection
-from .schemas import ReviewCreate, ReviewOut
-from .nlp.sentiment import analyze_sentiment
+from .database import acquire_lease, books_collection, release_lease, reviews_collection
+from .schemas import (
+    ReviewCreate, ReviewOut, SentimentBatchIn, SentimentOut,
+    BulkReviewsIn, BulkReviewsOut, BulkReviewError,
+)
+from .nlp.pool import nlp_pool
+from .nlp.keywords import KeywordModel, keyword_model
+from .nlp.sentiment import LEXICON_VERSION
+from .summaries import record_reviews_bulk
+from .collaborative import item_similarity_index
+from .review_pipeline import PENDING, review_pipeline
+from .pagination import (
+    NEXT_CURSOR_HEADER, check_limit, fetch_page, json_response, keyset_find,
+    parse_fields, projected, stream_json_array,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/books", tags=["Reviews"])
 
+# Rutas sobre reseñas que no cuelgan de un libro concreto
+batch_router = APIRouter(prefix="/reviews", tags=["Reviews"])
+
+MAX_ANALYZE_BATCH = 10_000
+MAX_BULK_REVIEWS = 10_000
+BULK_INSERT_CHUNK = 1000
+
+# Archivo donde se guarda el modelo de palabras clave entre reinicios (por
+# defecto en backend/, sin importar desde dónde se arranque)
+KEYWORD_MODEL_PATH = os.getenv(
+    "KEYWORD_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "keyword_model.json"),
+)
+KEYWORD_MODEL_LEASE = "keyword_model_save"
+# Cada cuántos segundos se pone al día el modelo con las reseñas de otros workers
+KEYWORD_MODEL_CATCH_UP = float(os.getenv("KEYWORD_MODEL_CATCH_UP", "60"))
+
 
 def object_id_or_404(id_str: str) -> ObjectId:
     try:
@@ -26,36 +61,223 @@ def document_to_review_out(doc) -> ReviewOut:
     )
 
 
+def document_to_review_dict(doc) -> dict:
+    """Igual que document_to_review_out, sin pasar por Pydantic (rutas de listas)."""
+    return {
+        "username": doc.get("username"),
+        "text": doc.get("text", ""),
+        "id": str(doc["_id"]),
+        "sentiment_label": doc.get("sentiment_label", "neutral"),
+        "sentiment_score": float(doc.get("sentiment_score", 0.0)),
+    }
+
+
 @router.post("/{book_id}/reviews", response_model=ReviewOut)
 async def create_review(book_id: str, review: ReviewCreate):
+    """
+    Guarda la reseña y responde de inmediato con `sentiment_label:
+    "pending"`; el sentimiento y el resumen del libro los completa
+    review_pipeline en segundo plano.
+    """
     book_oid = object_id_or_404(book_id)
 
     book = await books_collection.find_one({"_id": book_oid})
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    label, score = analyze_sentiment(review.text)
+    review_pipeline.check_capacity()
 
     new_review = {
         "book_id": book_oid,
         "username": review.username,
         "text": review.text,
-        "sentiment_label": label,
-        "sentiment_score": score,
+        "sentiment_label": PENDING,
+        "sentiment_score": 0.0,
+        "enrichment": PENDING,
     }
 
     result = await reviews_collection.insert_one(new_review)
     new_review["_id"] = result.inserted_id
 
+    keyword_model.add_live_review(book_oid, review.text, result.inserted_id)
+    await review_pipeline.submit(new_review)
+
     return document_to_review_out(new_review)
 
 
+REVIEW_FIELDS = ("username", "text", "sentiment_label", "sentiment_score")
+
+
 @router.get("/{book_id}/reviews", response_model=List[ReviewOut])
-async def list_reviews(book_id: str):
+async def list_reviews(
+    book_id: str,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+):
+    """Reseñas de un libro; mismos parámetros de paginación que GET /books."""
     book_oid = object_id_or_404(book_id)
+    check_limit(limit)
+    projection = parse_fields(fields, REVIEW_FIELDS)
+    to_dict = projected(document_to_review_dict, projection)
+    cursor = keyset_find(reviews_collection, {"book_id": book_oid}, projection, after, limit)
+
+    if stream:
+        return stream_json_array(cursor, to_dict)
+
+    reviews, next_cursor = await fetch_page(cursor, to_dict, limit)
+    return json_response(reviews, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+
+@batch_router.post("/analyze", response_model=List[SentimentOut])
+async def analyze_reviews(payload: SentimentBatchIn):
+    if len(payload.texts) > MAX_ANALYZE_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many texts (max {MAX_ANALYZE_BATCH})"
+        )
+
+    return [
+        SentimentOut(sentiment_label=label, sentiment_score=score)
+        for label, score in await nlp_pool.analyze(payload.texts)
+    ]
+
+
+@batch_router.post("/bulk", response_model=BulkReviewsOut)
+async def create_reviews_bulk(payload: BulkReviewsIn):
+    """
+    Inserta muchas reseñas (de uno o varios libros) en una sola llamada.
+
+    Se valida la existencia de todos los libros con una sola consulta `$in`,
+    el sentimiento se calcula para todo el lote a la vez y la escritura se
+    hace con `insert_many(ordered=False)` por bloques. Las reseñas con error
+    se reportan por su posición en la lista y no detienen a las demás.
+    """
+    items = payload.reviews
+    if len(items) > MAX_BULK_REVIEWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many reviews (max {MAX_BULK_REVIEWS})"
+        )
 
-    reviews = []
-    async for doc in reviews_collection.find({"book_id": book_oid}):
-        reviews.append(document_to_review_out(doc))
+    errors = []
+    oids = {}
+    for i, item in enumerate(items):
+        try:
+            oids[i] = ObjectId(item.book_id)
+        except Exception:
+            errors.append(BulkReviewError(index=i, error="Invalid id format"))
 
-    return reviews
+    existing = set()
+    unique_oids = list(set(oids.values()))
+    for start in range(0, len(unique_oids), BULK_INSERT_CHUNK):
+        cursor = books_collection.find(
+            {"_id": {"$in": unique_oids[start:start + BULK_INSERT_CHUNK]}}, {"_id": 1}
+        )
+        async for doc in cursor:
+            existing.add(doc["_id"])
+
+    valid = []
+    for i, oid in oids.items():
+        if oid in existing:
+            valid.append(i)
+        else:
+            errors.append(BulkReviewError(index=i, error="Book not found"))
+
+    sentiments = await nlp_pool.analyze([items[i].text for i in valid])
+
+    inserted = []
+    for start in range(0, len(valid), BULK_INSERT_CHUNK):
+        chunk = valid[start:start + BULK_INSERT_CHUNK]
+        docs = []
+        for i, (label, score) in zip(chunk, sentiments[start:start + BULK_INSERT_CHUNK]):
+            docs.append({
+                "book_id": oids[i],
+                "username": items[i].username,
+                "text": items[i].text,
+                "sentiment_label": label,
+                "sentiment_score": score,
+                "sentiment_version": LEXICON_VERSION,
+            })
+
+        failed = set()
+        try:
+            await reviews_collection.insert_many(docs, ordered=False)
+        except BulkWriteError as exc:
+            for err in exc.details.get("writeErrors", []):
+                failed.add(err["index"])
+                errors.append(BulkReviewError(index=chunk[err["index"]], error=err["errmsg"]))
+
+        inserted.extend(doc for j, doc in enumerate(docs) if j not in failed)
+
+    for doc in inserted:
+        keyword_model.add_live_review(doc["book_id"], doc["text"], doc["_id"])
+    await record_reviews_bulk(inserted)
+    item_similarity_index.add_reviews(inserted)
+
+    errors.sort(key=lambda e: e.index)
+    return BulkReviewsOut(inserted=len(inserted), errors=errors)
+
+
+# ======================
+# MODELO DE PALABRAS CLAVE
+# ======================
+
+async def _catch_up_keyword_model():
+    """Suma las reseñas posteriores a `last_review_id` (las contadas en vivo se saltan)."""
+    query = {}
+    if keyword_model.last_review_id:
+        query = {"_id": {"$gt": ObjectId(keyword_model.last_review_id)}}
+
+    cursor = reviews_collection.find(query, {"book_id": 1, "text": 1}).sort("_id", 1)
+    async for doc in cursor:
+        keyword_model.add_review(doc["book_id"], doc.get("text", ""), review_id=doc["_id"])
+    keyword_model.trim_live_ids()
+
+
+async def keep_keyword_model_current(interval: float = KEYWORD_MODEL_CATCH_UP):
+    """
+    Pone al día el modelo cada `interval` segundos: cuenta lo que insertaron
+    otros workers y mantiene acotado `live_ids`.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await _catch_up_keyword_model()
+        except Exception:
+            logger.exception("Keyword model catch-up failed")
+
+
+async def restore_keyword_model():
+    """
+    Carga el modelo guardado y lo pone al día con las reseñas insertadas
+    después de guardarlo. Si no hay archivo, o no se puede leer (dañado o
+    de otro formato), lo construye desde cero recorriendo
+    `reviews_collection` una sola vez.
+    """
+    if os.path.exists(KEYWORD_MODEL_PATH):
+        try:
+            keyword_model.load(KEYWORD_MODEL_PATH)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring keyword model %s (%s); rebuilding it", KEYWORD_MODEL_PATH, exc)
+            keyword_model.load_dict(KeywordModel().to_dict())
+    await _catch_up_keyword_model()
+
+
+async def save_keyword_model() -> bool:
+    """
+    Guarda el modelo en KEYWORD_MODEL_PATH. Cada worker tiene su propio
+    modelo en memoria: guarda solo el que obtiene el lease, y antes se pone
+    al día con la base para que el archivo cuente todas las reseñas hasta
+    su `last_review_id`, también las que insertaron otros workers.
+    """
+    token = await acquire_lease(KEYWORD_MODEL_LEASE, 60)
+    if token is None:
+        return False
+    try:
+        await _catch_up_keyword_model()
+        await asyncio.to_thread(keyword_model.save, KEYWORD_MODEL_PATH)
+    finally:
+        await release_lease(KEYWORD_MODEL_LEASE, token)
+    return True
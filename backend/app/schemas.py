@@ -21,6 +21,33 @@ class ReviewOut(ReviewBase):
     sentiment_score: float
 
 
+class SentimentBatchIn(BaseModel):
+    texts: List[str]
+
+
+class SentimentOut(BaseModel):
+    sentiment_label: str
+    sentiment_score: float
+
+
+class BulkReviewItem(ReviewBase):
+    book_id: str
+
+
+class BulkReviewsIn(BaseModel):
+    reviews: List[BulkReviewItem]
+
+
+class BulkReviewError(BaseModel):
+    index: int
+    error: str
+
+
+class BulkReviewsOut(BaseModel):
+    inserted: int
+    errors: List[BulkReviewError]
+
+
 # ======================
 # LIBROS
 # ======================
@@ -39,6 +66,21 @@ class BookOut(BookBase):
     id: str
 
 
+class BookSearchHit(BaseModel):
+    book_id: str
+    title: str
+    author: Optional[str] = None
+    score: float
+
+
+class BookSearchResults(BaseModel):
+    query: str
+    total: int
+    # False si `total` es solo una cota inferior (la búsqueda no recorrió todo)
+    total_exact: bool
+    results: List[BookSearchHit]
+
+
 # ======================
 # RESUMEN EMOCIONAL
 # ======================
@@ -46,9 +88,13 @@ class BookOut(BookBase):
 class BookSummary(BaseModel):
     book_id: str
     total_reviews: int
+    positive: int
+    negative: int
+    neutral: int
     positive_pct: float
     negative_pct: float
     neutral_pct: float
+    average_score: float
     keywords: List[str]
 
 
@@ -96,3 +142,14 @@ class RecommendationOut(BaseModel):
     book_id: str
     title: str
     score: int
+
+
+class SimilarBookOut(BaseModel):
+    book_id: str
+    title: str
+    score: float
+
+
+class BookRecommendations(BaseModel):
+    book_id: str
+    recommendations: List[SimilarBookOut]
@@ -0,0 +1,448 @@
+# backend/app/search.py
+
+import asyncio
+import math
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .database import books_collection
+from .nlp.keywords import STOP_WORDS
+from .nlp.sentiment import WORD_RE, fold
+
+# Parámetros estándar de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Libros nuevos que se acumulan antes de unirlos a los arreglos principales
+MERGE_EVERY = 4096
+# Para los términos con más libros que esto se guardan aparte sus
+# IMPACT_DEPTH postings de mayor peso (ver `search`)
+IMPACT_DEPTH = 512
+SEARCH_START_DEPTH = 128
+# Si las listas a recorrer completas superan 1/DENSE_SEARCH_RATIO del
+# catálogo, se suman en un arreglo denso en lugar de unir candidatos
+DENSE_SEARCH_RATIO = 16
+
+SEARCH_FIELDS = ("title", "author", "description")
+FOLDED_STOP_WORDS = frozenset(fold(w) for w in STOP_WORDS)
+
+
+def search_tokens(text: str) -> List[str]:
+    """Tokens sin acentos ni mayúsculas: 'Fantasía' y 'fantasia' son el mismo."""
+    return [t for t in WORD_RE.findall(fold(text)) if t not in FOLDED_STOP_WORDS]
+
+
+def book_search_text(doc: dict) -> str:
+    return " ".join(doc.get(field) or "" for field in SEARCH_FIELDS)
+
+
+class BookSearchIndex:
+    """
+    Búsqueda de texto completo con ranking BM25 sobre título, autor y
+    descripción.
+
+    El índice invertido se guarda en formato CSR: para el término `t`, los
+    libros están en `doc_ids[offsets[t]:offsets[t + 1]]` y junto a cada uno
+    su peso de frecuencia ya normalizado por largo de documento
+    (tf·(k1+1) / (tf + k1·(1 − b + b·dl/avgdl))). El IDF se aplica al
+    consultar, con el número de libros de ese momento.
+
+    Los libros nuevos van a listas chicas por término que se unen a los
+    arreglos cada MERGE_EVERY altas (como en similar_books); usan el
+    `avgdl` de la última construcción, que se recalcula al reconstruir.
+
+    Los términos muy frecuentes harían que cada búsqueda sume cientos de
+    miles de postings. Para ellos se guardan además sus IMPACT_DEPTH
+    postings de mayor peso y la búsqueda usa el algoritmo de umbral: junta
+    los candidatos de esas listas, calcula su puntaje exacto (búsqueda
+    binaria en los postings ordenados por libro) y se detiene si ningún
+    libro fuera de las listas puede alcanzar al k-ésimo. Si no, ese k-ésimo
+    sirve de umbral para MaxScore: solo se recorren completas las listas de
+    los términos que pueden llevar un libro al top.
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._titles: List[str] = []
+        self._authors: List[Optional[str]] = []
+        self._pos: Dict[str, int] = {}
+        self._terms: Dict[str, int] = {}
+        self._offsets = None
+        self._doc_ids = None
+        self._weights = None
+        self._doc_freq = None
+        # término -> (libros, pesos) agregados después de construir
+        self._delta: Dict[str, Tuple[array, array]] = {}
+        self._delta_size = 0
+        # término -> (libros, pesos) de sus postings de mayor peso, ordenados
+        self._impact: Dict[int, tuple] = {}
+        self._avgdl = 1.0
+        self._total_len = 0
+        self._built = False
+        self._building = False
+        self._pending: List[dict] = []
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    # ======================
+    # CONSTRUCCIÓN
+    # ======================
+
+    async def build(self):
+        async with self._lock:
+            self._building = True
+            try:
+                docs = []
+                cursor = books_collection.find({}, {field: 1 for field in SEARCH_FIELDS})
+                async for doc in cursor:
+                    docs.append(doc)
+
+                fresh = BookSearchIndex()
+                await asyncio.to_thread(fresh._build_from, docs)
+                self.__dict__.update({
+                    k: v for k, v in fresh.__dict__.items()
+                    if k not in ("_lock", "_building", "_pending", "_built")
+                })
+
+                for doc in self._pending:
+                    self._add(doc)
+                self._pending = []
+                self._built = True
+            finally:
+                self._building = False
+
+    async def ensure_built(self):
+        if not self._built:
+            await self.build()
+
+    def _build_from(self, docs: List[dict]):
+        import numpy as np
+
+        term_ids = array("i")
+        postings_doc = array("i")
+        postings_tf = array("i")
+        lengths = array("i")
+
+        for row, doc in enumerate(docs):
+            self._append_doc(doc)
+            tokens = search_tokens(book_search_text(doc))
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_id = self._terms.get(term)
+                if term_id is None:
+                    term_id = self._terms[term] = len(self._terms)
+                term_ids.append(term_id)
+                postings_doc.append(row)
+                postings_tf.append(tf)
+
+        n_terms = len(self._terms)
+        term_ids = np.frombuffer(term_ids, dtype=np.int32)
+        # Orden estable: dentro de cada término los libros quedan por fila
+        order = np.argsort(term_ids, kind="stable")
+        self._doc_freq = np.bincount(term_ids, minlength=n_terms).astype(np.int64)
+        self._offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(self._doc_freq, out=self._offsets[1:])
+        self._doc_ids = np.frombuffer(postings_doc, dtype=np.int32)[order]
+
+        lengths = np.frombuffer(lengths, dtype=np.int32).astype(np.float32)
+        self._total_len = int(lengths.sum())
+        self._avgdl = max(self._total_len / len(docs), 1.0) if docs else 1.0
+        tf = np.frombuffer(postings_tf, dtype=np.int32).astype(np.float32)[order]
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[self._doc_ids] / self._avgdl)
+        self._weights = (tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32)
+
+        self._impact = {}
+        for t in np.flatnonzero(self._doc_freq > IMPACT_DEPTH):
+            self._impact[int(t)] = self._top_postings(int(t), IMPACT_DEPTH)
+
+    def _segment(self, t: int):
+        lo, hi = self._offsets[t], self._offsets[t + 1]
+        return self._doc_ids[lo:hi], self._weights[lo:hi]
+
+    def _top_postings(self, t: int, depth: int, rows=None, weights=None):
+        """Los `depth` postings de mayor peso (a igual peso, el libro más antiguo)."""
+        import numpy as np
+
+        if rows is None:
+            rows, weights = self._segment(t)
+        if len(rows) > depth:
+            part = np.argpartition(-weights, depth - 1)[:depth]
+            rows, weights = rows[part], weights[part]
+        order = np.lexsort((rows, -weights))
+        return rows[order], weights[order]
+
+    def _append_doc(self, doc: dict):
+        book_id = str(doc["_id"])
+        self._pos[book_id] = len(self._ids)
+        self._ids.append(book_id)
+        self._titles.append(doc.get("title", ""))
+        self._authors.append(doc.get("author"))
+
+    # ======================
+    # ACTUALIZACIÓN INCREMENTAL
+    # ======================
+
+    def add(self, doc: dict):
+        if self._building:
+            self._pending.append(doc)
+            return
+        if str(doc["_id"]) in self._pos:
+            return
+        self._add(doc)
+
+    def _add(self, doc: dict):
+        if self._offsets is None:
+            # todavía no hay arreglos: se arma el índice con este libro
+            self._build_from([doc])
+            return
+
+        row = len(self._ids)
+        self._append_doc(doc)
+        tokens = search_tokens(book_search_text(doc))
+        self._total_len += len(tokens)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / self._avgdl)
+        for term, tf in Counter(tokens).items():
+            rows, weights = self._delta.setdefault(term, (array("i"), array("f")))
+            rows.append(row)
+            weights.append(tf * (BM25_K1 + 1) / (tf + norm))
+        self._delta_size += 1
+
+        if self._delta_size >= MERGE_EVERY:
+            self._merge_delta()
+
+    def _merge_delta(self):
+        import numpy as np
+
+        for term in self._delta:
+            if term not in self._terms:
+                self._terms[term] = len(self._terms)
+        n_terms = len(self._terms)
+
+        extra_freq = np.zeros(n_terms, dtype=np.int64)
+        for term, (rows, _) in self._delta.items():
+            extra_freq[self._terms[term]] = len(rows)
+
+        old_freq = np.zeros(n_terms, dtype=np.int64)
+        old_freq[:len(self._doc_freq)] = self._doc_freq
+        new_freq = old_freq + extra_freq
+        new_offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(new_freq, out=new_offsets[1:])
+
+        # Cada segmento viejo se copia a su nuevo lugar y los libros nuevos
+        # van al final del segmento (mayor número de fila, orden preservado)
+        total = int(new_offsets[-1])
+        doc_ids = np.empty(total, dtype=np.int32)
+        weights = np.empty(total, dtype=np.float32)
+        old_n = len(self._doc_freq)
+        starts = np.repeat(new_offsets[:old_n] - self._offsets[:-1], self._doc_freq)
+        dest = np.arange(len(self._doc_ids), dtype=np.int64) + starts
+        doc_ids[dest] = self._doc_ids
+        weights[dest] = self._weights
+        for term, (rows, ws) in self._delta.items():
+            t = self._terms[term]
+            end = new_offsets[t + 1]
+            doc_ids[end - len(rows):end] = np.frombuffer(rows, dtype=np.int32)
+            weights[end - len(rows):end] = np.frombuffer(ws, dtype=np.float32)
+
+        self._doc_freq, self._offsets = new_freq, new_offsets
+        self._doc_ids, self._weights = doc_ids, weights
+
+        # Las listas de impacto viejas tienen los mejores postings previos:
+        # basta combinarlas con los nuevos
+        for term, (rows, ws) in self._delta.items():
+            t = self._terms[term]
+            if t in self._impact:
+                old_rows, old_ws = self._impact[t]
+                self._impact[t] = self._top_postings(
+                    t, IMPACT_DEPTH,
+                    np.concatenate([old_rows, np.frombuffer(rows, dtype=np.int32)]),
+                    np.concatenate([old_ws, np.frombuffer(ws, dtype=np.float32)]),
+                )
+            elif new_freq[t] > IMPACT_DEPTH:
+                self._impact[t] = self._top_postings(t, IMPACT_DEPTH)
+
+        self._delta = {}
+        self._delta_size = 0
+
+    # ======================
+    # CONSULTA
+    # ======================
+
+    def _query_terms(self, query: str) -> List[tuple]:
+        """(idf, id del término o None, libros y pesos recientes) por término de la consulta."""
+        import numpy as np
+
+        n = len(self._ids)
+        found = []
+        for term in dict.fromkeys(search_tokens(query)):
+            # los términos que solo están en `_delta` se numeran al unirlo
+            t = self._terms.get(term)
+            df = int(self._doc_freq[t]) if t is not None else 0
+            delta = self._delta.get(term)
+            if delta is not None:
+                df += len(delta[0])
+                delta = (np.frombuffer(delta[0], dtype=np.int32),
+                         np.frombuffer(delta[1], dtype=np.float32))
+            if df:
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                found.append((np.float32(idf), t, delta))
+        return found
+
+    def _candidate_lists(self, terms: List[tuple], depth: int):
+        """
+        Para cada término, sus `depth` postings de mayor peso (más los
+        recientes) y el peso máximo que puede tener un libro fuera de ellos.
+        """
+        lists, bound, exhausted = [], 0.0, True
+        for idf, t, delta in terms:
+            if t is not None:
+                if self._doc_freq[t] <= depth:
+                    lists.append(self._segment(t)[0])
+                elif depth <= IMPACT_DEPTH and t in self._impact:
+                    rows, weights = self._impact[t]
+                    lists.append(rows[:depth])
+                    bound += idf * weights[depth - 1]
+                    exhausted = False
+                else:
+                    rows, weights = self._top_postings(t, depth)
+                    lists.append(rows)
+                    bound += idf * weights[-1]
+                    exhausted = False
+            if delta is not None:
+                lists.append(delta[0])
+        return lists, bound, exhausted
+
+    def _score(self, terms: List[tuple], rows):
+        """Puntaje BM25 exacto de `rows` (búsqueda binaria en cada lista)."""
+        import numpy as np
+
+        scores = np.zeros(len(rows), dtype=np.float32)
+        for idf, t, delta in terms:
+            parts = [self._segment(t)] if t is not None else []
+            if delta is not None:
+                parts.append(delta)
+            for seg_rows, seg_weights in parts:
+                if not len(seg_rows):
+                    continue
+                pos = np.minimum(np.searchsorted(seg_rows, rows), len(seg_rows) - 1)
+                hit = seg_rows[pos] == rows
+                scores += np.where(hit, idf * seg_weights[pos], np.float32(0))
+        return scores
+
+    def _max_weight(self, t: Optional[int], delta) -> float:
+        best = 0.0
+        if t is not None:
+            if t in self._impact:
+                best = float(self._impact[t][1][0])
+            elif self._doc_freq[t]:
+                best = float(self._segment(t)[1].max())
+        if delta is not None and len(delta[1]):
+            best = max(best, float(delta[1].max()))
+        return best
+
+    def _essential_candidates(self, terms: List[tuple], rows, kth: float):
+        """
+        Segunda fase (MaxScore): ordenados por su puntaje máximo posible, los
+        términos cuya suma no alcanza `kth` no pueden llevar por sí solos a
+        un libro al top; solo se recorren completas las listas del resto.
+        Devuelve los candidatos, o None si conviene sumar todas las listas.
+        """
+        import numpy as np
+
+        bounds = sorted((idf * self._max_weight(t, delta), i) for i, (idf, t, delta) in enumerate(terms))
+        skipped, acc = set(), 0.0
+        for bound, i in bounds:
+            if acc + bound >= kth:
+                break
+            acc += bound
+            skipped.add(i)
+
+        essential = [term for i, term in enumerate(terms) if i not in skipped]
+        if not skipped or self._postings_count(essential) * DENSE_SEARCH_RATIO > len(self._ids):
+            # listas largas: sumar todo en un arreglo denso sale más barato
+            # que ordenar la unión de candidatos
+            return None
+        lists = [rows]
+        for _, t, delta in essential:
+            if t is not None:
+                lists.append(self._segment(t)[0])
+            if delta is not None:
+                lists.append(delta[0])
+        return np.unique(np.concatenate(lists))
+
+    def _score_all(self, terms: List[tuple]):
+        """Libros que coinciden y su puntaje, recorriendo todas las listas."""
+        import numpy as np
+
+        scores = np.zeros(len(self._ids), dtype=np.float32)
+        for idf, t, delta in terms:
+            parts = [self._segment(t)] if t is not None else []
+            if delta is not None:
+                parts.append(delta)
+            # dentro de una lista no se repiten libros: la suma indexada sirve
+            for seg_rows, seg_weights in parts:
+                scores[seg_rows] += idf * seg_weights
+        matched = np.flatnonzero(scores)
+        return matched, scores[matched]
+
+    def _postings_count(self, terms: List[tuple]) -> int:
+        return sum(
+            (int(self._doc_freq[t]) if t is not None else 0) + (len(delta[0]) if delta is not None else 0)
+            for _, t, delta in terms
+        )
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, bool, List[dict]]:
+        """
+        (coincidencias, si ese total es exacto, página ordenada por BM25).
+
+        Si la búsqueda se resolvió sin recorrer todas las listas, el total
+        es una cota inferior.
+        """
+        import numpy as np
+
+        terms = self._query_terms(query)
+        if not terms:
+            return 0, True, []
+
+        want = offset + limit
+        lists, bound, exhausted = self._candidate_lists(terms, max(want, SEARCH_START_DEPTH))
+        rows = np.unique(np.concatenate(lists))
+        scores = self._score(terms, rows)
+        kth = 0.0
+        if len(rows) >= want:
+            kth = float(np.partition(scores, len(scores) - want)[len(scores) - want])
+        # algún libro fuera de las listas podría superar al k-ésimo
+        if not exhausted and bound >= kth:
+            candidates = self._essential_candidates(terms, rows, kth)
+            if candidates is None:
+                rows, scores = self._score_all(terms)
+                exhausted = True
+            else:
+                rows, scores = candidates, self._score(terms, candidates)
+
+        if exhausted:
+            total = len(rows)
+        else:
+            # cota inferior: los candidatos y el término más frecuente coinciden todos
+            total = max(len(rows), max(int(self._doc_freq[t]) for _, t, _ in terms if t is not None))
+
+        if len(rows) > want:
+            top = np.argpartition(-scores, want - 1)[:want]
+            rows, scores = rows[top], scores[top]
+        # puntaje descendente y, a igual puntaje, el libro más antiguo primero
+        order = np.lexsort((rows, -scores))[offset:want]
+
+        return total, exhausted, [
+            {
+                "book_id": self._ids[row],
+                "title": self._titles[row],
+                "author": self._authors[row],
+                "score": round(float(scores[i]), 4),
+            }
+            for i, row in zip(order, rows[order])
+        ]
+
+
+book_search_index = BookSearchIndex()
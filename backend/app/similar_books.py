@@ -0,0 +1,269 @@
+# backend/app/similar_books.py
+
+import asyncio
+from typing import Dict, List, Optional
+
+from .database import books_collection
+from .nlp.keywords import STOP_WORDS, load_tfidf_vectorizer
+
+# numpy y scipy se importan al construir o agregar el primer libro (ver
+# load_numeric), no al cargar el módulo
+np = None
+sp = None
+
+TOP_K = 10
+# Filas de la matriz de similitud que se calculan a la vez al construir
+BUILD_CHUNK_ROWS = 256
+# Filas nuevas que se acumulan antes de unirlas a la matriz principal
+MERGE_EVERY = 1024
+# En catálogos grandes se ignoran los términos presentes en más del 5% de
+# los libros: casi no distinguen un libro de otro y vuelven densa la matriz
+# de similitud (el costo de construir crece con el cuadrado de su frecuencia)
+MAX_DF = 0.05
+MAX_DF_MIN_BOOKS = 1000
+
+
+def load_numeric():
+    global np, sp
+    if np is None:
+        import numpy
+        import scipy.sparse
+        np, sp = numpy, scipy.sparse
+
+
+def book_text(doc: dict) -> str:
+    return " ".join(
+        doc.get(field) or "" for field in ("title", "author", "description")
+    )
+
+
+def _top_k_row(indices: "np.ndarray", scores: "np.ndarray", k: int):
+    """Los k mejores (índice, score) de una fila dispersa, ordenados desc."""
+    if len(scores) > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        indices, scores = indices[part], scores[part]
+    order = np.lexsort((indices, -scores))
+    return indices[order], scores[order]
+
+
+class SimilarBooksIndex:
+    """
+    Libros parecidos por contenido (título, autor y descripción).
+
+    Cada libro es una fila TF-IDF normalizada de una matriz dispersa, así
+    que el coseno entre dos libros es un producto punto. Los `k` vecinos de
+    cada libro se precalculan al construir el índice y se guardan en dos
+    arreglos (n × k), de modo que una consulta es solo una lectura.
+
+    Al agregar un libro se calcula su fila con el vocabulario/IDF ya
+    ajustado, se obtienen sus vecinos con un solo producto matriz-vector y
+    se actualizan las listas de los libros a los que ahora supera como
+    vecino. Los términos que no estaban en el vocabulario se ignoran hasta
+    la siguiente reconstrucción (al arrancar).
+    """
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self._ids: List[str] = []
+        self._titles: List[str] = []
+        self._pos: Dict[str, int] = {}
+        # Se crean al construir (o al primer alta): ver load_numeric
+        self._vectorizer = None
+        self._matrix = None
+        self._extra = None
+        self._nbr_idx = None
+        self._nbr_sim = None
+        self._built = False
+        self._building = False
+        self._stale = False
+        self._pending: List[dict] = []
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, book_id: str):
+        return book_id in self._pos
+
+    # ======================
+    # CONSTRUCCIÓN
+    # ======================
+
+    async def build(self, force: bool = True):
+        async with self._lock:
+            if not force and self._built and not self._stale:
+                # otra tarea lo terminó mientras esperábamos el lock
+                return
+            self._building = True
+            try:
+                docs = []
+                cursor = books_collection.find(
+                    {}, {"title": 1, "author": 1, "description": 1}
+                )
+                async for doc in cursor:
+                    docs.append(doc)
+
+                # El cálculo es pesado (CPU): se hace en un hilo sobre un
+                # índice nuevo y luego se reemplaza el actual de una vez
+                fresh = SimilarBooksIndex(self.k)
+                await asyncio.to_thread(fresh._build_from, docs)
+                self._adopt(fresh)
+
+                for doc in self._pending:
+                    self._add(doc)
+                self._pending = []
+                self._built = True
+            finally:
+                self._building = False
+
+    def _adopt(self, other: "SimilarBooksIndex"):
+        self._ids = other._ids
+        self._titles = other._titles
+        self._pos = other._pos
+        self._vectorizer = other._vectorizer
+        self._matrix = other._matrix
+        self._extra = other._extra
+        self._nbr_idx = other._nbr_idx
+        self._nbr_sim = other._nbr_sim
+        self._stale = other._stale
+
+    async def ensure_built(self):
+        # Si el catálogo estaba vacío al construir no hay vocabulario todavía
+        if not self._built or self._stale:
+            await self.build(force=False)
+
+    def _build_from(self, docs: List[dict]):
+        load_numeric()
+        k = self.k
+        n = len(docs)
+
+        self._ids = [str(d["_id"]) for d in docs]
+        self._titles = [d.get("title", "") for d in docs]
+        self._pos = {book_id: i for i, book_id in enumerate(self._ids)}
+        self._nbr_idx = np.full((n, k), -1, dtype=np.int32)
+        self._nbr_sim = np.full((n, k), -np.inf, dtype=np.float32)
+
+        self._vectorizer = load_tfidf_vectorizer()(
+            stop_words=list(STOP_WORDS),
+            max_df=MAX_DF if n >= MAX_DF_MIN_BOOKS else 1.0,
+            dtype=np.float32,
+        )
+        try:
+            self._matrix = self._vectorizer.fit_transform([book_text(d) for d in docs]).tocsr()
+        except ValueError:
+            # catálogo vacío o sin ningún término útil
+            self._vectorizer = None
+            self._matrix = sp.csr_matrix((n, 0), dtype=np.float32)
+            self._stale = True
+            return
+        self._extra = sp.csr_matrix((0, self._matrix.shape[1]), dtype=np.float32)
+        self._stale = False
+
+        matrix_t = self._matrix.T.tocsr()
+        for start in range(0, n, BUILD_CHUNK_ROWS):
+            block = (self._matrix[start:start + BUILD_CHUNK_ROWS] @ matrix_t).tocsr()
+            for offset in range(block.shape[0]):
+                row = start + offset
+                lo, hi = block.indptr[offset], block.indptr[offset + 1]
+                cols, sims = block.indices[lo:hi], block.data[lo:hi]
+                keep = (cols != row) & (sims > 0)
+                cols, sims = _top_k_row(cols[keep], sims[keep], k)
+                self._nbr_idx[row, :len(cols)] = cols
+                self._nbr_sim[row, :len(sims)] = sims
+
+    # ======================
+    # ACTUALIZACIÓN INCREMENTAL
+    # ======================
+
+    def add(self, doc: dict):
+        if self._building:
+            self._pending.append(doc)
+            return
+        if str(doc["_id"]) in self._pos:
+            return
+        self._add(doc)
+
+    def _grow(self, n: int):
+        if self._nbr_idx is None:
+            load_numeric()
+            self._nbr_idx = np.full((0, self.k), -1, dtype=np.int32)
+            self._nbr_sim = np.full((0, self.k), -np.inf, dtype=np.float32)
+        if n <= len(self._nbr_idx):
+            return
+        capacity = max(n, 2 * len(self._nbr_idx), 16)
+        idx = np.full((capacity, self.k), -1, dtype=np.int32)
+        sim = np.full((capacity, self.k), -np.inf, dtype=np.float32)
+        idx[:len(self._nbr_idx)] = self._nbr_idx
+        sim[:len(self._nbr_sim)] = self._nbr_sim
+        self._nbr_idx, self._nbr_sim = idx, sim
+
+    def _similarities(self, vector: "sp.csr_matrix") -> "np.ndarray":
+        # matriz dispersa × vector denso: un solo recorrido en C
+        dense = vector.toarray().ravel()
+        return np.concatenate([self._matrix @ dense, self._extra @ dense])
+
+    def _add(self, doc: dict):
+        row = len(self._ids)
+        self._ids.append(str(doc["_id"]))
+        self._titles.append(doc.get("title", ""))
+        self._pos[self._ids[-1]] = row
+        self._grow(row + 1)
+
+        if self._vectorizer is None:
+            self._stale = True
+            return
+
+        vector = self._vectorizer.transform([book_text(doc)]).astype(np.float32).tocsr()
+        sims = self._similarities(vector)
+
+        # vecinos del libro nuevo
+        cols = np.flatnonzero(sims > 0)
+        cols, scores = _top_k_row(cols.astype(np.int32), sims[cols], self.k)
+        self._nbr_idx[row, :len(cols)] = cols
+        self._nbr_sim[row, :len(scores)] = scores
+
+        # libros para los que el nuevo entra en su top-k
+        improved = np.flatnonzero(sims > self._nbr_sim[:len(sims), -1])
+        for other in improved:
+            if sims[other] <= 0:
+                continue
+            at = int(np.searchsorted(-self._nbr_sim[other], -sims[other], side="right"))
+            self._nbr_idx[other, at + 1:] = self._nbr_idx[other, at:-1].copy()
+            self._nbr_sim[other, at + 1:] = self._nbr_sim[other, at:-1].copy()
+            self._nbr_idx[other, at] = row
+            self._nbr_sim[other, at] = sims[other]
+
+        # Las filas nuevas van a una matriz chica que se une a la principal
+        # cada MERGE_EVERY libros, para no copiar la grande en cada alta
+        self._extra = sp.vstack([self._extra, vector], format="csr")
+        if self._extra.shape[0] >= MERGE_EVERY:
+            self._matrix = sp.vstack([self._matrix, self._extra], format="csr")
+            self._extra = sp.csr_matrix((0, self._matrix.shape[1]), dtype=np.float32)
+
+    # ======================
+    # CONSULTA
+    # ======================
+
+    def similar(self, book_id: str, limit: Optional[int] = None) -> List[dict]:
+        row = self._pos[book_id]
+        result = []
+        for other, score in zip(self._nbr_idx[row], self._nbr_sim[row]):
+            if other < 0:
+                break
+            result.append({
+                "book_id": self._ids[other],
+                "title": self._titles[other],
+                "score": round(float(score), 4),
+            })
+        return result[:limit] if limit else result
+
+    def memory_bytes(self) -> int:
+        """Memoria aproximada de la matriz y las listas de vecinos."""
+        if self._nbr_idx is None:
+            return 0
+        matrices = [m for m in (self._matrix, self._extra) if m is not None]
+        sparse = sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices)
+        return sparse + self._nbr_idx.nbytes + self._nbr_sim.nbytes
+
+
+similar_books_index = SimilarBooksIndex()
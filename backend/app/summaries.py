@@ -0,0 +1,153 @@
+# backend/app/summaries.py
+
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+
+from .database import books_collection, reviews_collection, summaries_collection
+from .schemas import BookSummary
+from .nlp.keywords import KeywordModel, keyword_model
+
+router = APIRouter(prefix="/books", tags=["Summary"])
+
+TOP_KEYWORDS = 5
+REBUILD_BATCH_SIZE = 1000
+
+
+def object_id_or_404(id_str: str) -> ObjectId:
+    try:
+        return ObjectId(id_str)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid id format")
+
+
+def summary_doc_to_out(book_id: str, doc) -> BookSummary:
+    doc = doc or {}
+    total = doc.get("review_count", 0)
+    positive = doc.get("positive", 0)
+    negative = doc.get("negative", 0)
+    neutral = doc.get("neutral", 0)
+
+    def pct(count):
+        return round(100.0 * count / total, 2) if total else 0.0
+
+    return BookSummary(
+        book_id=book_id,
+        total_reviews=total,
+        positive=positive,
+        negative=negative,
+        neutral=neutral,
+        positive_pct=pct(positive),
+        negative_pct=pct(negative),
+        neutral_pct=pct(neutral),
+        average_score=doc.get("score_sum", 0.0) / total if total else 0.0,
+        keywords=doc.get("keywords", []),
+    )
+
+
+# ======================
+# ACTUALIZACIÓN INCREMENTAL
+# ======================
+
+async def record_reviews_bulk(reviews: List[dict]):
+    """Suma reseñas a los resúmenes de sus libros: un update atómico por libro."""
+    incs = {}
+    for review in reviews:
+        # con las tres etiquetas (aunque sumen 0) el documento queda igual
+        # al que arma rebuild_summaries
+        inc = incs.get(review["book_id"])
+        if inc is None:
+            inc = incs[review["book_id"]] = {
+                "review_count": 0, "positive": 0, "negative": 0,
+                "neutral": 0, "score_sum": 0.0,
+            }
+        inc["review_count"] += 1
+        inc[review["sentiment_label"]] = inc.get(review["sentiment_label"], 0) + 1
+        inc["score_sum"] += review["sentiment_score"]
+
+    ops = [
+        UpdateOne(
+            {"_id": book_oid},
+            {
+                "$inc": inc,
+                "$set": {"keywords": keyword_model.top_keywords(book_oid, TOP_KEYWORDS)},
+            },
+            upsert=True,
+        )
+        for book_oid, inc in incs.items()
+    ]
+    if ops:
+        await summaries_collection.bulk_write(ops, ordered=False)
+
+
+@router.get("/{book_id}/summary", response_model=BookSummary)
+async def get_book_summary(book_id: str):
+    book_oid = object_id_or_404(book_id)
+
+    doc = await summaries_collection.find_one({"_id": book_oid})
+    if not doc:
+        # Libro sin reseñas todavía (o que no existe)
+        if not await books_collection.find_one({"_id": book_oid}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Book not found")
+
+    return summary_doc_to_out(book_id, doc)
+
+
+# ======================
+# RECONSTRUCCIÓN COMPLETA
+# ======================
+
+async def rebuild_summaries(batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """
+    Recalcula todos los resúmenes desde `reviews_collection` en una sola
+    pasada con cursor (sin cargar las reseñas en memoria) y los escribe con
+    `bulk_write`. Devuelve cuántos libros se actualizaron.
+    """
+    totals = {}
+    model = KeywordModel()
+
+    # Las pendientes se suman cuando review_pipeline las procesa
+    cursor = reviews_collection.find(
+        {"enrichment": {"$exists": False}},
+        {"book_id": 1, "text": 1, "sentiment_label": 1, "sentiment_score": 1},
+    ).sort("_id", 1).batch_size(batch_size)
+
+    async for review in cursor:
+        book_oid = review["book_id"]
+        agg = totals.get(book_oid)
+        if agg is None:
+            agg = totals[book_oid] = {
+                "review_count": 0, "positive": 0, "negative": 0,
+                "neutral": 0, "score_sum": 0.0,
+            }
+
+        label = review.get("sentiment_label", "neutral")
+        agg["review_count"] += 1
+        agg[label] = agg.get(label, 0) + 1
+        agg["score_sum"] += float(review.get("sentiment_score", 0.0))
+
+        model.add_review(book_oid, review.get("text", ""), review_id=review["_id"])
+
+    # Libros que ya no tienen reseñas
+    stale = [
+        doc["_id"] async for doc in summaries_collection.find({}, {"_id": 1})
+        if doc["_id"] not in totals
+    ]
+    for i in range(0, len(stale), batch_size):
+        await summaries_collection.delete_many({"_id": {"$in": stale[i:i + batch_size]}})
+
+    ops = []
+    for book_oid, agg in totals.items():
+        agg["keywords"] = model.top_keywords(book_oid, TOP_KEYWORDS)
+        ops.append(ReplaceOne({"_id": book_oid}, agg, upsert=True))
+        if len(ops) >= batch_size:
+            await summaries_collection.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await summaries_collection.bulk_write(ops, ordered=False)
+
+    # El modelo en memoria queda igual al recién calculado
+    keyword_model.load_dict(model.to_dict())
+    return len(totals)
@@ -0,0 +1,95 @@
+# backend/benchmarks/bench_admission.py
+#
+# Latencia de una ruta barata mientras una ruta cara está saturada, con y
+# sin control de admisión. La ruta cara ocupa el event loop ~20 ms por
+# petición (como un recorrido completo de /recommend/by-quiz); la barata
+# responde al instante (como GET /books/{id} con el cache caliente). Varios
+# clientes piden la ruta cara sin pausa (tras un 503 esperan lo que dice
+# Retry-After) y cada 10 ms sale una petición a la barata; su latencia se
+# mide desde la hora en que le tocaba salir, así cuenta también el tiempo
+# que el event loop estuvo ocupado. Cliente y servidor comparten proceso:
+# el costo de cada 503 también se paga aquí.
+#
+#   python -m benchmarks.bench_admission [heavy_clients] [seconds]
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app.admission import AdmissionLimiter
+
+HEAVY_CPU_S = 0.02
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def make_app(limiter):
+    app = FastAPI()
+
+    @app.get("/heavy", dependencies=[Depends(limiter.slot)])
+    async def heavy():
+        await asyncio.sleep(0)
+        end = time.perf_counter() + HEAVY_CPU_S
+        while time.perf_counter() < end:
+            pass
+        return {"ok": True}
+
+    @app.get("/cheap")
+    async def cheap():
+        return {"ok": True}
+
+    return app
+
+
+async def run(limiter, clients, seconds):
+    transport = httpx.ASGITransport(app=make_app(limiter))
+    statuses = {}
+    cheap = []
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def hammer():
+            while time.perf_counter() < deadline:
+                r = await client.get("/heavy")
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+                if r.status_code == 503:
+                    await asyncio.sleep(float(r.headers["retry-after"]))
+
+        async def one_probe(scheduled):
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await client.get("/cheap")
+            cheap.append((time.perf_counter() - scheduled) * 1000)
+
+        start = time.perf_counter()
+        probes = [one_probe(start + i * 0.01) for i in range(int(seconds * 100))]
+        await asyncio.gather(*probes, *(hammer() for _ in range(clients)))
+
+    cheap.sort()
+    return statuses, cheap
+
+
+async def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"{clients} clientes sobre la ruta cara, {seconds:.0f} s")
+    for label, limiter in (
+        ("sin límite", AdmissionLimiter("bench_off", 10**6, 10**6, 3600)),
+        ("2 + cola 4", AdmissionLimiter("bench_on", 2, 4, 0.5)),
+    ):
+        statuses, cheap = await run(limiter, clients, seconds)
+        print(f"{label:11} barata: p50 {percentile(cheap, 50):7.1f} ms, p99 {percentile(cheap, 99):7.1f} ms "
+              f"({len(cheap)} peticiones) | cara: {statuses.get(200, 0) / seconds:.0f} ok/s, "
+              f"{statuses.get(503, 0) / seconds:.0f} 503/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,272 @@
+# backend/benchmarks/bench_api.py
+#
+# Benchmark de carga de punta a punta: siembra N libros (con reseñas y
+# usuarios) y golpea las rutas principales a través de la app ASGI en el
+# mismo proceso, con la concurrencia indicada. Imprime un JSON con
+# throughput y latencias p50/p95/p99 por ruta, para comparar entre commits.
+#
+#   python -m benchmarks.bench_api --books 10000,100000 --concurrency 32 \
+#       --duration 10 --output resultados.json
+#
+# Por defecto usa la base en memoria (DB_BACKEND=memory); con
+# --backend mongo usa MONGO_URL y BORRA las colecciones de MONGO_DB_NAME.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUTES = ("books", "book_reviews", "login", "quiz_save", "recommend_by_quiz")
+
+GENRES = ["fantasía", "ciencia", "terror", "romance", "misterio", "aventura", "historia"]
+WORDS = (
+    "magia viaje dragón reino guerra amor traición crimen detective ciudad "
+    "bosque mar espacio robot futuro familia amistad venganza secreto poder"
+).split()
+REVIEW_TEXTS = [
+    "Me encantó, la historia fue emocionante.",
+    "La historia se me hizo aburrida y muy lenta.",
+    "Es un libro decente, nada especial.",
+    "Un libro increíble, muy bien escrito.",
+]
+PASSWORD = "bench-password"
+INSERT_CHUNK = 5000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de carga de la API en proceso")
+    parser.add_argument("--books", default="10000",
+                        help="tamaños de catálogo separados por coma (p. ej. 10000,100000,1000000)")
+    parser.add_argument("--reviews-per-book", type=int, default=3)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por ruta")
+    parser.add_argument("--routes", default=",".join(ROUTES))
+    parser.add_argument("--backend", choices=("memory", "mongo"), default="memory")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    return parser.parse_args()
+
+
+# ======================
+# DATOS
+# ======================
+
+async def seed(n_books, reviews_per_book, n_users, rng):
+    from bson import ObjectId
+    from passlib.hash import pbkdf2_sha256
+
+    from app.database import books_collection, reviews_collection, users_collection, summaries_collection
+    from app.nlp.sentiment import analyze_sentiment_batch
+
+    for collection in (books_collection, reviews_collection, users_collection, summaries_collection):
+        await collection.delete_many({})
+
+    book_ids = []
+    for start in range(0, n_books, INSERT_CHUNK):
+        docs = []
+        for i in range(start, min(n_books, start + INSERT_CHUNK)):
+            desc = f"{rng.choice(GENRES)} " + " ".join(rng.choices(WORDS, k=8))
+            docs.append({"_id": ObjectId(), "title": f"Libro {i}", "author": f"Autor {i % 997}",
+                         "description": desc})
+        await books_collection.insert_many(docs, ordered=False)
+        book_ids.extend(d["_id"] for d in docs)
+
+    sentiments = dict(zip(REVIEW_TEXTS, analyze_sentiment_batch(REVIEW_TEXTS)))
+    pending = []
+    for book_id in book_ids:
+        for _ in range(reviews_per_book):
+            text = rng.choice(REVIEW_TEXTS)
+            label, score = sentiments[text]
+            pending.append({"book_id": book_id, "username": f"user{rng.randrange(n_users)}",
+                            "text": text, "sentiment_label": label, "sentiment_score": score})
+            if len(pending) >= INSERT_CHUNK:
+                await reviews_collection.insert_many(pending, ordered=False)
+                pending = []
+    if pending:
+        await reviews_collection.insert_many(pending, ordered=False)
+
+    # El KDF es caro: todos los usuarios comparten el mismo hash
+    hashed = pbkdf2_sha256.hash(PASSWORD)
+    users = [{"_id": ObjectId(), "username": f"user{i}", "email": f"user{i}@example.com",
+              "password": hashed, "quiz": None} for i in range(n_users)]
+    for start in range(0, n_users, INSERT_CHUNK):
+        await users_collection.insert_many(users[start:start + INSERT_CHUNK], ordered=False)
+
+    return [str(b) for b in book_ids], users
+
+
+async def reset_derived_state():
+    """
+    Descarta todo lo calculado con el catálogo anterior: la siembra escribe
+    directo en las colecciones, sin pasar por las rutas que invalidan.
+    """
+    from app.auth import token_cache, user_cache
+    from app.book_index import book_index
+    from app.collaborative import item_similarity_index
+    from app.recommend_cache import quiz_cache
+    from app.response_cache import invalidate_catalog
+    from app.search import book_search_index
+    from app.similar_books import similar_books_index
+
+    invalidate_catalog()
+    for cache in (quiz_cache, user_cache, token_cache):
+        cache.clear()
+
+    await book_index.build()
+    await book_search_index.build()
+    await similar_books_index.build()
+    await item_similarity_index.build()
+
+
+def make_tokens(users):
+    from jose import jwt
+    from app.auth import ALGORITHM, SECRET_KEY
+
+    return [
+        jwt.encode({"user_id": str(u["_id"]), "email": u["email"], "username": u["username"]},
+                   SECRET_KEY, algorithm=ALGORITHM)
+        for u in users
+    ]
+
+
+def quiz_payload(rng):
+    return {
+        "favorite_genre": rng.choice(GENRES),
+        "action_level": rng.choice(["low", "medium", "high"]),
+        "keywords": rng.sample(WORDS, 2),
+    }
+
+
+# ======================
+# CARGA
+# ======================
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+async def drive(client, make_request, concurrency, duration):
+    latencies = []
+    errors = 0
+    stop = time.perf_counter() + duration
+
+    async def worker(worker_rng):
+        nonlocal errors
+        while time.perf_counter() < stop:
+            method, url, kwargs = make_request(worker_rng)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(random.Random(i)) for i in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 3) if latencies else None,
+    }
+
+
+async def run_size(n_books, args):
+    import httpx
+
+    from bson import ObjectId
+
+    from app.main import app
+    from app.database import ensure_indexes
+    from app.pagination import encode_cursor
+
+    rng = random.Random(args.seed)
+    seed_start = time.perf_counter()
+    book_ids, users = await seed(n_books, args.reviews_per_book, args.users, rng)
+    await ensure_indexes()
+    await reset_derived_state()
+    seed_s = time.perf_counter() - seed_start
+
+    tokens = make_tokens(users)
+    cursors = [encode_cursor(ObjectId(b)) for b in book_ids]
+
+    # Todos los usuarios tienen un quiz guardado para /recommend/by-quiz
+    from app.database import users_collection
+    for user in users:
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"quiz": quiz_payload(rng)}})
+
+    requests = {
+        # Página al azar: con una fija solo se mediría el cache de respuestas
+        "books": lambda r: ("GET", "/books/", {"params": {"limit": 50, "after": r.choice(cursors)}}),
+        "book_reviews": lambda r: ("GET", f"/books/{r.choice(book_ids)}/reviews", {}),
+        "login": lambda r: ("POST", "/auth/login", {"json": {
+            "email": r.choice(users)["email"], "password": PASSWORD}}),
+        "quiz_save": lambda r: ("POST", "/quiz/save", {
+            "json": quiz_payload(r),
+            "headers": {"Authorization": f"Bearer {r.choice(tokens)}"}}),
+        "recommend_by_quiz": lambda r: ("GET", "/recommend/by-quiz", {
+            "headers": {"Authorization": f"Bearer {r.choice(tokens)}"}}),
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for route in args.routes.split(","):
+            results[route] = await drive(client, requests[route], args.concurrency, args.duration)
+            print(f"[{n_books:,} libros] {route}: {results[route]}", file=sys.stderr)
+
+    return {
+        "books": n_books,
+        "reviews": n_books * args.reviews_per_book,
+        "users": args.users,
+        "seed_seconds": round(seed_s, 2),
+        "routes": results,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+async def main():
+    args = parse_args()
+    os.environ["DB_BACKEND"] = args.backend
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "runs": [],
+    }
+    for n_books in (int(n) for n in args.books.split(",")):
+        report["runs"].append(await run_size(n_books, args))
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+# backend/benchmarks/bench_catalog_snapshot.py
+#
+# Memoria por worker de la foto del catálogo mapeada en memoria contra
+# tener el catálogo en dicts dentro de cada proceso. Se escribe una foto
+# sintética y se levantan varios procesos a la vez: unos cargan todos los
+# libros en un dict, otros mapean el archivo y leen cada libro una vez.
+# Se reporta el aumento de Pss (memoria proporcional: las páginas
+# compartidas se dividen entre los procesos que las usan) y de memoria
+# privada, más la latencia de buscar un libro y de armar una página.
+#
+#   python -m benchmarks.bench_catalog_snapshot [n_books] [n_workers]
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+from app.catalog_snapshot import CatalogSnapshot, _Writer
+
+WORDS = ["dragón", "reino", "mar", "sol", "luna", "viaje", "guerra", "amor", "ciudad", "bosque"]
+
+
+def memory_kib():
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                values[name] = int(rest.split()[0])
+    return values["Pss"], values["Private_Clean"] + values["Private_Dirty"]
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def write_snapshot(path, n, rng):
+    writer = _Writer(path, version=1, started_at=time.time())
+    for i in range(n):
+        writer.add({
+            "_id": ObjectId(),
+            "title": " ".join(rng.choices(WORDS, k=4)).capitalize(),
+            "author": f"Autor {rng.randrange(n // 10 + 1)}",
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(30, 90))),
+        })
+    writer.finish()
+
+
+def worker(mode, path, barrier, results):
+    snapshot = CatalogSnapshot(path)
+    snapshot._load()
+    current = snapshot._current
+    ids = [ObjectId(current.id_at(i)) for i in range(current.n)]
+    before = memory_kib()
+
+    if mode == "dicts":
+        books = {str(oid): current.doc(i) for i, oid in enumerate(ids)}
+        get = books.get
+        keys = list(books)
+        page = lambda start: [books[k] for k in keys[start:start + 100]]
+        lookups = [str(oid) for oid in ids]
+    else:
+        for i in range(current.n):
+            current.doc(i)
+        get = snapshot.get
+        page = lambda start: [current.doc(i) for i in range(start, min(start + 100, current.n))]
+        lookups = ids
+
+    rng = random.Random(os.getpid())
+    get_us, page_us = [], []
+    for _ in range(20_000):
+        key = rng.choice(lookups)
+        start = time.perf_counter()
+        get(key)
+        get_us.append((time.perf_counter() - start) * 1e6)
+    for _ in range(2_000):
+        offset = rng.randrange(len(lookups))
+        start = time.perf_counter()
+        page(offset)
+        page_us.append((time.perf_counter() - start) * 1e6)
+
+    # todos los procesos vivos a la vez para que Pss reparta lo compartido
+    barrier.wait()
+    after = memory_kib()
+    barrier.wait()
+    get_us.sort()
+    page_us.sort()
+    results.put((mode, after[0] - before[0], after[1] - before[1],
+                 percentile(get_us, 50), percentile(get_us, 99), percentile(page_us, 50)))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.snapshot")
+        write_snapshot(path, n, random.Random(22))
+        size = os.path.getsize(path)
+
+        ctx = multiprocessing.get_context("spawn")
+        print(f"libros: {n:,}, archivo: {size / 2**20:.1f} MiB, workers por modo: {n_workers}")
+        for mode in ("dicts", "mmap"):
+            barrier = ctx.Barrier(n_workers)
+            results = ctx.Queue()
+            procs = [ctx.Process(target=worker, args=(mode, path, barrier, results)) for _ in range(n_workers)]
+            for p in procs:
+                p.start()
+            rows = [results.get() for _ in procs]
+            for p in procs:
+                p.join()
+
+            pss = sum(r[1] for r in rows) / n_workers / 1024
+            private = sum(r[2] for r in rows) / n_workers / 1024
+            get50 = sum(r[3] for r in rows) / n_workers
+            get99 = sum(r[4] for r in rows) / n_workers
+            page50 = sum(r[5] for r in rows) / n_workers
+            print(f"{mode:6} por worker: Pss +{pss:.1f} MiB, privada +{private:.1f} MiB | "
+                  f"libro p50 {get50:.1f} µs, p99 {get99:.1f} µs | página de 100 p50 {page50:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
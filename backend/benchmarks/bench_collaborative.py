@@ -0,0 +1,112 @@
+# backend/benchmarks/bench_collaborative.py
+#
+# Construcción, memoria y consultas del filtrado colaborativo ítem-ítem
+# (GET /recommend/by-history) con reseñas sintéticas: popularidad de los
+# libros y actividad de los usuarios con distribución de Zipf, sentimiento
+# al azar. Mide también el costo de agregar reseñas en lotes como los del
+# pipeline de reseñas y cuánto se atrasa el event loop mientras se aplican
+# en segundo plano (lo que vería cualquier otra petición del worker).
+#
+#   python -m benchmarks.bench_collaborative [n_reviews] [n_books] [n_users]
+
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+from itertools import accumulate
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.collaborative import ItemSimilarityIndex
+
+
+def zipf_sampler(n, rng, s):
+    cum = list(accumulate(1 / (rank + 1) ** s for rank in range(n)))
+    return lambda k: rng.choices(range(n), cum_weights=cum, k=k)
+
+
+def make_reviews(n, n_books, n_users, rng):
+    books = zipf_sampler(n_books, rng, 1.0)(n)
+    users = zipf_sampler(n_users, rng, 0.6)(n)
+    return [
+        {"username": f"user{u}", "book_id": f"book{b}",
+         "sentiment_score": rng.choice((-1.0, -0.5, 0.0, 0.5, 1.0))}
+        for u, b in zip(users, books)
+    ]
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+async def loop_lag(index, reviews):
+    """Atraso máximo de un timer de 1 ms mientras se aplican `reviews` en lotes de 100."""
+    index._built = True
+    gaps = []
+
+    async def ticker():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append((now - last) * 1000 - 1)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    for i in range(0, len(reviews), 100):
+        index.add_reviews(reviews[i:i + 100])
+        await asyncio.sleep(0.005)
+    await index.flush()
+    elapsed = time.perf_counter() - start
+    tick.cancel()
+    gaps.sort()
+    return elapsed, gaps
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_books = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    n_users = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+    rng = random.Random(5)
+    reviews = make_reviews(n + 20_000, n_books, n_users, rng)
+
+    index = ItemSimilarityIndex()
+    tracemalloc.start()
+    start = time.perf_counter()
+    index._build_from(reviews[:n])
+    build_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    batches = []
+    for i in range(n, n + 10_000, 100):
+        start = time.perf_counter()
+        index.add_reviews(reviews[i:i + 100])
+        batches.append((time.perf_counter() - start) * 1000)
+    batches.sort()
+
+    elapsed, gaps = asyncio.run(loop_lag(index, reviews[n + 10_000:]))
+
+    users = [f"user{rng.randrange(n_users)}" for _ in range(5000)]
+    lookups = []
+    for username in users:
+        start = time.perf_counter()
+        index.recommend(username, limit=10)
+        lookups.append((time.perf_counter() - start) * 1e6)
+    lookups.sort()
+
+    print(f"reseñas:              {n:,} ({len(index._users):,} usuarios, {len(index):,} libros)")
+    print(f"construcción:         {build_s:.1f} s")
+    print(f"memoria del índice:   {index.memory_bytes() / 2**20:.1f} MiB")
+    print(f"pico al construir:    {peak / 2**20:.1f} MiB")
+    print(f"lote de 100 reseñas:  p50 {percentile(batches, 50):.1f} ms, p99 {percentile(batches, 99):.1f} ms")
+    print(f"en segundo plano:     10,000 reseñas en {elapsed:.1f} s, atraso del loop "
+          f"p50 {percentile(gaps, 50):.1f} ms, p99 {percentile(gaps, 99):.1f} ms, máx {gaps[-1]:.1f} ms")
+    print(f"consulta:             p50 {percentile(lookups, 50):.0f} µs, p99 {percentile(lookups, 99):.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
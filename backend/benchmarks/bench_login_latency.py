@@ -0,0 +1,119 @@
+# backend/benchmarks/bench_login_latency.py
+#
+# Latencia de GET /books (p50/p99) mientras hay logins concurrentes,
+# con el KDF en el event loop (HASH_WORKERS=0, como antes) y en el pool.
+# Corre la app en el mismo proceso con colecciones en memoria.
+#
+#   python -m benchmarks.bench_login_latency [segundos] [logins_concurrentes]
+
+import asyncio
+import statistics
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from bson import ObjectId
+from passlib.hash import pbkdf2_sha256
+
+from app import auth, books
+from app.hashing import PasswordHasher
+from app.main import app
+
+
+class MemoryCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        return MemoryCursor(self._docs[:n])
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self._docs:
+                yield doc
+        return gen()
+
+
+class MemoryCollection:
+    def __init__(self, docs):
+        self._docs = docs
+
+    async def find_one(self, query, projection=None):
+        for doc in self._docs:
+            if all(doc.get(k) == v for k, v in query.items()):
+                return doc
+        return None
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(self._docs)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run(seconds, concurrency, workers):
+    auth.password_hasher = PasswordHasher(workers=workers, queue_limit=10_000)
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    logins = 0
+    stop = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login_loop():
+            nonlocal logins
+            while time.perf_counter() < stop:
+                await client.post("/auth/login", json={"email": "bench@example.com", "password": "secret"})
+                logins += 1
+
+        async def probe_loop():
+            # Una petición cada 5 ms; la latencia se mide desde el momento en
+            # que debía salir, para contar también la espera por el event loop
+            scheduled = time.perf_counter()
+            while scheduled < stop:
+                await client.get("/books/?limit=20")
+                now = time.perf_counter()
+                latencies.append((now - scheduled) * 1000)
+                scheduled += 0.005
+                if scheduled > now:
+                    await asyncio.sleep(scheduled - now)
+
+        await asyncio.gather(probe_loop(), *[login_loop() for _ in range(concurrency)])
+
+    auth.password_hasher.shutdown()
+    return {
+        "get_books_requests": len(latencies),
+        "get_books_p50_ms": round(statistics.median(latencies), 2),
+        "get_books_p99_ms": round(percentile(latencies, 99), 2),
+        "logins_per_s": round(logins / seconds, 1),
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    auth.users_collection = MemoryCollection([{
+        "_id": ObjectId(), "username": "bench", "email": "bench@example.com",
+        "password": pbkdf2_sha256.hash("secret"), "quiz": None,
+    }])
+    books.books_collection = MemoryCollection([
+        {"_id": ObjectId(), "title": f"Libro {i}", "author": "Autor", "description": "..."}
+        for i in range(20)
+    ])
+
+    for label, workers in (("antes (KDF en el event loop)", 0),
+                           ("después (pool de hilos)", os.cpu_count() or 2)):
+        result = asyncio.run(run(seconds, concurrency, workers))
+        print(f"{label:<32} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# backend/benchmarks/bench_nlp_pool.py
+#
+# Latencia del event loop bajo carga de NLP: varias tareas piden análisis
+# de sentimiento de lotes de reseñas largas mientras un "latido" duerme
+# 5 ms en bucle y mide cuánto se retrasa al despertar. Con el análisis en
+# el event loop (NLP_WORKERS=0) el retraso crece con el tamaño del lote;
+# con el pool de procesos debe mantenerse plano.
+#
+#   python -m benchmarks.bench_nlp_pool [segundos] [textos_por_petición] [concurrencia]
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.nlp.pool import NLPPool
+from generate_data import NEGATIVE_REVIEWS, NEUTRAL_REVIEWS, POSITIVE_REVIEWS
+
+TICK = 0.005
+
+
+def make_texts(n, rng):
+    phrases = POSITIVE_REVIEWS + NEGATIVE_REVIEWS + NEUTRAL_REVIEWS
+    return [" ".join(rng.choice(phrases) for _ in range(20)) for _ in range(n)]
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+async def run(pool, texts, duration, concurrency):
+    await pool.start()
+    stop = time.perf_counter() + duration
+    lags = []
+    done = 0
+
+    async def heartbeat():
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append((time.perf_counter() - start - TICK) * 1000)
+
+    async def client():
+        nonlocal done
+        while time.perf_counter() < stop:
+            await pool.analyze(texts)
+            done += len(texts)
+
+    await asyncio.gather(heartbeat(), *[client() for _ in range(concurrency)])
+    lags.sort()
+    return {
+        "texts_per_s": round(done / duration),
+        "batches": pool.batches,
+        "lag_p50_ms": round(percentile(lags, 50), 2),
+        "lag_p99_ms": round(percentile(lags, 99), 2),
+        "lag_max_ms": round(lags[-1], 2),
+    }
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    texts = make_texts(batch, random.Random(3))
+    workers = min(4, os.cpu_count() or 1)
+
+    print(f"{batch} textos por petición, {concurrency} clientes, {duration:.0f} s")
+    for label, pool in (
+        ("event loop (NLP_WORKERS=0)", NLPPool(workers=0)),
+        (f"pool ({workers} procesos)", NLPPool(workers=workers)),
+    ):
+        try:
+            result = asyncio.run(run(pool, texts, duration, concurrency))
+        finally:
+            pool.shutdown()
+        print(f"  {label:<28} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# backend/benchmarks/bench_quiz_cache.py
+#
+# Latencia de GET /recommend/by-quiz con y sin el cache por huella del quiz.
+# Catálogo sintético; los quizzes salen de un conjunto de respuestas
+# distintas elegidas con distribución de Zipf (muchos usuarios repiten las
+# mismas), con las palabras clave en distinto orden y mayúsculas.
+#
+#   python -m benchmarks.bench_quiz_cache [n_books] [n_requests] [n_distinct]
+
+import asyncio
+import os
+import random
+import sys
+import time
+from itertools import accumulate
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import recommend_cache
+from app.book_index import BookKeywordIndex
+from app.recommend_cache import cached_recommendations
+
+GENRES = ["fantasy", "horror", "romance", "mystery", "sci-fi", "history", "poetry", "thriller"]
+SYLLABLES = ["ma", "gi", "dra", "gón", "rei", "no", "ca", "sa", "lu", "na", "te", "rro"]
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def make_index(n_books, words, rng):
+    index = BookKeywordIndex()
+    for i in range(n_books):
+        desc = " ".join(rng.choices(words, k=12) + rng.choices(GENRES, k=1))
+        index._add({"_id": f"book{i}", "title": f"Libro {i}", "description": desc})
+    index._built = True
+    return index
+
+
+def make_requests(n, n_distinct, words, rng):
+    quizzes = [(rng.choice(GENRES), rng.sample(words, 3)) for _ in range(n_distinct)]
+    cum = list(accumulate(1 / (rank + 1) for rank in range(n_distinct)))
+    requests = []
+    for genre, keywords in rng.choices(quizzes, cum_weights=cum, k=n):
+        keywords = rng.sample(keywords, len(keywords))
+        requests.append((genre.capitalize() if rng.random() < 0.5 else genre, keywords))
+    return requests
+
+
+async def timed(requests, handle):
+    times = []
+    for genre, keywords in requests:
+        start = time.perf_counter()
+        await handle(genre.lower(), [k.lower() for k in keywords])
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)
+
+
+async def main():
+    n_books = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    n_distinct = int(sys.argv[3]) if len(sys.argv) > 3 else 2_000
+    rng = random.Random(21)
+    words = sorted({"".join(rng.choices(SYLLABLES, k=rng.randint(2, 3))) for _ in range(400)})
+    index = make_index(n_books, words, rng)
+    requests = make_requests(n_requests, n_distinct, words, rng)
+
+    async def uncached(genre, keywords):
+        return index.recommend(genre, keywords, limit=10)
+
+    async def cached(genre, keywords):
+        async def compute():
+            return index.recommend(genre, keywords, limit=10)
+        return await cached_recommendations(genre, keywords, compute)
+
+    before = await timed(requests, uncached)
+    after = await timed(requests, cached)
+    stats = recommend_cache.stats()
+
+    # 200 peticiones simultáneas con el mismo quiz recién salido del cache
+    recommend_cache.quiz_cache.clear()
+    computed = 0
+
+    async def slow_compute():
+        nonlocal computed
+        computed += 1
+        await asyncio.sleep(0.05)
+        return index.recommend("fantasy", words[:3], limit=10)
+
+    await asyncio.gather(*(
+        cached_recommendations("fantasy", words[:3], slow_compute) for _ in range(200)
+    ))
+
+    print(f"libros: {n_books:,}, peticiones: {n_requests:,}, quizzes distintos: {n_distinct:,}")
+    print(f"sin cache:  p50 {percentile(before, 50):.2f} ms, p99 {percentile(before, 99):.2f} ms, total {sum(before) / 1000:.2f} s")
+    print(f"con cache:  p50 {percentile(after, 50):.3f} ms, p99 {percentile(after, 99):.2f} ms, total {sum(after) / 1000:.2f} s")
+    print(f"aciertos:   {stats['hits'] / (stats['hits'] + stats['misses']):.1%}, {stats['size']:,} entradas, {stats['bytes'] / 1024:.0f} KiB")
+    print(f"estampida:  200 peticiones simultáneas, {computed} cálculo(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+# backend/benchmarks/bench_rescore.py
+#
+# Re-scoring de reseñas guardadas (app/rescore.py) sobre la base en memoria:
+# reseñas sintéticas calificadas con un léxico viejo y vueltas a calificar
+# con el actual. Mide reseñas por segundo sin límite, cuántas escrituras
+# hace (solo las que cambian) y qué tan bien respeta `ops_per_sec`.
+#
+#   DB_BACKEND=memory python -m benchmarks.bench_rescore [n_reviews] [ops_per_sec]
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import rescore
+from app.database_mock import MemoryCollection
+from app.nlp.sentiment import NEGATIVE_WORDS, POSITIVE_WORDS, SentimentAnalyzer
+
+FILLER = ["el", "libro", "me", "pareció", "la", "historia", "personajes", "final", "trama", "muy"]
+
+
+async def fill(reviews, n, old, rng):
+    vocabulary = FILLER * 6 + sorted(POSITIVE_WORDS) + sorted(NEGATIVE_WORDS)
+    docs = []
+    for _ in range(n):
+        text = " ".join(rng.choices(vocabulary, k=rng.randint(8, 40)))
+        label, score = old.analyze(text)
+        docs.append({"text": text, "sentiment_label": label, "sentiment_score": score,
+                     "sentiment_version": old.version})
+    await reviews.insert_many(docs)
+
+
+async def run(n, ops_per_sec):
+    rng = random.Random(23)
+    # léxico viejo: sin una palabra de cada lista
+    old = SentimentAnalyzer(sorted(POSITIVE_WORDS)[:-1], sorted(NEGATIVE_WORDS)[:-1])
+    new = SentimentAnalyzer(POSITIVE_WORDS, NEGATIVE_WORDS)
+
+    results = []
+    for limit in (0, ops_per_sec):
+        reviews, jobs = MemoryCollection("reviews"), MemoryCollection("jobs")
+        rescore.reviews_collection, rescore.jobs_collection = reviews, jobs
+        await fill(reviews, n, old, rng)
+
+        start = time.perf_counter()
+        state = await rescore.rescore_reviews(ops_per_sec=limit, version=new.version,
+                                              analyze=new.analyze_batch)
+        results.append((limit, state, time.perf_counter() - start))
+
+    for limit, state, elapsed in results:
+        label = "sin límite" if not limit else f"límite {limit:,.0f}/s"
+        print(f"{label:18} {state['scanned']:,} leídas, {state['changed']:,} escritas "
+              f"({state['changed'] / state['scanned']:.0%}), {elapsed:.2f} s, "
+              f"{state['scanned'] / elapsed:,.0f} reseñas/s")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    ops_per_sec = float(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    asyncio.run(run(n, ops_per_sec))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# backend/benchmarks/bench_search.py
+#
+# Construcción y latencia de GET /books/search (BookSearchIndex) sobre
+# catálogos sintéticos: vocabulario con distribución de Zipf (pocas
+# palabras muy frecuentes y una cola larga), consultas de 1 a 3 palabras
+# tomadas de la misma distribución.
+#
+#   python -m benchmarks.bench_search [n_books,...] [n_queries]
+
+import os
+import random
+import sys
+import time
+from itertools import accumulate
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+from app.search import BookSearchIndex
+
+VOCABULARY = 50_000
+SYLLABLES = ["ma", "gi", "dra", "gón", "rei", "no", "ca", "sa", "lu", "na", "te", "rro", "vi", "da", "sol", "mar"]
+
+
+def make_vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def zipf_sampler(words, rng, s=1.0):
+    cum = list(accumulate(1 / (rank + 1) ** s for rank in range(len(words))))
+    return lambda k: rng.choices(words, cum_weights=cum, k=k)
+
+
+def make_docs(n, sample):
+    return [
+        {"_id": ObjectId(), "title": " ".join(sample(3)), "author": " ".join(sample(2)),
+         "description": " ".join(sample(25))}
+        for _ in range(n)
+    ]
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def main():
+    sizes = [int(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "100000,1000000").split(",")]
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(11)
+    sample = zipf_sampler(make_vocabulary(rng), rng)
+
+    for n in sizes:
+        docs = make_docs(n, sample)
+        index = BookSearchIndex()
+        start = time.perf_counter()
+        index._build_from(docs)
+        build_s = time.perf_counter() - start
+        del docs
+        arrays = index._doc_ids.nbytes + index._weights.nbytes + index._offsets.nbytes
+
+        queries = [" ".join(sample(rng.randint(1, 3))) for _ in range(n_queries)]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, limit=20)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+
+        adds = []
+        for doc in make_docs(2000, sample):
+            start = time.perf_counter()
+            index.add(doc)
+            adds.append((time.perf_counter() - start) * 1000)
+        adds.sort()
+
+        print(
+            f"{n:>9,} libros: build {build_s:.1f} s, postings {arrays / 2**20:.0f} MiB | "
+            f"search p50 {percentile(latencies, 50):.2f} ms, p99 {percentile(latencies, 99):.2f} ms, "
+            f"max {latencies[-1]:.2f} ms | add p50 {percentile(adds, 50):.3f} ms, "
+            f"p99 {percentile(adds, 99):.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# backend/benchmarks/bench_sentiment.py
+#
+# Compara el analizador compilado contra la versión anterior (un `in` por
+# palabra del léxico) sobre 100k reseñas sintéticas, con el léxico actual y
+# con léxicos más grandes.
+#
+#   python -m benchmarks.bench_sentiment [n_reviews]
+
+import random
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.nlp.sentiment import POSITIVE_WORDS, NEGATIVE_WORDS, SentimentAnalyzer
+from generate_data import POSITIVE_REVIEWS, NEGATIVE_REVIEWS, NEUTRAL_REVIEWS
+
+
+def legacy_analyze_sentiment(text, positive=POSITIVE_WORDS, negative=NEGATIVE_WORDS):
+    text_lower = text.lower()
+
+    pos_count = sum(word in text_lower for word in positive)
+    neg_count = sum(word in text_lower for word in negative)
+
+    score = pos_count - neg_count
+    label = "positive" if score > 0 else "negative" if score < 0 else "neutral"
+    total_hits = pos_count + neg_count
+    return label, float(score / total_hits) if total_hits else 0.0
+
+
+def make_reviews(n, seed=42):
+    rng = random.Random(seed)
+    phrases = POSITIVE_REVIEWS + NEGATIVE_REVIEWS + NEUTRAL_REVIEWS
+    return [
+        " ".join(rng.choice(phrases) for _ in range(rng.randint(1, 6)))
+        for _ in range(n)
+    ]
+
+
+def timed(label, fn, n):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {elapsed * 1000:9.1f} ms  {n / elapsed:12,.0f} reseñas/s")
+    return elapsed
+
+
+def run(reviews, positive, negative):
+    n = len(reviews)
+    analyzer = SentimentAnalyzer(positive, negative)
+
+    base = timed("legacy (substring)", lambda: [
+        legacy_analyze_sentiment(t, positive, negative) for t in reviews
+    ], n)
+    single = timed("analyze (una por una)", lambda: [analyzer.analyze(t) for t in reviews], n)
+    batch = timed("analyze_batch", lambda: analyzer.analyze_batch(reviews), n)
+
+    print(f"  speedup: {base / single:.2f}x (una por una), {base / batch:.2f}x (batch)\n")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    reviews = make_reviews(n)
+    print(f"{n:,} reseñas, {sum(map(len, reviews)) / n:.0f} caracteres en promedio\n")
+
+    for extra in (0, 500, 2000):
+        positive = set(POSITIVE_WORDS) | {f"positivo{i}" for i in range(extra // 2)}
+        negative = set(NEGATIVE_WORDS) | {f"negativo{i}" for i in range(extra // 2)}
+        print(f"léxico de {len(positive) + len(negative)} palabras")
+        run(reviews, positive, negative)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# backend/benchmarks/bench_serialization.py
+#
+# Costo de serializar una respuesta de lista, por cada 10k documentos:
+#
+# - pydantic: el camino anterior; un BookOut/ReviewOut por documento y
+#   luego lo que hace FastAPI con `response_model` (volcar, validar contra
+#   List[...], serializar a tipos JSON y json.dumps).
+# - dict + json: proyección directa a dicts y json.dumps (sin orjson).
+# - dict + orjson: el camino actual (document_to_*_dict + dump_json).
+#
+#   python -m benchmarks.bench_serialization [n_items] [repeticiones]
+
+import json
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from app.books import document_to_book_dict, document_to_book_out
+from app.pagination import dump_json
+from app.reviews import document_to_review_dict, document_to_review_out
+from app.schemas import BookOut, ReviewOut
+
+WORDS = "magia viaje dragón reino guerra amor traición crimen detective ciudad".split()
+
+
+def make_docs(n, rng):
+    books = [
+        {"_id": ObjectId(), "title": f"Libro {i}", "author": f"Autor {i % 97}",
+         "description": " ".join(rng.choices(WORDS, k=12))}
+        for i in range(n)
+    ]
+    reviews = [
+        {"_id": ObjectId(), "book_id": ObjectId(), "username": f"user{i}",
+         "text": " ".join(rng.choices(WORDS, k=20)),
+         "sentiment_label": rng.choice(["positive", "negative", "neutral"]),
+         "sentiment_score": rng.random()}
+        for i in range(n)
+    ]
+    return books, reviews
+
+
+def pydantic_path(adapter, to_out):
+    def run(docs):
+        models = [to_out(d) for d in docs]
+        # FastAPI: _prepare_response_content + validate + serialize + JSONResponse
+        content = [m.model_dump() for m in models]
+        value = adapter.validate_python(content)
+        data = adapter.dump_python(value, mode="json")
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return run
+
+
+def dict_json_path(to_dict):
+    def run(docs):
+        return json.dumps([to_dict(d) for d in docs], ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8")
+    return run
+
+
+def dict_orjson_path(to_dict):
+    def run(docs):
+        return dump_json([to_dict(d) for d in docs])
+    return run
+
+
+def measure(fn, docs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(docs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    books, reviews = make_docs(n, random.Random(7))
+
+    cases = {
+        "books": (books, document_to_book_out, document_to_book_dict, TypeAdapter(List[BookOut])),
+        "reviews": (reviews, document_to_review_out, document_to_review_dict, TypeAdapter(List[ReviewOut])),
+    }
+    for name, (docs, to_out, to_dict, adapter) in cases.items():
+        paths = {
+            "pydantic": pydantic_path(adapter, to_out),
+            "dict + json": dict_json_path(to_dict),
+            "dict + orjson": dict_orjson_path(to_dict),
+        }
+        # Las tres salidas deben ser el mismo JSON
+        outputs = {label: json.loads(fn(docs[:100])) for label, fn in paths.items()}
+        assert len({json.dumps(o) for o in outputs.values()}) == 1, outputs.keys()
+
+        baseline = None
+        print(f"{name} ({n:,} items, mejor de {repeat})")
+        for label, fn in paths.items():
+            seconds = measure(fn, docs, repeat)
+            baseline = baseline or seconds
+            per_10k = seconds * 10_000 / n * 1000
+            print(f"  {label:<14} {per_10k:8.2f} ms / 10k   x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
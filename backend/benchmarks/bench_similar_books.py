@@ -0,0 +1,76 @@
+# backend/benchmarks/bench_similar_books.py
+#
+# Tiempo de construcción y memoria del índice de libros parecidos para un
+# catálogo sintético, más el costo de agregar libros de uno en uno.
+#
+#   python -m benchmarks.bench_similar_books [n_books]
+
+import random
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+from app.similar_books import SimilarBooksIndex
+
+WORDS = (
+    "magia aventura viaje dragón reino guerra amor traición misterio "
+    "crimen detective ciudad bosque mar espacio robot futuro pasado "
+    "familia amistad venganza secreto poder héroe villano escuela "
+    "ciencia planeta imperio rebelde música muerte vida sueño noche"
+).split()
+
+
+def make_books(n, seed=7):
+    rng = random.Random(seed)
+    # vocabulario con cola larga, como un catálogo real
+    vocab = WORDS + [f"termino{i}" for i in range(20_000)]
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    return [
+        {
+            "_id": ObjectId(),
+            "title": " ".join(rng.choices(vocab, weights, k=3)),
+            "author": f"Autor {rng.randint(1, n // 10 + 1)}",
+            "description": " ".join(rng.choices(vocab, weights, k=rng.randint(10, 40))),
+        }
+        for _ in range(n)
+    ]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    books = make_books(n + 1000)
+
+    index = SimilarBooksIndex()
+    tracemalloc.start()
+    start = time.perf_counter()
+    index._build_from(books[:n])
+    build_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for doc in books[n:]:
+        index.add(doc)
+    add_ms = (time.perf_counter() - start) / 1000 * 1000
+
+    sample = [str(d["_id"]) for d in books[:1000]]
+    start = time.perf_counter()
+    for book_id in sample:
+        index.similar(book_id)
+    lookup_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    print(f"libros:               {n:,}")
+    print(f"construcción:         {build_s:.1f} s")
+    print(f"memoria del índice:   {index.memory_bytes() / 2**20:.1f} MiB")
+    print(f"pico al construir:    {peak / 2**20:.1f} MiB")
+    print(f"agregar un libro:     {add_ms:.2f} ms")
+    print(f"consulta:             {lookup_us:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
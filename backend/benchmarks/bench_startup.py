@@ -0,0 +1,139 @@
+# backend/benchmarks/bench_startup.py
+#
+# Mide lo que tarda en arrancar un worker:
+#
+# - `python -X importtime -c "import app.main"`: tiempo total de importación
+#   y los paquetes que más pesan (suma del tiempo propio de sus módulos).
+# - Tiempo hasta la primera respuesta: lanza uvicorn (con la base en
+#   memoria) y cuenta desde el arranque del proceso hasta que GET / y
+#   GET /books/ responden.
+#
+# Termina con código 1 si la mediana del tiempo de importación supera
+# --max-import-ms, para usarlo en CI.
+#
+#   python -m benchmarks.bench_startup --runs 5 --max-import-ms 1000
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la API")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="paquetes a mostrar")
+    parser.add_argument("--max-import-ms", type=float, default=1000.0)
+    parser.add_argument("--warmup", default="lazy", choices=("lazy", "background", "eager"),
+                        help="NLP_WARMUP para la prueba de primera respuesta")
+    parser.add_argument("--skip-server", action="store_true")
+    return parser.parse_args()
+
+
+def child_env(**extra):
+    env = dict(os.environ, DB_BACKEND="memory", PYTHONDONTWRITEBYTECODE="1")
+    env.update(extra)
+    return env
+
+
+def import_times():
+    """(ms totales de app.main, {paquete: ms propios de todos sus módulos})."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True, check=True,
+    )
+    total = None
+    packages = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line.split("|")
+        try:
+            own_us = int(own.split(":")[-1])
+            cumulative_us = int(cumulative)
+        except ValueError:
+            continue  # encabezado
+        name = name.strip()
+        if name == "app.main":
+            total = cumulative_us / 1000
+        packages[name.split(".")[0]] += own_us / 1000
+    return total, packages
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                response.read()
+                return True
+        except OSError:
+            time.sleep(0.01)
+    return False
+
+
+def time_to_first_request(warmup):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=child_env(NLP_WARMUP=warmup),
+    )
+    try:
+        deadline = start + 60
+        if not wait_for(base + "/", deadline):
+            raise RuntimeError("uvicorn no respondió en 60 s")
+        first = time.perf_counter() - start
+        wait_for(base + "/books/?limit=10", deadline)
+        books = time.perf_counter() - start
+        return first * 1000, books * 1000
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    args = parse_args()
+
+    totals = []
+    packages = defaultdict(list)
+    for _ in range(args.runs):
+        total, by_package = import_times()
+        totals.append(total)
+        for name, ms in by_package.items():
+            packages[name].append(ms)
+
+    import_ms = statistics.median(totals)
+    print(f"import app.main: mediana {import_ms:.0f} ms ({args.runs} corridas)")
+    ranked = sorted(packages.items(), key=lambda kv: -statistics.median(kv[1]))
+    for name, values in ranked[:args.top]:
+        print(f"  {name:<24} {statistics.median(values):8.1f} ms")
+
+    if not args.skip_server:
+        runs = [time_to_first_request(args.warmup) for _ in range(args.runs)]
+        first = statistics.median(r[0] for r in runs)
+        books = statistics.median(r[1] for r in runs)
+        print(f"primera respuesta (NLP_WARMUP={args.warmup}): GET / {first:.0f} ms, "
+              f"GET /books/ {books:.0f} ms")
+
+    if import_ms > args.max_import_ms:
+        print(f"ERROR: la importación ({import_ms:.0f} ms) supera {args.max_import_ms:.0f} ms",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+# backend/generate_data.py
+#
+# Genera un conjunto de datos sintético (libros, usuarios y reseñas) para
+# pruebas de capacidad. Reemplaza a seed.py y seed_reviews.py.
+#
+# - Determinista: con la misma semilla salen los mismos documentos, con los
+#   mismos _id, sin importar cuántos escritores ni qué tamaño de bloque se
+#   usen.
+# - Popularidad tipo Zipf: pocos libros concentran la mayoría de las
+#   reseñas, pocos usuarios escriben muchas, y los quizzes se repiten.
+# - Se escribe por bloques con `insert_many` desde varios escritores
+#   concurrentes, o a archivos NDJSON (formato extendido de Mongo, listo
+#   para `mongoimport`).
+#
+# Todos los usuarios comparten la contraseña de --password (el KDF se
+# calcula una sola vez). El sentimiento se calcula con el léxico actual.
+#
+#   python generate_data.py [--books N] [--users N] [--reviews N] [--seed S]
+#                           [--writers W] [--chunk C] [--ndjson DIR] [--keep]
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+import time
+from itertools import accumulate
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bson import ObjectId
+from passlib.hash import pbkdf2_sha256
+
+from app.nlp.sentiment import LEXICON_VERSION, analyze_sentiment_batch
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+# Los _id van creciendo desde esta fecha (noviembre de 2023)
+BASE_TIMESTAMP = 1_700_000_000
+
+GENRES = [
+    "fantasía", "ciencia ficción", "romance", "misterio", "terror", "historia",
+    "aventura", "thriller", "poesía", "biografía", "drama", "humor",
+]
+
+WORDS = [
+    "reino", "sombra", "viaje", "mar", "ciudad", "memoria", "fuego", "noche",
+    "jardín", "espejo", "tormenta", "isla", "secreto", "camino", "estrella",
+    "río", "guerra", "silencio", "torre", "bosque", "luz", "hielo", "puerta",
+    "ceniza", "lobo", "corona", "invierno", "desierto", "máscara", "promesa",
+]
+
+KEYWORDS = [
+    "magia", "dragones", "espacio", "amor", "detective", "fantasmas", "guerra",
+    "robots", "viajes", "familia", "venganza", "amistad", "piratas", "política",
+    "crimen", "mitología", "futuro", "monstruos", "misterio", "humor",
+]
+
+FIRST_NAMES = [
+    "Ana", "Luis", "María", "Jorge", "Lucía", "Pedro", "Sofía", "Andrés",
+    "Camila", "Diego", "Valeria", "Mateo", "Elena", "Pablo", "Isabel", "Tomás",
+]
+
+LAST_NAMES = [
+    "García", "Rodríguez", "López", "Martínez", "Hernández", "Pérez", "Gómez",
+    "Sánchez", "Ramírez", "Torres", "Flores", "Rivera", "Vargas", "Castillo",
+]
+
+POSITIVE_REVIEWS = [
+    "Me encantó, la historia fue emocionante.",
+    "Un libro increíble, muy bien escrito.",
+    "Disfruté cada capítulo, totalmente recomendado.",
+    "El desarrollo de personajes fue excelente.",
+    "Una lectura muy agradable y llena de emoción.",
+    "Me atrapó desde el inicio, maravilloso.",
+]
+
+NEGATIVE_REVIEWS = [
+    "La historia se me hizo aburrida y muy lenta.",
+    "No cumplió mis expectativas.",
+    "Los personajes no me parecieron interesantes.",
+    "Demasiado predecible y sin emoción.",
+    "No lo volvería a leer.",
+    "Muy mal ritmo narrativo.",
+]
+
+NEUTRAL_REVIEWS = [
+    "Es un libro decente, nada especial.",
+    "Tuvo partes buenas y malas.",
+    "Una experiencia normal, no destaca mucho.",
+    "Interesante pero no memorable.",
+    "Un libro promedio, aceptable.",
+]
+
+ACTION_LEVELS = ["low", "medium", "high"]
+# Cada bloque de BLOCK documentos tiene su propio generador aleatorio, así
+# los datos no dependen de --chunk ni de --writers
+BLOCK = 1000
+KINDS = {"books": 1, "users": 2, "reviews": 3}
+
+
+def object_id(seed_tag: bytes, kind: str, i: int) -> ObjectId:
+    """
+    _id determinista con la forma de un ObjectId: 4 bytes de tiempo, 1 de
+    colección, 4 de la semilla y 3 de contador. Crece con `i`.
+    """
+    return ObjectId(struct.pack(">IB4s", BASE_TIMESTAMP + (i >> 24), KINDS[kind], seed_tag)
+                    + (i & 0xFFFFFF).to_bytes(3, "big"))
+
+
+class Zipf:
+    """Índices en [0, n) con probabilidad ~ 1 / rango^s, en un orden al azar."""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.cum_weights = list(accumulate(1 / (rank + 1) ** s for rank in range(n)))
+        self.order = list(range(n))
+        rng.shuffle(self.order)
+        self.ranks = range(n)
+
+    def sample(self, rng: random.Random, k: int) -> list:
+        order = self.order
+        return [order[r] for r in rng.choices(self.ranks, cum_weights=self.cum_weights, k=k)]
+
+
+class Dataset:
+    def __init__(self, n_books: int, n_users: int, seed: int, password: str):
+        self.n_books = n_books
+        self.n_users = n_users
+        self.seed = seed
+        self.seed_tag = hashlib.blake2b(str(seed).encode(), digest_size=4).digest()
+        rng = random.Random(f"{seed}:popularity")
+        self.book_popularity = Zipf(n_books, 1.0, rng)
+        self.user_activity = Zipf(n_users, 0.8, rng)
+        self.authors = Zipf(max(1, n_books // 5), 1.1, rng)
+        self.genres = Zipf(len(GENRES), 0.9, rng)
+        self.keywords = Zipf(len(KEYWORDS), 0.9, rng)
+        self.password_hash = pbkdf2_sha256.hash(password)
+
+    def _rng(self, kind: str, start: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{start}")
+
+    def author(self, a: int) -> str:
+        name = f"{FIRST_NAMES[a % len(FIRST_NAMES)]} {LAST_NAMES[a // len(FIRST_NAMES) % len(LAST_NAMES)]}"
+        combos = len(FIRST_NAMES) * len(LAST_NAMES)
+        return name if a < combos else f"{name} {a // combos + 1}"
+
+    def books(self, start: int, stop: int) -> list:
+        rng = self._rng("books", start)
+        authors = self.authors.sample(rng, stop - start)
+        docs = []
+        for i, a in zip(range(start, stop), authors):
+            genre = GENRES[self.genres.sample(rng, 1)[0]]
+            title = " ".join(rng.sample(WORDS, rng.randint(2, 4))).capitalize()
+            words = rng.choices(WORDS, k=rng.randint(10, 40))
+            keywords = [KEYWORDS[k] for k in self.keywords.sample(rng, 3)]
+            docs.append({
+                "_id": object_id(self.seed_tag, "books", i),
+                "title": f"{title} {i}",
+                "author": self.author(a),
+                "description": f"Una novela de {genre} sobre {', '.join(keywords)}. " + " ".join(words),
+            })
+        return docs
+
+    def users(self, start: int, stop: int) -> list:
+        rng = self._rng("users", start)
+        docs = []
+        for i in range(start, stop):
+            quiz = None
+            if rng.random() < 0.7:
+                quiz = {
+                    "favorite_genre": GENRES[self.genres.sample(rng, 1)[0]],
+                    "action_level": rng.choice(ACTION_LEVELS),
+                    "keywords": sorted({KEYWORDS[k] for k in self.keywords.sample(rng, 3)}),
+                }
+            docs.append({
+                "_id": object_id(self.seed_tag, "users", i),
+                "username": f"lector{i}",
+                "email": f"lector{i}@example.com",
+                "password": self.password_hash,
+                "quiz": quiz,
+            })
+        return docs
+
+    def reviews(self, start: int, stop: int) -> list:
+        rng = self._rng("reviews", start)
+        n = stop - start
+        books = self.book_popularity.sample(rng, n)
+        users = self.user_activity.sample(rng, n)
+        texts = []
+        for b in books:
+            # cada libro tiene su propia fama: más o menos reseñas positivas
+            liked = (b * 2654435761 % 1000) / 1000
+            positive = 0.15 + 0.7 * liked
+            negative = positive + (1 - positive) * 0.6
+            roll = rng.random()
+            pool = (POSITIVE_REVIEWS if roll < positive
+                    else NEGATIVE_REVIEWS if roll < negative
+                    else NEUTRAL_REVIEWS)
+            texts.append(" ".join(rng.sample(pool, rng.randint(1, 3))))
+
+        sentiments = analyze_sentiment_batch(texts)
+        return [
+            {
+                "_id": object_id(self.seed_tag, "reviews", i),
+                "book_id": object_id(self.seed_tag, "books", b),
+                "username": f"lector{u}",
+                "text": text,
+                "sentiment_label": label,
+                "sentiment_score": score,
+                "sentiment_version": LEXICON_VERSION,
+            }
+            for i, b, u, text, (label, score) in zip(range(start, stop), books, users, texts, sentiments)
+        ]
+
+
+# ======================
+# DESTINOS
+# ======================
+
+class MongoSink:
+    """insert_many en la base configurada (DB_BACKEND / MONGO_URL)."""
+
+    ordered = False
+
+    def __init__(self, keep: bool):
+        from app.database import books_collection, reviews_collection, users_collection
+
+        self.keep = keep
+        self.collections = {
+            "books": books_collection, "users": users_collection, "reviews": reviews_collection,
+        }
+
+    async def open(self, kind: str):
+        if not self.keep:
+            await self.collections[kind].delete_many({})
+
+    async def write(self, kind: str, docs: list):
+        await self.collections[kind].insert_many(docs, ordered=False)
+
+    async def close(self):
+        pass
+
+
+def _extended_json(value):
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class NdjsonSink:
+    """Un archivo <colección>.ndjson por colección, en el orden de los _id."""
+
+    ordered = True
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.files = {}
+
+    async def open(self, kind: str):
+        self.files[kind] = open(os.path.join(self.directory, f"{kind}.ndjson"), "wb")
+
+    async def write(self, kind: str, docs: list):
+        for doc in docs:
+            doc["_id"] = {"$oid": str(doc["_id"])}
+            if "book_id" in doc:
+                doc["book_id"] = {"$oid": str(doc["book_id"])}
+        if orjson is not None:
+            data = b"".join(orjson.dumps(doc) + b"\n" for doc in docs)
+        else:
+            data = "".join(
+                json.dumps(doc, ensure_ascii=False, default=_extended_json) + "\n" for doc in docs
+            ).encode()
+        self.files[kind].write(data)
+
+    async def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+def generate(make, start: int, stop: int) -> list:
+    """Documentos [start, stop) generados bloque por bloque (`start` múltiplo de BLOCK)."""
+    docs = []
+    for block in range(start, stop, BLOCK):
+        docs += make(block, min(stop, block + BLOCK))
+    return docs
+
+
+async def produce(kind: str, total: int, make, sink, writers: int, chunk: int) -> float:
+    """Escribe `total` documentos en bloques de `chunk` desde `writers` tareas."""
+    await sink.open(kind)
+    chunk = max(BLOCK, chunk // BLOCK * BLOCK)
+    next_start = 0
+
+    async def writer():
+        nonlocal next_start
+        while next_start < total:
+            start = next_start
+            next_start = min(total, start + chunk)
+            await sink.write(kind, generate(make, start, next_start))
+
+    started = time.perf_counter()
+    # Los archivos deben salir en orden: un solo escritor
+    await asyncio.gather(*(writer() for _ in range(1 if sink.ordered else writers)))
+    return time.perf_counter() - started
+
+
+async def main(args):
+    dataset = Dataset(args.books, args.users, args.seed, args.password)
+    sink = NdjsonSink(args.ndjson) if args.ndjson else MongoSink(args.keep)
+
+    for kind, total, make in (
+        ("books", args.books, dataset.books),
+        ("users", args.users, dataset.users),
+        ("reviews", args.reviews, dataset.reviews),
+    ):
+        elapsed = await produce(kind, total, make, sink, args.writers, args.chunk)
+        rate = total / elapsed if elapsed else 0
+        print(f"✔ {kind}: {total:,} en {elapsed:.1f} s ({rate:,.0f}/s, {rate * 60:,.0f}/min)")
+    await sink.close()
+
+    if not args.ndjson:
+        print("Ejecuta rebuild_summaries.py para recalcular resúmenes y palabras clave.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Genera libros, usuarios y reseñas sintéticos.")
+    parser.add_argument("--books", type=int, default=1_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--reviews", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--writers", type=int, default=4, help="inserciones concurrentes")
+    parser.add_argument("--chunk", type=int, default=5_000, help="documentos por insert_many")
+    parser.add_argument("--ndjson", metavar="DIR", help="escribir NDJSON en DIR en lugar de la base")
+    parser.add_argument("--keep", action="store_true", help="no borrar las colecciones antes")
+    parser.add_argument("--password", default="password123", help="contraseña de todos los usuarios")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
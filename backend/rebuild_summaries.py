@@ -0,0 +1,25 @@
+# backend/rebuild_summaries.py
+#
+# Recalcula los resúmenes por libro (book_summaries) y el modelo de
+# palabras clave a partir de todas las reseñas. Útil después de cargar
+# datos directamente en Mongo o de cambiar el análisis de sentimiento.
+
+import asyncio
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.summaries import rebuild_summaries
+from app.reviews import save_keyword_model
+
+
+async def main():
+    print("Recalculando resúmenes desde reviews…")
+    updated = await rebuild_summaries()
+    await save_keyword_model()
+    print(f"✔ Resúmenes actualizados: {updated}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
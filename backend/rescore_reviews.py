@@ -0,0 +1,43 @@
+# backend/rescore_reviews.py
+#
+# Vuelve a calificar el sentimiento de las reseñas guardadas con el léxico
+# actual (después de cambiar POSITIVE_WORDS / NEGATIVE_WORDS) y recalcula
+# los resúmenes por libro si algo cambió. Se puede interrumpir: la
+# siguiente corrida sigue donde quedó.
+#
+#   python rescore_reviews.py [ops_por_segundo] [--restart]
+
+import asyncio
+import logging
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import jobs_collection
+from app.rescore import RESCORE_JOB_ID, RESCORE_OPS_PER_SEC, rescore_reviews
+from app.summaries import rebuild_summaries
+from app.reviews import save_keyword_model
+
+
+async def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    ops_per_sec = float(args[0]) if args else RESCORE_OPS_PER_SEC
+    if "--restart" in sys.argv:
+        await jobs_collection.delete_one({"_id": RESCORE_JOB_ID})
+
+    state = await rescore_reviews(ops_per_sec=ops_per_sec)
+    print(f"✔ Léxico {state['version']}: {state['scanned']} reseñas leídas, "
+          f"{state['changed']} cambiadas")
+
+    if state["changed"]:
+        print("Recalculando resúmenes desde reviews…")
+        updated = await rebuild_summaries()
+        await save_keyword_model()
+        print(f"✔ Resúmenes actualizados: {updated}")
+    # El índice de /recommend/by-history se reconstruye al reiniciar la API
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+# Las pruebas usan la base en memoria salvo que se pida Mongo explícitamente
+# (DB_BACKEND=mongo). Debe fijarse antes de importar backend.app.database.
+os.environ.setdefault("DB_BACKEND", "memory")
+
+# Las pruebas de la API esperan el sentimiento en la respuesta de
+# POST /books/{id}/reviews: el pipeline procesa dentro de la petición.
+os.environ.setdefault("REVIEW_PIPELINE_WORKERS", "0")
+
+# El modelo de palabras clave se guarda fuera del repositorio
+os.environ.setdefault(
+    "KEYWORD_MODEL_PATH", os.path.join(tempfile.mkdtemp(), "keyword_model.json")
+)
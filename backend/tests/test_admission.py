@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+
+from backend.app.admission import AdmissionLimiter
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_fifo_and_sheds_excess():
+    limiter = AdmissionLimiter("test_fifo", concurrency=2, queue_limit=2, timeout=0.2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    order = []
+
+    async def wait(name):
+        await limiter.acquire()
+        order.append(name)
+
+    first = asyncio.create_task(wait("first"))
+    second = asyncio.create_task(wait("second"))
+    await asyncio.sleep(0)
+    assert limiter.queued == 2
+
+    with pytest.raises(HTTPException) as exc:
+        await limiter.acquire()
+    assert exc.value.status_code == 503 and exc.value.headers["Retry-After"]
+
+    limiter.release()
+    limiter.release()
+    await asyncio.gather(first, second)
+    assert order == ["first", "second"] and limiter.active == 2 and limiter.queued == 0
+
+    # nadie libera: el que espera se rinde al vencer el timeout
+    with pytest.raises(HTTPException) as exc:
+        await limiter.acquire()
+    assert "Timed out" in exc.value.detail
+    assert limiter.queued == 0 and limiter.rejected == 2
+
+    limiter.release()
+    limiter.release()
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = AdmissionLimiter("test_cancel", concurrency=1, queue_limit=4, timeout=5)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    limiter.release()
+    assert limiter.active == 0 and limiter.queued == 0
+    await limiter.acquire()
+    assert limiter.active == 1
+
+
+@pytest.mark.asyncio
+async def test_route_dependency_returns_503_with_retry_after():
+    limiter = AdmissionLimiter("test_route", concurrency=1, queue_limit=0, timeout=1)
+    gate = asyncio.Event()
+    app = FastAPI()
+
+    @app.get("/heavy", dependencies=[Depends(limiter.slot)])
+    async def heavy():
+        await gate.wait()
+        return {"ok": True}
+
+    @app.get("/cheap")
+    async def cheap():
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        busy = asyncio.create_task(client.get("/heavy"))
+        while limiter.active == 0:
+            await asyncio.sleep(0.001)
+
+        shed = await client.get("/heavy")
+        assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+        assert (await client.get("/cheap")).status_code == 200
+
+        gate.set()
+        assert (await busy).status_code == 200
+    assert limiter.active == 0
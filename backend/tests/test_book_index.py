@@ -0,0 +1,38 @@
+from backend.app.book_index import BookKeywordIndex
+
+
+BOOKS = [
+    {"_id": "1", "title": "A", "description": "Magia y aventuras en un mundo misterioso."},
+    {"_id": "2", "title": "B", "description": "Aventuras mágicas con criaturas fantásticas."},
+    {"_id": "3", "title": "C", "description": "Ciencia ficción con robots."},
+    {"_id": "4", "title": "D", "description": None},
+    {"_id": "5", "title": "E", "description": "Fantasía oscura y magia antigua."},
+]
+
+
+def full_scan(genre, keywords):
+    recs = []
+    for book in BOOKS:
+        desc = (book.get("description") or "").lower()
+        score = 3 if genre in desc else 0
+        score += sum(2 for kw in keywords if kw in desc)
+        if score > 0:
+            recs.append({"book_id": book["_id"], "title": book["title"], "score": score})
+    recs.sort(key=lambda x: x["score"], reverse=True)
+    return recs[:10]
+
+
+def test_recommend_matches_full_scan():
+    index = BookKeywordIndex()
+    for book in BOOKS:
+        index.add(book)
+
+    cases = [
+        ("magia", ["aventura"]),
+        ("fantas", ["ciencia ficción", "robots"]),
+        ("terror", ["nada"]),
+        ("ficción", [""]),
+        ("s y m", ["mágicas"]),
+    ]
+    for genre, keywords in cases:
+        assert index.recommend(genre, keywords) == full_scan(genre, keywords)
@@ -0,0 +1,42 @@
+import time
+
+from backend.app.cache import TTLCache
+
+
+def test_ttl_cache_lru_eviction_expiry_and_counters():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1          # "a" pasa a ser el más reciente
+    cache.set("c", 3)                   # desaloja "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    cache.set("d", 4, expires_at=time.monotonic() - 1)
+    assert cache.get("d") is None
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 3
+
+
+def test_ttl_cache_byte_budget_evicts_oldest():
+    cache = TTLCache(maxsize=100, ttl=60, max_bytes=10)
+    cache.set("a", b"aaaa", size=4)
+    cache.set("b", b"bbbb", size=4)
+    cache.set("c", b"cccc", size=4)     # 12 > 10: desaloja "a"
+
+    assert cache.get("a") is None
+    assert cache.get("b") == b"bbbb"
+    assert cache.stats()["bytes"] == 8
+
+    cache.set("big", b"x" * 11, size=11)  # no cabe nunca: no se guarda
+    assert cache.get("big") is None
+    assert cache.stats()["bytes"] == 8
+
+    # y si la llave ya tenía un valor, no se sigue sirviendo el viejo
+    cache.set("b", b"x" * 11, size=11)
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 4
@@ -0,0 +1,71 @@
+import pytest
+from bson import ObjectId
+
+from backend.app import catalog_snapshot as snapshot_module
+from backend.app.catalog_snapshot import CatalogSnapshot, _Writer
+from backend.app.database_mock import MemoryCollection
+from backend.app.pagination import encode_cursor
+
+
+def make_docs(n):
+    docs = [
+        {"_id": ObjectId(), "title": f"Título {i} ñ", "author": f"Autor {i}", "description": "dé" * i}
+        for i in range(n)
+    ]
+    del docs[3]["author"]
+    docs[4]["description"] = None
+    return sorted(docs, key=lambda d: d["_id"].binary)
+
+
+async def collect(cursor):
+    return [doc async for doc in cursor]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reads_match_documents(tmp_path):
+    docs = make_docs(50)
+    path = str(tmp_path / "catalog.snapshot")
+    writer = _Writer(path, version=1, started_at=0.0)
+    for doc in docs:
+        writer.add(doc)
+    writer.finish()
+
+    snapshot = CatalogSnapshot(path)
+    snapshot._load()
+    expected = [{k: v for k, v in doc.items() if v is not None} for doc in docs]
+    assert len(snapshot) == 50
+    assert snapshot.get(docs[7]["_id"]) == expected[7]
+    assert snapshot.get(ObjectId()) is None
+
+    assert await collect(snapshot.find(None, None, None)) == expected
+    page = await collect(snapshot.find({"title": 1}, encode_cursor(docs[9]["_id"]), 5))
+    assert page == [{"_id": d["_id"], "title": d["title"]} for d in docs[10:15]]
+    assert await collect(snapshot.find(None, encode_cursor(docs[-1]["_id"]), 5)) == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_shared_between_workers(tmp_path, monkeypatch):
+    books = MemoryCollection("books")
+    monkeypatch.setattr(snapshot_module, "books_collection", books)
+    await books.insert_many([{"title": "a"}, {"title": "b", "author": "x"}])
+    path = str(tmp_path / "catalog.snapshot")
+    worker_a, worker_b = CatalogSnapshot(path), CatalogSnapshot(path)
+
+    await worker_a.request_refresh()
+    assert worker_a.fresh and worker_a.version == 1 and len(worker_a) == 2
+
+    # B arranca después: reutiliza la foto de A en lugar de regenerarla
+    await worker_b.start()
+    worker_b.stop()
+    assert worker_b.version == 1
+
+    await books.insert_one({"title": "c"})
+    await worker_b.request_refresh()
+    assert worker_b.version == 2
+    titles = [d["title"] async for d in worker_b.find({"title": 1}, None, None)]
+    assert titles == ["a", "b", "c"]
+
+    # A ve la versión nueva al revisar el archivo de versión
+    assert worker_a.version == 1 and worker_a._disk_version() == 2
+    worker_a._load()
+    assert len(worker_a) == 3
@@ -0,0 +1,168 @@
+import asyncio
+import math
+import random
+import time
+
+import numpy as np
+
+from backend.app import collaborative
+from backend.app.collaborative import ItemSimilarityIndex, review_weight
+
+
+def make_reviews(n, seed=1):
+    rng = random.Random(seed)
+    return [
+        {"username": f"u{rng.randint(0, 30)}", "book_id": f"b{rng.randint(0, 25)}",
+         "sentiment_score": rng.choice([-1.0, -0.5, 0.0, 0.5, 1.0])}
+        for _ in range(n)
+    ]
+
+
+def cosines(reviews):
+    """Similitud coseno entre libros, con la última reseña de cada celda."""
+    columns = {}
+    for r in reviews:
+        columns.setdefault(r["book_id"], {})[r["username"]] = review_weight(r["sentiment_score"])
+    norms = {b: math.sqrt(sum(w * w for w in col.values())) for b, col in columns.items()}
+
+    sims = {}
+    for book, col in columns.items():
+        for other, other_col in columns.items():
+            dot = sum(w * other_col.get(u, 0) for u, w in col.items())
+            if other != book and dot > 0:
+                sims[book, other] = dot / (norms[book] * norms[other])
+    return sims
+
+
+def neighbours(index, book_id):
+    row = index._books[book_id]
+    return [
+        (index._book_ids[other], float(sim))
+        for other, sim in zip(index._nbr_idx[row], index._nbr_sim[row]) if other >= 0
+    ]
+
+
+def test_build_matches_cosine(monkeypatch):
+    reviews = make_reviews(300)
+    sims = cosines(reviews)
+    index = ItemSimilarityIndex(k=5)
+    index._build_from(reviews)
+
+    for book in index._books:
+        expected = sorted((s for (b, _), s in sims.items() if b == book), reverse=True)[:5]
+        got = [s for _, s in neighbours(index, book)]
+        assert len(got) == len(expected)
+        assert all(abs(a - b) < 1e-4 for a, b in zip(got, expected))
+
+
+def test_incremental_adds_keep_similarities_current(monkeypatch):
+    monkeypatch.setattr(collaborative, "MERGE_EVERY", 50)
+    monkeypatch.setattr(collaborative, "NORM_TOLERANCE", 0.0)
+    reviews = make_reviews(300)
+    sims = cosines(reviews)
+
+    def incremental(k):
+        index = ItemSimilarityIndex(k=k)
+        index._build_from(reviews[:150])
+        for start in range(150, 300, 11):          # lotes como los del pipeline
+            index.add_reviews(reviews[start:start + 11])
+        return index
+
+    # Con k chico pueden faltar vecinos que salieron de una lista, pero los
+    # que están tienen su similitud actual y en orden
+    index = incremental(5)
+    for book in index._books:
+        got = neighbours(index, book)
+        assert [s for _, s in got] == sorted((s for _, s in got), reverse=True)
+        for other, sim in got:
+            assert abs(sim - sims[book, other]) < 1e-4
+
+    # Con tolerancia, cada norma guardada difiere a lo sumo ~10% (√1.2)
+    monkeypatch.setattr(collaborative, "NORM_TOLERANCE", 0.1)
+    index = incremental(5)
+    for book in index._books:
+        for other, sim in neighbours(index, book):
+            assert abs(sim - sims[book, other]) <= 0.21 * sims[book, other]
+
+    monkeypatch.setattr(collaborative, "NORM_TOLERANCE", 0.0)
+    # Con listas más largas que el catálogo no se pierde nada
+    index, rebuilt = incremental(30), ItemSimilarityIndex(k=30)
+    rebuilt._build_from(reviews)
+    for username in ("u1", "u3", "u7"):
+        got, expected = index.recommend(username), rebuilt.recommend(username)
+        assert [r["book_id"] for r in got] == [r["book_id"] for r in expected]
+        assert all(abs(a["score"] - b["score"]) < 1e-3 for a, b in zip(got, expected))
+
+
+def test_recommend_skips_reviewed_books_and_weights_by_sentiment():
+    index = ItemSimilarityIndex(k=5)
+    index._build_from([])
+    index.add_reviews([
+        {"username": "ana", "book_id": "a", "sentiment_score": 1.0},
+        {"username": "ana", "book_id": "b", "sentiment_score": 1.0},
+        {"username": "luis", "book_id": "a", "sentiment_score": 1.0},
+        {"username": "luis", "book_id": "c", "sentiment_score": 1.0},
+        {"username": "mario", "book_id": "c", "sentiment_score": 1.0},
+        {"username": "mario", "book_id": "d", "sentiment_score": 1.0},
+        {"username": "eva", "book_id": "b", "sentiment_score": 0.0},
+        {"username": "eva", "book_id": "d", "sentiment_score": -1.0},
+        {"username": None, "book_id": "c", "sentiment_score": 1.0},
+    ])
+
+    assert [r["book_id"] for r in index.recommend("ana")] == ["c", "d"]
+    assert {r["book_id"] for r in index.recommend("luis")} == {"b", "d"}
+    # su reseña de "d" es muy negativa: "c" casi no suma
+    assert [r["book_id"] for r in index.recommend("eva")] == ["a", "c"]
+    assert index.recommend("nadie") == []
+
+    # una nueva reseña del mismo libro reemplaza a la anterior
+    index.add_reviews([{"username": "luis", "book_id": "a", "sentiment_score": -1.0}])
+    assert [r["book_id"] for r in index.recommend("luis")] == ["d", "b"]
+
+
+def test_add_reviews_runs_off_the_event_loop():
+    # más libros y usuarios que en las otras pruebas: el lote tarda
+    rng = random.Random(3)
+    reviews = [
+        {"username": f"u{rng.randint(0, 3000)}", "book_id": f"b{rng.randint(0, 1500)}",
+         "sentiment_score": rng.choice([-1.0, 0.0, 1.0])}
+        for _ in range(30_000)
+    ]
+    new = reviews[-2000:]
+
+    expected = ItemSimilarityIndex(k=10)
+    expected._build_from(reviews[:-2000])
+    start = time.perf_counter()
+    expected.add_reviews(new)
+    sync_ms = (time.perf_counter() - start) * 1000
+
+    index = ItemSimilarityIndex(k=10)
+    index._build_from(reviews[:-2000])
+    index._built = True
+    user = new[0]["username"]
+    before = index.recommend(user)
+
+    async def run():
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.001)
+                now = time.perf_counter()
+                gaps.append((now - last) * 1000)
+                last = now
+
+        tick = asyncio.create_task(ticker())
+        await asyncio.sleep(0.01)
+        index.add_reviews(new)
+        # hasta que termine el lote se responde con las listas anteriores
+        assert index.recommend(user) == before
+        await index.flush()
+        tick.cancel()
+        return max(gaps)
+
+    max_gap = asyncio.run(run())
+    assert max_gap < max(sync_ms / 2, 50), (max_gap, sync_ms)
+    assert np.array_equal(index._nbr_idx, expected._nbr_idx)
+    assert index.recommend(user) == expected.recommend(user)
@@ -0,0 +1,63 @@
+import pytest
+from pymongo import IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from backend.app.database_mock import MemoryCollection
+
+
+@pytest.mark.asyncio
+async def test_memory_collection_indexes_paging_and_updates():
+    reviews = MemoryCollection("reviews")
+    await reviews.create_indexes([IndexModel([("book_id", 1), ("_id", 1)], name="book_id_1__id_1")])
+    await reviews.insert_many([{"book_id": i % 3, "text": str(i)} for i in range(10)])
+
+    page = await reviews.find({"book_id": 1}, {"text": 1}).sort("_id", 1).limit(2).to_list(None)
+    assert [d["text"] for d in page] == ["1", "4"]
+    assert set(page[0]) == {"_id", "text"}
+
+    rest = await reviews.find({"book_id": 1, "_id": {"$gt": page[-1]["_id"]}}).to_list(None)
+    assert [d["text"] for d in rest] == ["7"]
+    assert (await reviews.find({}).explain())["queryPlanner"]["winningPlan"]["stage"] == "COLLSCAN"
+
+    summaries = MemoryCollection("book_summaries")
+    await summaries.bulk_write([
+        UpdateOne({"_id": "s1"}, {"$inc": {"n": 1}}, upsert=True),
+        UpdateOne({"_id": "s1"}, {"$inc": {"n": 2}, "$set": {"k": ["a"]}}, upsert=True),
+    ])
+    assert await summaries.find_one({"_id": "s1"}) == {"_id": "s1", "n": 3, "k": ["a"]}
+
+    await reviews.delete_many({"book_id": {"$in": [0, 2]}})
+    assert await reviews.count_documents({}) == 3
+
+
+@pytest.mark.asyncio
+async def test_memory_collection_unique_index():
+    users = MemoryCollection("users")
+    await users.create_indexes([IndexModel([("email", 1)], name="email_1", unique=True)])
+    await users.insert_one({"email": "a@x.com"})
+
+    with pytest.raises(DuplicateKeyError):
+        await users.insert_one({"email": "a@x.com"})
+
+    with pytest.raises(BulkWriteError) as exc:
+        await users.insert_many([{"email": "b@x.com"}, {"email": "a@x.com"}], ordered=False)
+    assert [e["index"] for e in exc.value.details["writeErrors"]] == [1]
+    assert await users.count_documents({}) == 2
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_rejects_an_index_with_other_options(monkeypatch):
+    from backend.app import database
+
+    models = database.INDEXES[database.reviews_collection]
+    reviews = MemoryCollection("reviews")
+    monkeypatch.setattr(database, "INDEXES", {reviews: models})
+    await database.ensure_indexes()
+    await database.ensure_indexes()  # los mismos índices otra vez no son deriva
+
+    # el de `enrichment` debe ser disperso
+    reviews = MemoryCollection("reviews")
+    await reviews.create_index([("enrichment", 1)], name="enrichment_1")
+    monkeypatch.setattr(database, "INDEXES", {reviews: models})
+    with pytest.raises(database.IndexDriftError):
+        await database.ensure_indexes()
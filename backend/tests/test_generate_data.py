@@ -0,0 +1,36 @@
+import asyncio
+import json
+from collections import Counter
+
+from backend.generate_data import Dataset, NdjsonSink, produce
+
+
+def write_ndjson(directory, chunk):
+    dataset = Dataset(n_books=500, n_users=300, seed=7, password="x")
+    sink = NdjsonSink(str(directory))
+
+    async def run():
+        await produce("books", 500, dataset.books, sink, writers=1, chunk=chunk)
+        await produce("reviews", 5_500, dataset.reviews, sink, writers=1, chunk=chunk)
+        await sink.close()
+
+    asyncio.run(run())
+
+
+def test_generator_is_deterministic_and_skewed(tmp_path):
+    write_ndjson(tmp_path / "a", chunk=1000)
+    write_ndjson(tmp_path / "b", chunk=3000)
+    for name in ("books.ndjson", "reviews.ndjson"):
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+
+    books = [json.loads(line) for line in (tmp_path / "a" / "books.ndjson").open()]
+    reviews = [json.loads(line) for line in (tmp_path / "a" / "reviews.ndjson").open()]
+    assert len(books) == 500 and len(reviews) == 5_500
+    ids = [b["_id"]["$oid"] for b in books]
+    assert ids == sorted(ids) and len(set(ids)) == 500
+
+    per_book = Counter(r["book_id"]["$oid"] for r in reviews)
+    assert set(per_book) <= set(ids)
+    # Zipf: el 5% más popular junta bastante más que el 5% de las reseñas
+    top = sum(count for _, count in per_book.most_common(25))
+    assert top > 0.3 * len(reviews)
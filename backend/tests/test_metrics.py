@@ -0,0 +1,40 @@
+import threading
+
+from types import SimpleNamespace
+
+from backend.app.metrics import Histogram, MongoCommandMetrics, REGISTRY, mongo_command_duration
+
+
+def test_histogram_sums_shards_from_every_thread():
+    hist = Histogram("test_latency_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    REGISTRY.remove(hist)
+    series = hist.labels("/books/")
+
+    series.observe(0.05)
+    worker = threading.Thread(target=lambda: [series.observe(0.5), series.observe(5.0)])
+    worker.start()
+    worker.join()
+
+    lines = hist.render()
+    assert 'test_latency_seconds_bucket{route="/books/",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/books/",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/books/",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{route="/books/"} 3' in lines
+    assert 'test_latency_seconds_sum{route="/books/"} 5.55' in lines
+
+
+def test_mongo_metrics_label_get_more_with_its_collection():
+    listener = MongoCommandMetrics()
+    for request_id, command in enumerate((
+        {"find": "test_books", "filter": {}},
+        {"getMore": 12345, "collection": "test_books"},
+    )):
+        name = next(iter(command))
+        event = SimpleNamespace(command_name=name, command=command,
+                                connection_id=("db", 27017), request_id=request_id)
+        listener.started(event)
+        listener.succeeded(SimpleNamespace(duration_micros=1000, **vars(event)))
+
+    lines = mongo_command_duration.render()
+    assert 'mongo_command_duration_seconds_count{collection="test_books",command="find"} 1' in lines
+    assert 'mongo_command_duration_seconds_count{collection="test_books",command="getMore"} 1' in lines
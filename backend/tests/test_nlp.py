@@ -0,0 +1,174 @@
+import asyncio
+import os
+import signal
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from backend.app import reviews
+from backend.app.database import acquire_lease, release_lease, reviews_collection
+from backend.app.nlp.keywords import KeywordModel, extract_keywords, keyword_model
+from backend.app.nlp.pool import NLPPool
+from backend.app.nlp.sentiment import analyze_sentiment, analyze_sentiment_batch
+
+
+def test_sentiment_folds_accents_and_matches_whole_words():
+    assert analyze_sentiment("INCREIBLE y emocionante!") == ("positive", 1.0)
+    assert analyze_sentiment("Increíble, pero aburrido.") == ("neutral", 0.0)
+    # "malon" ya no cuenta como "malo"
+    assert analyze_sentiment("Un malon de personajes") == ("neutral", 0.0)
+
+
+def test_sentiment_batch_matches_single_calls():
+    texts = ["Muy emocionante y divertido.", "Un poco aburrido al principio.", ""]
+    assert analyze_sentiment_batch(texts) == [analyze_sentiment(t) for t in texts]
+
+
+def test_keyword_model_uses_corpus_idf_and_survives_save(tmp_path):
+    model = KeywordModel()
+    model.add_review("a", "Una historia de dragones, dragones y magia.")
+    model.add_review("a", "La magia del libro es genial.", review_id="r2")
+    model.add_review("b", "Magia, magia y más magia.")
+
+    # "magia" aparece en todas las reseñas, así que pesa menos que "dragones"
+    assert model.top_keywords("a", top_k=1) == ["dragones"]
+    assert model.top_keywords("zzz") == []
+
+    path = tmp_path / "model.json"
+    model.save(str(path))
+    restored = KeywordModel()
+    restored.load(str(path))
+
+    assert restored.top_keywords("a") == model.top_keywords("a")
+    assert restored.last_review_id == "r2"
+
+
+def test_nlp_pool_batches_concurrent_requests():
+    texts = [f"me encantó el libro {i} pero el final fue aburrido" for i in range(40)]
+
+    async def run():
+        pool = NLPPool(workers=1, batch_window_ms=50, inline_max_chars=0)
+        try:
+            parts = await asyncio.gather(*[pool.analyze(texts[i:i + 4]) for i in range(0, 40, 4)])
+            return [r for part in parts for r in part], pool.batches
+        finally:
+            pool.shutdown()
+
+    results, batches = asyncio.run(run())
+    assert results == analyze_sentiment_batch(texts)
+    assert batches == 1
+
+
+def test_nlp_pool_recovers_after_a_worker_dies():
+    texts = [f"me encantó el libro {i} pero el final fue aburrido" for i in range(40)]
+
+    def kill_worker(pool):
+        for pid in list(pool._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+
+    async def run():
+        pool = NLPPool(workers=1, batch_window_ms=1, inline_max_chars=0,
+                       queue_limit=10**7, restart_backoff=0.05)
+        try:
+            await pool.start()
+
+            # muere sin lote en curso: lo siguiente espera al pool nuevo
+            kill_worker(pool)
+            await asyncio.sleep(0.3)
+            assert await pool.analyze(texts) == analyze_sentiment_batch(texts)
+            assert pool.restarts == 1
+
+            # muere con un lote en curso: solo ese falla
+            big = texts * 20_000
+            in_flight = asyncio.create_task(pool.analyze(big))
+            await asyncio.sleep(0.3)
+            kill_worker(pool)
+            with pytest.raises(HTTPException) as exc:
+                await in_flight
+            assert exc.value.status_code == 503
+            assert await pool.analyze(texts) == analyze_sentiment_batch(texts)
+            assert pool.restarts == 2
+        finally:
+            pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_saved_keyword_model_counts_reviews_from_every_worker(tmp_path, monkeypatch):
+    path = tmp_path / "keyword_model.json"
+    monkeypatch.setattr(reviews, "KEYWORD_MODEL_PATH", str(path))
+
+    async def run():
+        await reviews.restore_keyword_model()
+        book_id = ObjectId()
+        # una la insertó este worker (y la contó en vivo), la otra otro worker
+        mine = {"book_id": book_id, "text": "dragones y magia"}
+        await reviews_collection.insert_one(mine)
+        keyword_model.add_live_review(book_id, mine["text"], mine["_id"])
+        other = {"book_id": book_id, "text": "magia antigua"}
+        await reviews_collection.insert_one(other)
+
+        # con el lease tomado por otro worker no se escribe nada
+        token = await acquire_lease(reviews.KEYWORD_MODEL_LEASE, 60)
+        assert await reviews.save_keyword_model() is False and not path.exists()
+        await release_lease(reviews.KEYWORD_MODEL_LEASE, token)
+
+        assert await reviews.save_keyword_model() is True
+        saved = KeywordModel()
+        saved.load(str(path))
+        total = await reviews_collection.count_documents({})
+        return saved, total, other["_id"], book_id
+
+    saved, total, last_id, book_id = asyncio.run(run())
+    assert saved.n_docs == total
+    assert saved.last_review_id == str(last_id)
+    assert saved.book_terms[str(book_id)]["magia"] == 2
+
+    # un archivo dañado no impide arrancar: se reconstruye desde la base
+    path.write_text('{"version": 1, "n_docs": 3')
+    asyncio.run(reviews.restore_keyword_model())
+    assert keyword_model.n_docs == total
+    assert keyword_model.book_terms[str(book_id)]["magia"] == 2
+
+
+def test_keyword_model_forgets_live_ids_the_scan_passed():
+    model = KeywordModel()
+    first, second, third = (str(ObjectId()) for _ in range(3))
+    model.add_live_review("a", "dragones", first)
+    model.add_live_review("a", "magia", third)
+
+    # recorrido de la base: `first` ya se contó en vivo, `second` es de otro worker
+    model.add_review("a", "dragones", review_id=first)
+    model.add_review("a", "magia antigua", review_id=second)
+    model.trim_live_ids()
+    assert model.live_ids == {third}
+    assert model.n_docs == 3
+
+    # el recorrido ya pasó por aquí: no se cuenta otra vez
+    model.add_live_review("a", "magia antigua", second)
+    assert model.n_docs == 3 and model.live_ids == {third}
+
+
+def test_nlp_pool_runs_keywords_and_large_batches_out_of_the_loop(monkeypatch):
+    from backend.app.nlp import pool as pool_module
+
+    texts = ["dragones y magia", "magia antigua", "un dragón"] * 10
+
+    def fail_inline(texts, *args):
+        raise AssertionError("ran on the event loop")
+
+    async def run():
+        pool = NLPPool(workers=1, batch_window_ms=1)
+        try:
+            await pool.start()
+            # 30 textos cortos: suman pocos caracteres pero no van en línea
+            monkeypatch.setattr(pool_module, "analyze_sentiment_batch", fail_inline)
+            monkeypatch.setattr(pool_module, "extract_keywords", fail_inline)
+            return await pool.analyze(texts), await pool.extract_keywords(texts, top_k=2)
+        finally:
+            pool.shutdown()
+
+    sentiments, keywords = asyncio.run(run())
+    assert sentiments == analyze_sentiment_batch(texts)
+    assert keywords == extract_keywords(texts, top_k=2)
@@ -0,0 +1,42 @@
+import httpx
+import pytest
+
+from backend.app.main import app
+from backend.app.pagination import MAX_PAGE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_projected_listings_only_return_requested_fields():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        book = await client.post("/books/", json={"title": "Proyecciones", "author": "Ana"})
+        book_id = book.json()["id"]
+        await client.post(f"/books/{book_id}/reviews", json={"username": "ana", "text": "excelente"})
+
+        books = (await client.get("/books/", params={"fields": "author"})).json()
+        assert books and all(set(b) == {"id", "author"} for b in books)
+        assert {"id": book_id, "author": "Ana"} in books
+
+        streamed = (await client.get("/books/", params={"fields": "title", "stream": "true"})).json()
+        assert all(set(b) == {"id", "title"} for b in streamed)
+
+        reviews = await client.get(f"/books/{book_id}/reviews", params={"fields": "text"})
+        assert [set(r) for r in reviews.json()] == [{"id", "text"}]
+
+        # sin `fields` vienen todos
+        full = (await client.get(f"/books/{book_id}/reviews")).json()
+        assert set(full[0]) == {"id", "username", "text", "sentiment_label", "sentiment_score"}
+
+        assert (await client.get("/books/", params={"fields": "isbn"})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_similar_books_validate_limit():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        book = await client.post("/books/", json={"title": "Vecinos", "author": "Ana"})
+        url = f"/books/{book.json()['id']}/recommendations"
+
+        for limit in (0, -1, MAX_PAGE_SIZE + 1):
+            assert (await client.get(url, params={"limit": limit})).status_code == 400
+        assert (await client.get(url, params={"limit": 1})).status_code == 200
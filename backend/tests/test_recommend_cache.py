@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from backend.app import recommend_cache, response_cache
+from backend.app.recommend_cache import cached_recommendations, quiz_fingerprint
+
+
+def test_fingerprint_ignores_case_and_keyword_order():
+    assert quiz_fingerprint("Fantasy", ["Magic", "dragons"]) == quiz_fingerprint("fantasy", ["dragons", "magic"])
+    # las repetidas suman dos veces en el ranking
+    assert quiz_fingerprint("fantasy", ["magic"]) != quiz_fingerprint("fantasy", ["magic", "magic"])
+    assert quiz_fingerprint("fantasy", ["magic"]) != quiz_fingerprint("horror", ["magic"])
+
+
+def test_concurrent_misses_compute_once_and_catalog_changes_recompute():
+    recommend_cache.quiz_cache.clear()
+    calls = []
+
+    async def compute():
+        calls.append(response_cache.catalog_version)
+        await asyncio.sleep(0.01)
+        return [{"book_id": "b1", "title": "T", "score": len(calls)}]
+
+    async def run():
+        bodies = await asyncio.gather(*(
+            cached_recommendations("fantasy", ["magic", "dragons"], compute) for _ in range(20)
+        ))
+        again = await cached_recommendations("Fantasy", ["dragons", "magic"], compute)
+        response_cache.invalidate_catalog()
+        fresh = await cached_recommendations("fantasy", ["magic", "dragons"], compute)
+        return bodies, again, fresh
+
+    bodies, again, fresh = asyncio.run(run())
+    assert len(calls) == 2
+    assert set(bodies) == {again} == {b'[{"book_id":"b1","title":"T","score":1}]'}
+    assert fresh == b'[{"book_id":"b1","title":"T","score":2}]'
+    assert recommend_cache.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    recommend_cache.quiz_cache.clear()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            *(cached_recommendations("sci-fi", ["space"], failing) for _ in range(5)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(recommend_cache.quiz_cache) == 0
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cached_recommendations("sci-fi", ["space"], failing))
+    assert len(calls) == 2
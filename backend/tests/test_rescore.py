@@ -0,0 +1,94 @@
+import time
+
+import pytest
+from pymongo import UpdateMany, UpdateOne
+
+from backend.app import rescore
+from backend.app.database_mock import MemoryCollection
+from backend.app.nlp.sentiment import SentimentAnalyzer
+from backend.app.rescore import rescore_reviews
+
+OLD = SentimentAnalyzer({"bueno"}, {"malo"})
+NEW = SentimentAnalyzer({"bueno", "genial"}, {"malo", "lento"})
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    reviews, jobs = MemoryCollection("reviews"), MemoryCollection("jobs")
+    monkeypatch.setattr(rescore, "reviews_collection", reviews)
+    monkeypatch.setattr(rescore, "jobs_collection", jobs)
+    return reviews, jobs
+
+
+async def seed(reviews, n):
+    texts = ["bueno", "genial", "lento pero bueno", "sin opinión", "malo"]
+    docs = []
+    for i in range(n):
+        text = texts[i % len(texts)]
+        label, score = OLD.analyze(text)
+        docs.append({"text": text, "sentiment_label": label, "sentiment_score": score,
+                     "sentiment_version": OLD.version})
+    docs.append({"text": "genial", "sentiment_label": "pending", "sentiment_score": 0.0,
+                 "enrichment": "pending"})
+    await reviews.insert_many(docs)
+
+
+@pytest.mark.asyncio
+async def test_rescore_writes_only_changes_and_resumes_after_a_crash(collections):
+    reviews, jobs = collections
+    await seed(reviews, 50)
+    writes = []
+    bulk_write = reviews.bulk_write
+
+    async def counting_bulk_write(ops, **kwargs):
+        writes.extend(ops)
+        return await bulk_write(ops, **kwargs)
+
+    reviews.bulk_write = counting_bulk_write
+
+    calls = 0
+
+    def crashing(texts):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise RuntimeError("crash")
+        return NEW.analyze_batch(texts)
+
+    with pytest.raises(RuntimeError):
+        await rescore_reviews(batch_size=10, ops_per_sec=0, version=NEW.version, analyze=crashing)
+    state = await jobs.find_one({"_id": rescore.RESCORE_JOB_ID})
+    assert state["scanned"] == 20 and not state["done"]
+
+    state = await rescore_reviews(batch_size=10, ops_per_sec=0, version=NEW.version, analyze=NEW.analyze_batch)
+    assert state["done"] and state["scanned"] == 50
+    # "genial" y "lento pero bueno" cambian: 2 de cada 5; el resto solo
+    # recibe la marca de versión (un UpdateMany por lote)
+    rewrites = [op for op in writes if isinstance(op, UpdateOne)]
+    assert state["changed"] == len(rewrites) == 20
+    assert sum(isinstance(op, UpdateMany) for op in writes) == 5
+
+    docs = await reviews.find({}).to_list(None)
+    pending = [d for d in docs if d.get("enrichment")]
+    assert pending[0]["sentiment_label"] == "pending"
+    for doc in docs:
+        if doc.get("enrichment"):
+            continue
+        assert (doc["sentiment_label"], doc["sentiment_score"]) == NEW.analyze(doc["text"])
+        assert doc["sentiment_version"] == NEW.version
+
+    # Terminado: otra corrida con el mismo léxico no lee nada
+    again = await rescore_reviews(batch_size=10, ops_per_sec=0, version=NEW.version, analyze=crashing)
+    assert again["scanned"] == 50 and len(writes) == 25
+
+
+@pytest.mark.asyncio
+async def test_rescore_throttles_to_ops_per_sec(collections):
+    reviews, _ = collections
+    await seed(reviews, 60)
+
+    start = time.perf_counter()
+    state = await rescore_reviews(batch_size=10, ops_per_sec=500, version=NEW.version, analyze=NEW.analyze_batch)
+    assert state["scanned"] == 60
+    # 60 reseñas a 500/s: la espera va después de cada lote completo
+    assert time.perf_counter() - start >= 0.11
@@ -0,0 +1,45 @@
+import httpx
+import pytest
+
+from backend.app import response_cache
+from backend.app.main import app
+
+
+@pytest.mark.asyncio
+async def test_catalog_responses_have_etags_and_refresh_on_new_books():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        book = (await client.post("/books/", json={"title": "Cacheado", "author": "Ana"})).json()
+
+        first = await client.get(f"/books/{book['id']}")
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and first.json()["title"] == "Cacheado"
+        assert etag == response_cache.make_etag(first.content)
+        assert "max-age" in first.headers["cache-control"]
+
+        # mismo cuerpo, mismo ETag; con If-None-Match, 304 sin cuerpo
+        assert (await client.get(f"/books/{book['id']}")).headers["etag"] == etag
+        not_modified = await client.get(f"/books/{book['id']}", headers={"If-None-Match": f'W/{etag}, "x"'})
+        assert not_modified.status_code == 304 and not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
+
+        listing = await client.get("/books/", params={"limit": 1000})
+        list_etag = listing.headers["etag"]
+        assert (await client.get("/books/", params={"limit": 1000},
+                                 headers={"If-None-Match": list_etag})).status_code == 304
+
+        # un libro nuevo invalida el catálogo: la lista se vuelve a armar
+        version = response_cache.catalog_version
+        added = (await client.post("/books/", json={"title": "Recién llegado"})).json()
+        assert response_cache.catalog_version == version + 1
+
+        fresh = await client.get("/books/", params={"limit": 1000},
+                                 headers={"If-None-Match": list_etag})
+        assert fresh.status_code == 200 and fresh.headers["etag"] != list_etag
+        assert added["id"] in {b["id"] for b in fresh.json()}
+
+        # get_book también se vuelve a armar (no sale del cache anterior)
+        hits = response_cache.catalog_cache.hits
+        again = await client.get(f"/books/{book['id']}")
+        assert again.status_code == 200 and again.headers["etag"] == etag
+        assert response_cache.catalog_cache.hits == hits
@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import pytest
+from bson import ObjectId
+
+from backend.app.database import acquire_lease, release_lease, reviews_collection, summaries_collection
+from backend.app.review_pipeline import PENDING, PROCESSING, RECOVERY_JOB_ID, ReviewPipeline
+
+
+def pending_review(book_id, text):
+    return {"_id": ObjectId(), "book_id": book_id, "username": "u", "text": text,
+            "sentiment_label": PENDING, "sentiment_score": 0.0, "enrichment": PENDING}
+
+
+def test_pipeline_processes_in_batches_and_recovers_pending():
+    book_id = ObjectId()
+    texts = ["me encantó, excelente", "horrible y aburrido", "un libro"]
+
+    async def run():
+        # Una reseña quedó pendiente de una ejecución anterior
+        leftover = pending_review(book_id, "increíble historia")
+        await reviews_collection.insert_one(leftover)
+
+        pipeline = ReviewPipeline(workers=1, queue_size=10, batch_size=10)
+        assert await pipeline.recover() == 1
+
+        for text in texts:
+            review = pending_review(book_id, text)
+            await reviews_collection.insert_one(review)
+            await pipeline.submit(review)
+
+        pipeline.start()
+        await pipeline.drain(timeout=5)
+
+        docs = await reviews_collection.find({"book_id": book_id}).sort("_id", 1).to_list(None)
+        summary = await summaries_collection.find_one({"_id": book_id})
+        return pipeline, docs, summary
+
+    pipeline, docs, summary = asyncio.run(run())
+
+    assert [d["sentiment_label"] for d in docs] == ["positive", "positive", "negative", "neutral"]
+    assert not any("enrichment" in d for d in docs)
+    assert pipeline.batches == 1
+    assert summary["review_count"] == 4
+    assert summary["positive"] == 2
+
+
+def test_racing_pipelines_process_a_review_once():
+    book_id = ObjectId()
+
+    async def run():
+        review = pending_review(book_id, "me encantó, excelente")
+        await reviews_collection.insert_one(review)
+
+        # Dos procesos con la misma reseña: la que encoló `submit` en uno y
+        # la que encontró `recover` en otro
+        first = ReviewPipeline(workers=1, queue_size=10, batch_size=10)
+        second = ReviewPipeline(workers=1, queue_size=10, batch_size=10)
+        await asyncio.gather(first._process([dict(review)]), second._process([dict(review)]))
+
+        # Ya terminada, otra recuperación no la vuelve a contar
+        third = ReviewPipeline(workers=1, queue_size=10, batch_size=10)
+        assert await third.recover() == 0
+        await third._process([dict(review)])
+
+        doc = await reviews_collection.find_one({"_id": review["_id"]})
+        summary = await summaries_collection.find_one({"_id": book_id})
+        return first, second, third, doc, summary
+
+    first, second, third, doc, summary = asyncio.run(run())
+
+    assert first.processed + second.processed + third.processed == 1
+    assert doc["sentiment_label"] == "positive"
+    assert not {"enrichment", "claimed_by", "claim_expires"} & set(doc)
+    assert summary["review_count"] == 1 and summary["positive"] == 1
+
+
+def test_only_one_process_recovers_at_a_time():
+    async def run():
+        await reviews_collection.insert_one(pending_review(ObjectId(), "un libro"))
+        follower = ReviewPipeline(workers=1, queue_size=10, batch_size=10)
+        token = await acquire_lease(RECOVERY_JOB_ID, 60)
+        assert token is not None
+        assert await follower.recover() == 0
+        await release_lease(RECOVERY_JOB_ID, token)
+        assert await follower.recover() >= 1
+
+    asyncio.run(run())
+
+
+def test_failed_write_returns_the_batch_to_pending(monkeypatch):
+    async def broken_bulk_write(*args, **kwargs):
+        raise RuntimeError("write failed")
+
+    async def run():
+        review = pending_review(ObjectId(), "me encantó, excelente")
+        await reviews_collection.insert_one(review)
+        monkeypatch.setattr(reviews_collection, "bulk_write", broken_bulk_write)
+
+        pipeline = ReviewPipeline(workers=1, queue_size=10, batch_size=10)
+        with pytest.raises(RuntimeError):
+            await pipeline._process([dict(review)])
+        return await reviews_collection.find_one({"_id": review["_id"]})
+
+    doc = asyncio.run(run())
+    assert doc["enrichment"] == PENDING
+    assert not {"claimed_by", "claim_expires"} & set(doc)
+
+
+def test_recover_does_not_hold_the_lease_while_waiting_for_claims():
+    async def run():
+        review = pending_review(ObjectId(), "un libro")
+        review.update(enrichment=PROCESSING, claimed_by="otro", claim_expires=time.time() + 0.3)
+        await reviews_collection.insert_one(review)
+
+        pipeline = ReviewPipeline(workers=1, queue_size=10, batch_size=10)
+        recovery = asyncio.create_task(pipeline.recover())
+        await asyncio.sleep(0.1)
+        # Mientras espera a que venza el reclamo, el lease está libre
+        token = await acquire_lease(RECOVERY_JOB_ID, 60)
+        assert token is not None
+        await release_lease(RECOVERY_JOB_ID, token)
+        return await recovery
+
+    assert asyncio.run(run()) >= 1
@@ -0,0 +1,78 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from backend.app import search
+from backend.app.search import BM25_B, BM25_K1, BookSearchIndex, book_search_text, search_tokens
+
+WORDS = ["magia", "dragón", "dragon", "reino", "guerra", "amor", "ciudad", "mar", "robot"]
+
+
+def brute_force(docs, query, avgdl):
+    tokens = [search_tokens(book_search_text(d)) for d in docs]
+    n = len(docs)
+    scores = {}
+    for term in dict.fromkeys(search_tokens(query)):
+        df = sum(term in t for t in tokens)
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for doc, toks in zip(docs, tokens):
+            tf = Counter(toks)[term]
+            if tf:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * len(toks) / avgdl)
+                scores[doc["_id"]] = scores.get(doc["_id"], 0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return scores
+
+
+def build_index(monkeypatch, n, impact_depth):
+    monkeypatch.setattr(search, "MERGE_EVERY", 7)
+    monkeypatch.setattr(search, "IMPACT_DEPTH", impact_depth)
+    monkeypatch.setattr(search, "SEARCH_START_DEPTH", 4)
+    rng = random.Random(5)
+    docs = [
+        {"_id": str(i), "title": f"Libro {i}", "author": "Autor",
+         "description": " ".join(rng.choices(WORDS, k=rng.randint(2, 10)))}
+        for i in range(n)
+    ]
+
+    index = BookSearchIndex()
+    index._build_from(docs[:n - 20])
+    for doc in docs[n - 20:]:                # 20 altas: dos uniones y un resto
+        index.add(doc)
+    return index, docs
+
+
+def test_search_matches_bm25_after_build_and_incremental_adds(monkeypatch):
+    index, docs = build_index(monkeypatch, 60, impact_depth=1000)
+
+    for query in ["magia", "Dragón reino", "amor y guerra", "nada"]:
+        expected = brute_force(docs, query, index._avgdl)
+        total, exact, results = index.search(query, limit=100)
+        assert (total, exact) == (len(expected), True)
+        assert {r["book_id"] for r in results} == set(expected)
+        for r in results:
+            assert abs(r["score"] - expected[r["book_id"]]) < 1e-3
+        scores = [r["score"] for r in results]
+        assert scores == sorted(scores, reverse=True)
+
+    _, _, page = index.search("magia", limit=5, offset=5)
+    assert [r["book_id"] for r in page] == [r["book_id"] for r in index.search("magia", limit=10)[2][5:]]
+
+
+@pytest.mark.parametrize("dense_ratio", [1, 1000])
+def test_pruned_search_returns_the_same_top_results(monkeypatch, dense_ratio):
+    # Listas de impacto cortas: la búsqueda se poda antes de recorrerlo todo
+    # (con y sin el arreglo denso para las listas largas)
+    monkeypatch.setattr(search, "DENSE_SEARCH_RATIO", dense_ratio)
+    index, docs = build_index(monkeypatch, 400, impact_depth=8)
+
+    for query in ["magia", "dragón reino", "amor guerra mar", "robot ciudad"]:
+        expected = brute_force(docs, query, index._avgdl)
+        best = sorted(expected.values(), reverse=True)[:10]
+        total, exact, results = index.search(query, limit=10)
+        assert len(results) == len(best)
+        assert all(abs(r["score"] - s) < 1e-3 for r, s in zip(results, best))
+        assert total <= len(expected) and (total == len(expected) or not exact)
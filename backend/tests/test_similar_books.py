@@ -0,0 +1,25 @@
+from backend.app.similar_books import SimilarBooksIndex
+
+
+BOOKS = [
+    {"_id": "1", "title": "Libro A", "author": "Autor X",
+     "description": "Magia y aventuras en un mundo misterioso."},
+    {"_id": "2", "title": "Libro B", "author": "Autor Y",
+     "description": "Aventuras con magia y criaturas fantásticas."},
+    {"_id": "3", "title": "Libro C", "author": "Autor Z",
+     "description": "Historia triste y dramática en la ciudad."},
+]
+
+
+def test_precomputed_neighbours_and_incremental_add():
+    index = SimilarBooksIndex(k=2)
+    index._build_from(BOOKS)
+
+    assert [r["book_id"] for r in index.similar("1")][0] == "2"
+
+    index.add({"_id": "4", "title": "Libro D", "author": "Autor W",
+               "description": "Una historia triste y dramática."})
+
+    assert index.similar("4")[0]["book_id"] == "3"
+    assert index.similar("3")[0]["book_id"] == "4"
+    assert all(r["book_id"] != "3" for r in index.similar("3"))
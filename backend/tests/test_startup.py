@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_importing_app_does_not_load_scikit_learn():
+    code = "import sys, backend.app.main; print(sorted({'sklearn', 'scipy', 'numpy'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, DB_BACKEND="memory"), check=True,
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,66 @@
+import asyncio
+import random
+
+import pytest
+from bson import ObjectId
+
+from backend.app import summaries
+from backend.app.database_mock import MemoryCollection
+from backend.app.nlp.keywords import KeywordModel
+from backend.app.nlp.sentiment import analyze_sentiment
+
+TEXTS = [
+    "me encantó, excelente historia", "horrible y aburrido", "un libro más",
+    "increíble final, muy emocionante", "malo, lento y predecible", "personajes geniales",
+]
+
+
+def test_rebuild_matches_incremental_summaries(monkeypatch):
+    reviews = MemoryCollection("reviews")
+    stored = MemoryCollection("book_summaries")
+    model = KeywordModel()
+    monkeypatch.setattr(summaries, "reviews_collection", reviews)
+    monkeypatch.setattr(summaries, "summaries_collection", stored)
+    monkeypatch.setattr(summaries, "keyword_model", model)
+
+    rng = random.Random(4)
+    books = [ObjectId() for _ in range(5)]
+    docs = []
+    for _ in range(120):
+        text = rng.choice(TEXTS)
+        label, score = analyze_sentiment(text)
+        docs.append({"_id": ObjectId(), "book_id": rng.choice(books), "text": text,
+                     "sentiment_label": label, "sentiment_score": score})
+    # aún sin sentimiento: la reconstrucción no la cuenta
+    pending = {"_id": ObjectId(), "book_id": books[0], "text": "pendiente",
+               "sentiment_label": "pending", "sentiment_score": 0.0, "enrichment": "pending"}
+    stale_book = ObjectId()
+
+    async def run():
+        await reviews.insert_many(docs + [pending])
+        await stored.insert_one({"_id": stale_book, "review_count": 3})
+
+        # como el pipeline: en lotes, con el modelo de palabras al día
+        for start in range(0, len(docs), 7):
+            batch = docs[start:start + 7]
+            for doc in batch:
+                model.add_review(doc["book_id"], doc["text"], review_id=doc["_id"])
+            await summaries.record_reviews_bulk(batch)
+        incremental = {d["_id"]: d async for d in stored.find({"_id": {"$in": books}})}
+
+        assert await summaries.rebuild_summaries(batch_size=10) == len(incremental)
+        rebuilt = {d["_id"]: d async for d in stored.find({})}
+        return incremental, rebuilt
+
+    incremental, rebuilt = asyncio.run(run())
+
+    assert stale_book not in rebuilt
+    assert set(rebuilt) == set(incremental)
+    for book_oid, doc in rebuilt.items():
+        expected = incremental[book_oid]
+        assert doc["score_sum"] == pytest.approx(expected.pop("score_sum"))
+        assert {k: v for k, v in doc.items() if k != "score_sum"} == expected
+
+    counted = sum(1 for d in docs if d["book_id"] == books[0])
+    assert rebuilt[books[0]]["review_count"] == counted
+    assert model.n_docs == len(docs)